@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+생성 요청 허용 제어
+같은 요청의 중복 ChatGPT 호출을 하나로 합치고(single-flight), API 키별로 요청 속도를 제한합니다.
+
+- single-flight: 같은 키의 호출이 진행 중이면 새로 호출하지 않고 진행 중인 호출의 결과(또는 오류)를 함께 받습니다.
+- 허용량 제한: API 키 해시별 토큰 버킷으로 초당 요청 수와 순간 허용량(burst)을 제한합니다.
+  허용량을 넘은 요청은 최대 대기 시간까지 순서대로 기다리고, 그보다 오래 기다려야 하면 거부됩니다
+  (호출 측에서 429와 Retry-After로 응답).
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+# 기본 설정값 (환경 변수로 변경 가능)
+# API 키별 초당 허용 요청 수 (0이면 제한하지 않음)
+DEFAULT_RATE = float(os.environ.get('ADMISSION_RATE', 1.0))
+DEFAULT_BURST = int(os.environ.get('ADMISSION_BURST', 10))
+# 허용량을 넘은 요청이 기다릴 수 있는 최대 시간 (초)
+DEFAULT_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 2.0))
+
+# 이 수를 넘으면 가득 찬(오래 사용되지 않은) 버킷을 정리
+MAX_IDLE_BUCKETS = 1024
+
+
+class _Flight:
+    """진행 중인 호출 1건"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합치는 실행기"""
+
+    def __init__(self):
+        self._flights = {}
+        self._tasks = {}  # 비동기 호출 (이벤트 루프별로 사용)
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """
+        key에 대해 진행 중인 호출이 없으면 func()를 호출하고, 있으면 그 결과를 기다려 반환합니다.
+
+        호출이 실패하면 기다리던 호출자 모두에게 같은 예외가 전달됩니다.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key, func):
+        """
+        do()의 비동기 버전. func는 코루틴 함수입니다.
+
+        호출은 별도 작업으로 실행되므로, 먼저 요청한 클라이언트의 연결이 끊겨도 기다리는 다른 요청은 결과를 받습니다.
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(func())
+                task.add_done_callback(lambda _: self._forget(key, task))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외가 처리되지 않은 것으로 경고되지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """실행기 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights) + len(self._tasks),
+            }
+
+
+class _Bucket:
+    """하나의 API 키에 대한 토큰 버킷 (대기 중인 요청이 미리 가져간 만큼 음수가 될 수 있음)"""
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+
+class AdmissionController:
+    """API 키 해시별 토큰 버킷 요청 허용 제어"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_wait=DEFAULT_MAX_WAIT):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def _refill(self, bucket, now):
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+
+    def _sweep(self, now):
+        """가득 찬 버킷을 삭제합니다 (잠금 상태에서 호출). 다시 만들어도 상태가 같으므로 안전합니다."""
+        for key_hash, bucket in list(self._buckets.items()):
+            self._refill(bucket, now)
+            if bucket.tokens >= self.burst:
+                del self._buckets[key_hash]
+
+    def reserve(self, key_hash, cost=1):
+        """
+        요청 1건의 허용 여부를 결정합니다.
+
+        cost는 요청이 가져가는 토큰 수입니다 (일괄 생성은 장비 수). 허용 여부는 첫 토큰을 기다리는 시간으로
+        정하고 나머지는 미리 가져가므로, 버킷이 다시 찰 때까지 같은 키의 다음 요청이 기다리거나 거부됩니다.
+        반환값: (허용 여부, 초). 허용되면 순서가 올 때까지 기다려야 하는 시간(0이면 즉시),
+        거부되면 다시 시도할 수 있을 때까지의 시간입니다.
+        """
+        if not self.enabled:
+            return True, 0.0
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get(key_hash)
+            if bucket is None:
+                if len(self._buckets) >= MAX_IDLE_BUCKETS:
+                    self._sweep(now)
+                bucket = self._buckets[key_hash] = _Bucket(self.burst)
+            self._refill(bucket, now)
+
+            wait = max(0.0, (1 - bucket.tokens) / self.rate)
+            if wait > self.max_wait:
+                self.rejected += 1
+                # 이 시간 뒤에 다시 요청하면 최대 대기 시간 안에 허용됨
+                return False, wait - self.max_wait
+            bucket.tokens -= cost
+            if wait:
+                self.queued += 1
+            else:
+                self.admitted += 1
+            return True, wait
+
+    def admit(self, key_hash, cost=1):
+        """요청을 허용할 때까지 기다립니다. 허용되면 None, 거부되면 Retry-After(초)를 반환합니다."""
+        admitted, seconds = self.reserve(key_hash, cost)
+        if not admitted:
+            return seconds
+        if seconds:
+            time.sleep(seconds)
+        return None
+
+    async def admit_async(self, key_hash, cost=1):
+        """admit()의 비동기 버전. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        admitted, seconds = self.reserve(key_hash, cost)
+        if not admitted:
+            return seconds
+        if seconds:
+            await asyncio.sleep(seconds)
+        return None
+
+    def stats(self):
+        """허용 제어 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'rate': self.rate,
+                'burst': self.burst,
+                'max_wait': self.max_wait,
+                'keys': len(self._buckets),
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+            }
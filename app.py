@@ -5,13 +5,34 @@
 Flask를 사용한 웹 인터페이스
 """
 
+import io
 import os
 import sys
 import json
+import time
+import functools
+import ipaddress
+import textwrap
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-from openai import OpenAI
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, stream_with_context
+from jinja2 import TemplateNotFound
+
+import admission
+import history
+import http_cache
+import jobs
+import llm_cache
+import metrics
+import config_diff
+import ipam
+import openai_pool
+import port_layout
+import preflight
+import rate_limiter
+import resilience
+import template_registry
+import zip_stream
 
 # Windows 콘솔 인코딩 설정
 if sys.platform == 'win32':
@@ -40,36 +61,196 @@ SUPPORTED_VENDORS = {
 DEFAULT_CONFIGS = {
     'cisco': {
         'mgmt_vlan': 100,
-        'mgmt_interface': 'Gi1/0/1',
-        'gateway': '192.168.10.254'
+        'mgmt_interface': 'Gi1/0/1'
     },
     'arista': {
         'mgmt_vlan': 100,
-        'mgmt_interface': 'Management1',
-        'gateway': '192.168.10.254'
+        'mgmt_interface': 'Management1'
     },
     'alcatel': {
         'mgmt_vlan': 100,
-        'mgmt_interface': '1/1/1',
-        'gateway': '192.168.10.254'
+        'mgmt_interface': '1/1/1'
     },
     'hp': {
         'mgmt_vlan': 100,
-        'mgmt_interface': '1',
-        'gateway': '192.168.10.254'
+        'mgmt_interface': '1'
     },
     'juniper': {
         'mgmt_vlan': 100,
-        'mgmt_interface': 'ge-0/0/0',
-        'gateway': '192.168.10.254'
+        'mgmt_interface': 'ge-0/0/0'
     },
     'fortinet': {
-        'mgmt_port': 'port1',
-        'gateway': '192.168.10.254'
+        'mgmt_port': 'port1'
     }
 }
 
 
+# ChatGPT 모델
+OPENAI_MODEL = "gpt-4o-mini"
+
+# 생성 모드
+# - standard: 요구사항 분석 호출 후 설정 생성 호출 (2회)
+# - single_call: 분석 결과와 설정 스크립트를 하나의 JSON 응답으로 생성 (1회)
+# - hybrid: 기본 설정은 템플릿으로 렌더링하고 추가 설정(VLAN, 인터페이스, 라우팅)만 ChatGPT로 생성
+GENERATION_MODES = ('standard', 'single_call', 'hybrid')
+
+# 생성 결과 캐시 (메모리 LRU + SQLite)
+generation_cache = llm_cache.GenerationCache()
+
+# API 키별 OpenAI 클라이언트 풀 (HTTP keep-alive 연결 공유)
+# 재시도는 rate_scheduler가 담당하므로 클라이언트 자체 재시도는 끔
+client_pool = openai_pool.OpenAIClientPool(max_retries=0)
+
+# API 키별 RPM/TPM 사용량 제한 스케줄러
+rate_scheduler = rate_limiter.RateLimitScheduler()
+
+# 느린 호출 헤지(중복 요청)와 서비스 장애 시 회로 차단
+# 회로가 열려 있는 동안에는 ChatGPT를 호출하지 않고 템플릿 기반 설정(generate_config)으로 대체
+hedger = resilience.Hedger()
+circuit_breaker = resilience.CircuitBreaker()
+
+# 같은 ChatGPT 호출이 동시에 진행되면 하나로 합침 (중복 클릭, 여러 운영자의 같은 장비 생성)
+in_flight = admission.SingleFlight()
+
+# API 키별 생성 요청 허용량 (토큰 버킷, 초과 시 잠시 대기 또는 429 + Retry-After)
+admission_controller = admission.AdmissionController()
+
+# 템플릿 기반 설정으로 대체하기 위해 요청(또는 로컬 주소 계획)에 있어야 하는 필드
+FALLBACK_REQUIRED_FIELDS = ('hostname', 'mgmt_ip')
+
+# 일괄 생성 설정
+BATCH_MAX_DEVICES = int(os.environ.get('BATCH_MAX_DEVICES', 200))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 8))
+
+# 다중 제조사 생성(fan-out) 모드
+# - template: 공통 주소 계획을 제조사별 템플릿으로 렌더링 (요구사항 분석 외에는 ChatGPT 미사용)
+# - hybrid, standard: 요구사항 분석은 한 번만 하고 제조사별 설정 생성 호출을 동시에 실행
+FANOUT_MODES = ('template', 'hybrid', 'standard')
+
+# 제조사마다 값이 달라 fan-out 요청에서는 vendor_overrides로만 지정하는 필드
+VENDOR_SPECIFIC_FIELDS = ('mgmt_interface', 'mgmt_port', 'layout')
+
+# 템플릿이 렌더링하지 않는 구조화된 요구사항(network) 항목 (template 모드 fan-out에서 거부)
+TEMPLATE_UNRENDERED_NETWORK_FIELDS = ('vlans', 'interfaces', 'routing')
+
+# 설정 생성 작업 큐
+job_queue = jobs.JobQueue()
+
+# 설정 생성 이력 (SQLite, /api/history로 조회)
+history_store = history.HistoryStore()
+
+# ChatGPT가 제안한 주소 계획을 로컬 IPAM으로 검증/수정할지 여부
+IPAM_CHECK_PLANS = os.environ.get('IPAM_CHECK_PLANS', '1').lower() not in ('0', 'false', 'no')
+
+# 묶음 다운로드(ZIP) 최대 파일 수
+BUNDLE_MAX_FILES = int(os.environ.get('BUNDLE_MAX_FILES', 1000))
+
+# 응답 압축 (gzip, brotli)
+response_compressor = http_cache.ResponseCompressor()
+
+# 제조사 기본값(/api/vendor-config)의 브라우저 캐시 시간 (초, 이후에는 ETag로 재검증)
+VENDOR_CONFIG_MAX_AGE = http_cache.DEFAULT_VENDOR_CONFIG_MAX_AGE
+
+# Prometheus 지표 (/metrics)
+STAGE_SECONDS = metrics.histogram(
+    'netconfig_stage_duration_seconds', '설정 생성 단계별 소요 시간 (초)', ('stage', 'vendor'))
+REQUEST_SECONDS = metrics.histogram(
+    'netconfig_http_request_duration_seconds',
+    'HTTP 요청 처리 시간 (초, 스트리밍 응답은 응답 시작까지)', ('endpoint', 'method', 'status'))
+LLM_TOKENS = metrics.counter(
+    'netconfig_llm_tokens_total', 'ChatGPT API 사용 토큰 수 (kind: prompt, completion, cached)', ('vendor', 'kind'))
+ERRORS = metrics.counter(
+    'netconfig_errors_total', '단계별 오류 수 (auth, rate_limit, parse 등)', ('stage', 'error_class'))
+CACHE_EVENTS = metrics.gauge(
+    'netconfig_llm_cache_events', '생성 결과 캐시 조회 결과 수 (프로세스 시작 이후)', ('result',))
+CACHE_HIT_RATIO = metrics.gauge('netconfig_llm_cache_hit_ratio', '생성 결과 캐시 적중률')
+JOB_QUEUE_ACTIVE = metrics.gauge('netconfig_job_queue_active', '대기 + 실행 중인 생성 작업 수')
+CLIENT_POOL_SIZE = metrics.gauge('netconfig_openai_pool_clients', '풀에 보관된 OpenAI 클라이언트 수')
+HEDGE_EVENTS = metrics.gauge(
+    'netconfig_llm_hedge_events', '헤지(중복) 요청 수 (result: sent, won / 프로세스 시작 이후)', ('result',))
+CIRCUIT_STATE = metrics.gauge(
+    'netconfig_openai_circuit_state', '회로 차단기 상태 (0: 닫힘, 0.5: 복구 확인 중, 1: 열림)')
+ADMISSION_EVENTS = metrics.gauge(
+    'netconfig_admission_events', 'API 키별 요청 허용 제어 결과 수 (result: admitted, queued, rejected)', ('result',))
+COALESCED_CALLS = metrics.gauge(
+    'netconfig_coalesced_requests', '진행 중인 같은 요청에 합쳐진 요청 수 (kind: llm_call, job)', ('kind',))
+HISTORY_RECORDS = metrics.gauge(
+    'netconfig_history_records', '생성 이력 기록 결과 수 (result: recorded, error, evicted / 프로세스 시작 이후)',
+    ('result',))
+HTTP_COMPRESSION = metrics.gauge(
+    'netconfig_http_compression', '응답 압축 결과 (kind: responses, bytes_in, bytes_out, cache_hits / 프로세스 시작 이후)',
+    ('kind',))
+FALLBACKS = metrics.counter(
+    'netconfig_template_fallbacks_total', 'ChatGPT 대신 템플릿 기반 설정으로 대체한 응답 수', ('vendor', 'reason'))
+
+
+def collect_runtime_metrics():
+    """캐시, 작업 큐, 클라이언트 풀 상태를 게이지에 반영합니다 (/metrics 출력 직전에 호출)."""
+    cache_stats = generation_cache.stats()
+    CACHE_EVENTS.set(cache_stats['memory_hits'], result='memory_hit')
+    CACHE_EVENTS.set(cache_stats['disk_hits'], result='disk_hit')
+    CACHE_EVENTS.set(cache_stats['misses'], result='miss')
+    CACHE_EVENTS.set(cache_stats['evictions'], result='eviction')
+    CACHE_HIT_RATIO.set(cache_stats['hit_ratio'])
+    JOB_QUEUE_ACTIVE.set(job_queue.stats()['active'])
+    CLIENT_POOL_SIZE.set(client_pool.stats()['clients'])
+    admission_stats = admission_controller.stats()
+    for result in ('admitted', 'queued', 'rejected'):
+        ADMISSION_EVENTS.set(admission_stats[result], result=result)
+    COALESCED_CALLS.set(in_flight.stats()['coalesced'], kind='llm_call')
+    COALESCED_CALLS.set(job_queue.stats()['coalesced'], kind='job')
+    hedge_stats = hedger.stats()
+    HEDGE_EVENTS.set(hedge_stats['hedged'], result='sent')
+    HEDGE_EVENTS.set(hedge_stats['hedges_won'], result='won')
+    CIRCUIT_STATE.set({resilience.CLOSED: 0, resilience.HALF_OPEN: 0.5, resilience.OPEN: 1}[circuit_breaker.state])
+    HISTORY_RECORDS.set(history_store.recorded, result='recorded')
+    HISTORY_RECORDS.set(history_store.errors, result='error')
+    HISTORY_RECORDS.set(history_store.evictions, result='evicted')
+    compression_stats = response_compressor.stats()
+    HTTP_COMPRESSION.set(compression_stats['compressed'], kind='responses')
+    HTTP_COMPRESSION.set(compression_stats['bytes_in'], kind='bytes_in')
+    HTTP_COMPRESSION.set(compression_stats['bytes_out'], kind='bytes_out')
+    HTTP_COMPRESSION.set(compression_stats['cache_hits'], kind='cache_hits')
+
+
+metrics.add_collector(collect_runtime_metrics)
+
+
+def timed_stage(stage):
+    """함수 실행 시간을 단계별 지표로 기록하는 데코레이터 (첫 번째 인수는 제조사)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(vendor, *args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage, vendor=vendor):
+                return func(vendor, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def metric_vendor(vendor):
+    """지표 레이블에 사용할 제조사 값을 반환합니다 (알 수 없는 값은 'other')."""
+    vendor = str(vendor or '').lower()
+    return vendor if vendor in SUPPORTED_VENDORS else 'other'
+
+
+def record_usage(vendor, usage):
+    """
+    ChatGPT 응답의 usage(토큰 수)를 제조사별 지표에 기록합니다.
+
+    프롬프트 캐시에 적중한 입력 토큰 수(prompt_tokens_details.cached_tokens)는 kind='cached'로 기록합니다
+    (prompt 토큰 수에 포함된 값).
+    """
+    if usage is None:
+        return
+    for kind in ('prompt', 'completion'):
+        tokens = getattr(usage, f'{kind}_tokens', None)
+        if tokens:
+            LLM_TOKENS.inc(tokens, vendor=vendor, kind=kind)
+    cached_tokens = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+    if cached_tokens:
+        LLM_TOKENS.inc(cached_tokens, vendor=vendor, kind='cached')
+
+
 def convert_mask_to_cidr(mask):
     """서브넷 마스크를 CIDR 표기법으로 변환합니다."""
     if '/' in mask:
@@ -88,17 +269,11 @@ def convert_mask_to_cidr(mask):
 
 
 def load_template(vendor, template_dir='config_templates'):
-    """Jinja2 템플릿을 로드합니다."""
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-    
-    template_filename = f"{vendor}_base.j2"
+    """Jinja2 템플릿을 로드합니다 (공유 레지스트리에서 컴파일된 템플릿 재사용)."""
+    template_filename = template_registry.template_filename(vendor)
     
     try:
-        template = env.get_template(template_filename)
+        template = template_registry.get_template(vendor, template_dir)
         return template
     except TemplateNotFound:
         raise ValueError(f"템플릿 파일 '{template_filename}'을 찾을 수 없습니다.")
@@ -124,28 +299,183 @@ def prepare_template_vars(vendor, form_data):
     if vendor in ['cisco', 'arista', 'alcatel', 'hp', 'juniper']:
         template_vars['mgmt_vlan'] = int(form_data.get('mgmt_vlan', defaults.get('mgmt_vlan', 100)))
         template_vars['mgmt_interface'] = form_data.get('mgmt_interface', defaults.get('mgmt_interface', ''))
-        template_vars['gateway'] = form_data.get('gateway', defaults.get('gateway', '192.168.10.254'))
     
     if vendor == 'fortinet':
         template_vars['mgmt_port'] = form_data.get('mgmt_port', defaults.get('mgmt_port', 'port1'))
     
+    # 기본 게이트웨이 (입력하거나 계획된 경우에만 기본 경로를 렌더링, hybrid 모드의 추가 설정에서는 생성하지 않음)
+    template_vars['gateway'] = str(form_data.get('gateway') or '').strip()
+    
+    # 포트 범위, VLAN 목록, 인터페이스 프로필 (요청 검증 시 형식 확인)
+    if form_data.get('layout'):
+        template_vars['layout'] = port_layout.parse_layout(form_data['layout'])
+    
     return template_vars
 
 
-def analyze_requirements_and_generate_ips(vendor, requirements, api_key):
-    """요구사항을 분석하여 IP 정보를 자동 생성합니다."""
+def create_completion(api_key, vendor='other', stage='completion', **params):
+    """
+    사용량 제한 스케줄러를 거쳐 chat.completions.create를 호출합니다.
+    
+    RPM/TPM 예산을 확보한 뒤 호출하며, 응답의 x-ratelimit-* 헤더로 예산을 보정하고
+    429 및 일시적인 오류는 지터가 적용된 백오프로 재시도합니다.
+    스트리밍이 아닌 호출은 최근 응답 시간의 p95보다 오래 걸리면 헤지 요청을 보내고 먼저 도착한 응답을 사용합니다.
+    (헤지는 예산 확보 이후의 HTTP 호출에만 적용되며, 예산이 바로 남아 있을 때만 중복 호출을 보냅니다.)
+    회로 차단기가 열려 있으면 호출하지 않고 resilience.CircuitOpenError를 발생시킵니다.
+    스트리밍 호출의 성공/실패는 스트림을 끝까지 읽은 쪽에서 회로 차단기에 기록해야 합니다 (consume_stream).
+    호출 시간, 사용 토큰 수, 오류 분류는 vendor/stage 레이블로 지표에 기록됩니다.
+    (스트리밍 호출은 응답 시작까지의 시간을 기록하며, 토큰 수는 스트림 소비 측에서 기록합니다.)
+    """
+    client = client_pool.get(api_key)
+    key_hash = openai_pool.hash_api_key(api_key)
+    estimated = rate_limiter.estimate_tokens(params.get('messages', []), params.get('max_tokens'))
+    
+    stream = params.get('stream', False)
+    
+    def call():
+        raw = client.chat.completions.with_raw_response.create(**params)
+        response = raw.parse()
+        usage = getattr(response, 'usage', None)
+        if not stream:
+            # 헤지 요청에서 버려지는 응답의 토큰도 과금되므로 호출마다 기록
+            record_usage(vendor, usage)
+        return response, raw.headers, getattr(usage, 'total_tokens', None)
+    
+    def hedged_call():
+        return hedger.call(stage, call, can_hedge=lambda: rate_scheduler.try_acquire(key_hash, estimated))
+    
+    with STAGE_SECONDS.time(stage=f"{stage}_{'first_byte' if stream else 'call'}", vendor=vendor):
+        try:
+            circuit_breaker.before_call()
+            response = rate_scheduler.call(key_hash, call if stream else hedged_call, estimated)
+        except Exception as e:
+            circuit_breaker.record_error(e)
+            ERRORS.inc(stage=stage, error_class=metrics.classify_error(e))
+            raise
+    
+    if not stream:
+        circuit_breaker.record_success()
+    return response
+
+
+def consume_stream(stream):
+    """
+    스트리밍 응답의 청크를 차례로 반환하고, 끝까지 읽으면 회로 차단기에 성공을 기록합니다.
+    
+    스트림 도중의 오류(연결 끊김, 타임아웃 등)는 장애로 기록합니다. 클라이언트가 중단하여
+    결과를 알 수 없으면 복구 확인 상태만 정리합니다.
+    """
+    settled = False
     try:
-        client = OpenAI(api_key=api_key)
-        vendor_name = SUPPORTED_VENDORS.get(vendor, vendor)
+        for chunk in stream:
+            yield chunk
+    except Exception as e:
+        settled = True
+        circuit_breaker.record_error(e)
+        raise
+    else:
+        settled = True
+        circuit_breaker.record_success()
+    finally:
+        if not settled:
+            circuit_breaker.release()
+
+
+def chat_completion(api_key, messages, temperature=0.3, max_tokens=4000,
+                    response_format=None, use_cache=True, vendor='other', stage='completion'):
+    """
+    ChatGPT API를 호출하여 응답 내용을 반환합니다.
+    
+    동일한 요청(모델, 메시지, temperature 등)은 캐시된 결과를 반환하여 토큰을 사용하지 않습니다.
+    같은 API 키의 같은 요청이 진행 중이면 새로 호출하지 않고 그 결과를 함께 받습니다 (캐시 사용 여부와 무관).
+    응답에 선택지가 없으면 None을 반환하며, API 오류는 예외로 전달됩니다.
+    """
+    params = {
+        'model': OPENAI_MODEL,
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+    }
+    if response_format:
+        params['response_format'] = response_format
+    
+    cache_key = generation_cache_key(api_key, params) if use_cache else None
+    if cache_key:
+        cached = generation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    def call():
+        response = create_completion(api_key, vendor=vendor, stage=stage, **params)
         
-        analysis_prompt = f"""당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 
-사용자의 요구사항을 분석하여 필요한 네트워크 정보(IP 주소, 서브넷, VLAN, 인터페이스 등)를 자동으로 생성해주세요.
+        if not response or not response.choices or len(response.choices) == 0:
+            return None
+        
+        content = (response.choices[0].message.content or '').strip()
+        
+        if cache_key and content and is_cacheable_content(content, response_format):
+            generation_cache.set(cache_key, content)
+        
+        return content
+    
+    return in_flight.do(flight_key(api_key, params), call)
 
-사용자 요구사항:
-{requirements}
 
-다음 형식으로 JSON을 반환해주세요 (설명 없이 JSON만):
-{{
+def generation_cache_key(api_key, params):
+    """생성 결과 캐시 키 (API 키별로 구분하여, 캐시된 결과는 같은 API 키의 요청에만 반환)"""
+    return llm_cache.make_key(params, scope=openai_pool.hash_api_key(api_key))
+
+
+def flight_key(api_key, params):
+    """진행 중인 호출을 합칠 때 사용할 키 (API 키별로 구분하여 각 사용자의 키로 인증과 사용량 제한을 받음)"""
+    return f"{openai_pool.hash_api_key(api_key)}:{llm_cache.make_key(params)}"
+
+
+def request_key(data):
+    """생성 요청 본문(API 키 포함)으로 작업 중복 확인용 키를 만듭니다."""
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return llm_cache.make_key({'request': payload})
+
+
+def admit_request(api_key, cost=1):
+    """
+    API 키별 요청 허용량을 확인합니다 (허용량을 넘으면 순서가 올 때까지 잠시 기다림).
+    
+    cost는 요청이 사용하는 허용량입니다 (일괄 생성은 장비 수).
+    허용되면 None을, 거부되면 429 응답(Retry-After 포함)을 반환합니다.
+    """
+    retry_after = admission_controller.admit(openai_pool.hash_api_key(api_key), cost)
+    if retry_after is None:
+        return None
+    seconds = int(retry_after) + 1
+    response = jsonify({
+        'success': False,
+        'error': f'요청이 너무 많습니다. {seconds}초 후 다시 시도해주세요.',
+        'retry_after': seconds
+    })
+    response.headers['Retry-After'] = str(seconds)
+    return response, 429
+
+
+def is_cacheable_content(content, response_format=None):
+    """JSON 응답을 요청한 경우 파싱 가능한 결과만 캐시합니다."""
+    if response_format and response_format.get('type') == 'json_object':
+        try:
+            json.loads(content)
+        except json.JSONDecodeError:
+            return False
+    return True
+
+
+def use_cache_for(form_data):
+    """요청별 캐시 우회 플래그(no_cache)를 확인합니다."""
+    return not form_data.get('no_cache')
+
+
+# 프롬프트 버전 (정적 프리픽스의 내용을 바꾸면 올림)
+PROMPT_VERSION = 4
+
+ANALYSIS_JSON_FORMAT = """{
     "hostname": "생성된 호스트명",
     "mgmt_ip": "관리 IP 주소",
     "mgmt_mask": "서브넷 마스크 (예: 255.255.255.0)",
@@ -153,302 +483,1230 @@ def analyze_requirements_and_generate_ips(vendor, requirements, api_key):
     "mgmt_interface": "관리 인터페이스명",
     "gateway": "기본 게이트웨이 IP",
     "additional_configs": [
-        {{
+        {
             "type": "vlan",
             "vlan_id": VLAN ID,
             "name": "VLAN 이름",
             "ip": "IP 주소",
             "subnet": "서브넷 마스크"
-        }},
-        {{
+        },
+        {
             "type": "interface",
             "name": "인터페이스명",
             "ip": "IP 주소",
             "subnet": "서브넷 마스크",
             "description": "설명"
-        }},
-        {{
+        },
+        {
             "type": "routing",
             "protocol": "프로토콜명 (OSPF, EIGRP 등)",
             "network": "네트워크 주소",
             "area": "OSPF Area (해당되는 경우)"
-        }}
+        }
+    ]
+}"""
+
+
+def config_rules(vendor_name):
+    """설정 스크립트 생성 규칙 목록을 반환합니다."""
+    return [
+        f"\n생성 요구사항:",
+        f"1. {vendor_name} 장비의 표준 CLI 명령어 형식을 정확히 사용하세요.",
+        f"2. 호스트명, 관리 IP, 서브넷 마스크 설정을 포함하세요.",
+        f"3. 관리 인터페이스/VLAN 설정을 포함하세요.",
+        f"4. 기본 게이트웨이 설정을 포함하세요 (해당되는 경우).",
+        f"5. 요구사항에 명시된 모든 VLAN, 인터페이스, 라우팅 설정을 포함하세요.",
+        f"6. 주석은 '!' 또는 '#' 기호를 사용하세요.",
+        f"7. 실제 장비에 적용 가능한 정확한 명령어만 생성하세요.",
+        f"8. 불필요한 설명이나 마크다운 형식 없이 순수 CLI 명령어만 출력하세요.",
+        f"9. 모든 인터페이스를 활성화(no shutdown)하세요.",
+        f"10. 완전하고 실행 가능한 전체 설정 스크립트를 생성하세요.",
     ]
-}}
+
+
+def analysis_prefix(vendor_name):
+    """요구사항 분석 프롬프트의 정적 프리픽스"""
+    return f"""당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 사용자 요구사항을 분석하여 필요한 네트워크 정보를 JSON 형식으로 생성합니다.
+사용자의 요구사항을 분석하여 필요한 네트워크 정보(IP 주소, 서브넷, VLAN, 인터페이스 등)를 자동으로 생성해주세요.
+
+다음 형식으로 JSON을 반환해주세요 (설명 없이 JSON만):
+{ANALYSIS_JSON_FORMAT}
 
 요구사항에서 명시되지 않은 정보는 적절한 기본값을 생성하세요.
-IP 주소는 사설 IP 대역(10.x.x.x, 192.168.x.x, 172.16-31.x.x)을 사용하세요."""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 사용자 요구사항을 분석하여 필요한 네트워크 정보를 JSON 형식으로 생성합니다."
-                },
-                {
-                    "role": "user",
-                    "content": analysis_prompt
-                }
-            ],
-            temperature=0.3,
-            max_tokens=2000,
-            response_format={"type": "json_object"}
-        )
-        
-        if not response or not response.choices or len(response.choices) == 0:
-            return None, "ChatGPT API 응답이 비어있습니다."
-        
-        response_content = response.choices[0].message.content.strip()
-        if not response_content:
-            return None, "ChatGPT API 응답 내용이 비어있습니다."
-        
-        try:
+IP 주소는 사설 IP 대역(10.x.x.x, 192.168.x.x, 172.16-31.x.x)을 사용하세요.
+사용자 요구사항은 다음 메시지로 전달됩니다."""
+
+
+def config_prefix(vendor_name):
+    """설정 스크립트 생성 프롬프트의 정적 프리픽스"""
+    return "\n".join([
+        f"당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 사용자가 제공한 정보와 요구사항을 바탕으로 완전하고 정확한 CLI 설정 스크립트를 생성합니다.",
+        f"다음 메시지의 장비 정보(기본 장비 정보, 사용자 요구사항, 생성된 네트워크 구성)를 바탕으로 {vendor_name} 네트워크 장비의 완전한 설정 스크립트를 생성해주세요.",
+        *config_rules(vendor_name),
+    ])
+
+
+def single_call_prefix(vendor_name):
+    """single_call 모드 프롬프트의 정적 프리픽스"""
+    plan_format = textwrap.indent(ANALYSIS_JSON_FORMAT, '    ').lstrip()
+    return "\n".join([
+        f"당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 사용자 요구사항을 분석하여 네트워크 구성 계획과 CLI 설정 스크립트를 하나의 JSON으로 생성합니다.",
+        f"다음 메시지의 사용자 요구사항을 분석하여 {vendor_name} 네트워크 장비의 네트워크 구성 계획(plan)과 완전한 설정 스크립트(config)를 한 번에 생성해주세요.",
+        f"\n다음 형식으로 JSON을 반환해주세요 (설명 없이 JSON만):",
+        "{\n"
+        f'    "plan": {plan_format},\n'
+        '    "config": "plan의 값을 그대로 사용한 전체 CLI 설정 스크립트 (줄바꿈은 \\n)"\n'
+        "}",
+        f"\nplan에서 요구사항에 명시되지 않은 정보는 적절한 기본값을 생성하세요.",
+        f"IP 주소는 사설 IP 대역(10.x.x.x, 192.168.x.x, 172.16-31.x.x)을 사용하세요.",
+        f"config는 plan의 호스트명, 관리 IP, VLAN, 인터페이스, 라우팅 정보와 정확히 일치해야 합니다.",
+        *config_rules(vendor_name),
+    ])
+
+
+def delta_prefix(vendor_name):
+    """hybrid 모드 추가 설정 프롬프트의 정적 프리픽스"""
+    return "\n".join([
+        f"당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 이미 생성된 기본 설정에 추가할 CLI 명령어만 생성합니다.",
+        f"{vendor_name} 네트워크 장비의 기본 설정(호스트명, 관리 VLAN/인터페이스, 관리 IP, 기본 게이트웨이)은 이미 생성되어 있습니다.",
+        f"다음 메시지의 추가 구성과 사용자 요구사항에 해당하는 설정 명령어만 생성해주세요.",
+        f"\n생성 요구사항:",
+        f"1. {vendor_name} 장비의 표준 CLI 명령어 형식을 정확히 사용하세요.",
+        f"2. 호스트명, 관리 VLAN, 관리 인터페이스, 관리 IP, 기본 게이트웨이 설정은 절대 포함하지 마세요.",
+        f"3. 추가 구성과 요구사항에 명시된 VLAN, 인터페이스, 라우팅 설정만 포함하세요.",
+        f"4. 주석은 '!' 또는 '#' 기호를 사용하세요.",
+        f"5. 불필요한 설명이나 마크다운 형식 없이 순수 CLI 명령어만 출력하세요.",
+        f"6. 모든 인터페이스를 활성화(no shutdown)하세요.",
+    ])
+
+
+# 프롬프트 종류별 정적 프리픽스 생성 함수
+PROMPT_PREFIXES = {
+    'analysis': analysis_prefix,
+    'config': config_prefix,
+    'single_call': single_call_prefix,
+    'delta': delta_prefix,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def static_prefix(kind, vendor):
+    """
+    제조사와 프롬프트 종류별 정적 프리픽스(시스템 메시지)를 반환합니다.
+
+    장비별 값은 모두 마지막 사용자 메시지에 넣으므로, 같은 제조사·종류의 요청은 항상 같은 프리픽스로 시작하여
+    OpenAI의 프롬프트 캐시(앞부분이 일치하는 입력 토큰 재사용)에 적중합니다.
+    프리픽스 내용을 바꾸면 PROMPT_VERSION을 올리세요.
+    """
+    return PROMPT_PREFIXES[kind](SUPPORTED_VENDORS.get(vendor, vendor))
+
+
+def prompt_messages(kind, vendor, variable_parts):
+    """정적 프리픽스(시스템 메시지) 뒤에 장비별 값(사용자 메시지)을 붙인 메시지 목록을 구성합니다."""
+    return [
+        {
+            "role": "system",
+            "content": static_prefix(kind, vendor)
+        },
+        {
+            "role": "user",
+            "content": "\n".join(variable_parts)
+        }
+    ]
+
+
+def build_analysis_messages(vendor, requirements):
+    """요구사항 분석을 위한 ChatGPT 메시지 목록을 구성합니다."""
+    return prompt_messages('analysis', vendor, [f"사용자 요구사항:\n{requirements}"])
+
+
+# 단계별 ChatGPT 호출 옵션 (app.py, async_app.py, 스트리밍 생성이 공유)
+COMPLETION_OPTIONS = {
+    'analysis': {'temperature': 0.3, 'max_tokens': 2000, 'response_format': {"type": "json_object"}},
+    'single_call': {'temperature': 0.3, 'max_tokens': 5000, 'response_format': {"type": "json_object"}},
+    'config': {'temperature': 0.3, 'max_tokens': 4000},
+    'delta': {'temperature': 0.3, 'max_tokens': 2000},
+}
+
+
+def print_exception(e):
+    """예외의 traceback을 출력합니다 (스레드 풀에서 처리하는 경우에도 예외 객체의 traceback을 사용)."""
+    import traceback
+    traceback.print_exception(type(e), e, e.__traceback__)
+
+
+def parse_analysis_response(vendor, response_content):
+    """요구사항 분석 응답을 검사하고 JSON으로 파싱합니다. 반환값: (IP 정보, 오류 메시지)"""
+    if response_content is None:
+        return None, "ChatGPT API 응답이 비어있습니다."
+    
+    if not response_content:
+        return None, "ChatGPT API 응답 내용이 비어있습니다."
+    
+    try:
+        with STAGE_SECONDS.time(stage='analysis_parse', vendor=vendor):
             ip_info = json.loads(response_content)
-        except json.JSONDecodeError as e:
-            print(f"JSON 파싱 오류: {e}")
-            print(f"응답 내용: {response_content[:500]}")  # 처음 500자만 출력
-            return None, f"IP 정보 파싱 오류: {str(e)}. 응답 형식이 올바르지 않습니다."
+    except json.JSONDecodeError as e:
+        ERRORS.inc(stage='analysis', error_class='parse')
+        print(f"JSON 파싱 오류: {e}")
+        print(f"응답 내용: {response_content[:500]}")  # 처음 500자만 출력
+        return None, f"IP 정보 파싱 오류: {str(e)}. 응답 형식이 올바르지 않습니다."
+    
+    return ip_info, None
+
+
+def analysis_error(e):
+    """서비스 장애가 아닌 요구사항 분석 오류를 (None, 오류 메시지)로 반환합니다."""
+    error_msg = str(e)
+    print(f"요구사항 분석 오류: {error_msg}")
+    print_exception(e)
+    return None, f"요구사항 분석 오류: {error_msg}"
+
+
+@timed_stage('analysis')
+def analyze_requirements_and_generate_ips(vendor, requirements, api_key, use_cache=True):
+    """요구사항을 분석하여 IP 정보를 자동 생성합니다."""
+    try:
+        with STAGE_SECONDS.time(stage='analysis_prompt', vendor=vendor):
+            messages = build_analysis_messages(vendor, requirements)
         
-        return ip_info, None
+        response_content = chat_completion(
+            api_key, messages, use_cache=use_cache, vendor=vendor, stage='analysis',
+            **COMPLETION_OPTIONS['analysis']
+        )
+        return parse_analysis_response(vendor, response_content)
         
     except Exception as e:
-        error_msg = str(e)
-        print(f"요구사항 분석 오류: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return None, f"요구사항 분석 오류: {error_msg}"
+        # 서비스 장애는 호출 측(plan_addresses)에서 템플릿 대체 여부를 판단하도록 전달
+        if resilience.is_upstream_failure(e):
+            raise
+        return analysis_error(e)
 
 
-def generate_config_with_chatgpt(vendor, form_data, api_key):
-    """ChatGPT API를 사용하여 설정 파일을 생성합니다."""
+def apply_ip_info(form_data, ip_info):
+    """요구사항 분석 결과(IP 정보)로 form_data를 업데이트합니다."""
+    form_data['hostname'] = ip_info.get('hostname', form_data.get('hostname', ''))
+    form_data['mgmt_ip'] = ip_info.get('mgmt_ip', form_data.get('mgmt_ip', ''))
+    form_data['mgmt_mask'] = ip_info.get('mgmt_mask', form_data.get('mgmt_mask', '255.255.255.0'))
+    form_data['mgmt_vlan'] = ip_info.get('mgmt_vlan', form_data.get('mgmt_vlan', 100))
+    form_data['mgmt_interface'] = ip_info.get('mgmt_interface', form_data.get('mgmt_interface', ''))
+    form_data['gateway'] = ip_info.get('gateway') or form_data.get('gateway') or ''
+    form_data['_generated_ip_info'] = ip_info  # 추가 정보 저장
+
+
+def ipam_defaults(vendor, form_data):
+    """IPAM 계획에 사용할 관리 VLAN/인터페이스 기본값 (요청 값 우선)을 반환합니다."""
+    defaults = dict(DEFAULT_CONFIGS.get(vendor, {}))
+    for field in ('mgmt_vlan', 'mgmt_interface'):
+        if form_data.get(field):
+            defaults[field] = form_data[field]
+    return defaults
+
+
+def plan_addresses(vendor, form_data, api_key, use_cache=True):
+    """
+    장비의 주소 계획(IP 정보)을 준비합니다.
+    
+    - 구조화된 요구사항(network)이 있으면 로컬 IPAM으로 계획하여 ChatGPT 분석 호출을 생략합니다.
+    - 자연어 요구사항만 있으면 ChatGPT로 분석한 뒤, IPAM으로 겹치거나 사설 주소 풀 밖에 있는 주소를 고칩니다.
+    
+    반환값: (IP 정보, 오류 메시지). 계획할 내용이 없으면 IP 정보는 None입니다.
+    분석 호출이 서비스 장애로 실패하면 form_data['_upstream_error']에 오류 분류를 기록합니다.
+    """
+    planned = local_plan(vendor, form_data)
+    if planned is not None:
+        return planned
+    
     try:
-        client = OpenAI(api_key=api_key)
-        
-        vendor_name = SUPPORTED_VENDORS.get(vendor, vendor)
-        requirements = form_data.get('requirements', '').strip()
-        
-        # 요구사항이 있는 경우 IP 정보 자동 생성
-        if requirements:
-            ip_info, error = analyze_requirements_and_generate_ips(vendor, requirements, api_key)
-            if error:
-                return None, error
-            
-            # 생성된 IP 정보로 form_data 업데이트
-            form_data['hostname'] = ip_info.get('hostname', form_data.get('hostname', ''))
-            form_data['mgmt_ip'] = ip_info.get('mgmt_ip', form_data.get('mgmt_ip', ''))
-            form_data['mgmt_mask'] = ip_info.get('mgmt_mask', form_data.get('mgmt_mask', '255.255.255.0'))
-            form_data['mgmt_vlan'] = ip_info.get('mgmt_vlan', form_data.get('mgmt_vlan', 100))
-            form_data['mgmt_interface'] = ip_info.get('mgmt_interface', form_data.get('mgmt_interface', ''))
-            form_data['gateway'] = ip_info.get('gateway', form_data.get('gateway', '192.168.10.254'))
-            form_data['_generated_ip_info'] = ip_info  # 추가 정보 저장
-        
-        hostname = form_data.get('hostname', '')
-        mgmt_ip = form_data.get('mgmt_ip', '')
-        mgmt_mask = form_data.get('mgmt_mask', '255.255.255.0')
-        
-        # 제조사별 프롬프트 구성
-        prompt_parts = [
-            f"다음 정보를 바탕으로 {vendor_name} 네트워크 장비의 완전한 설정 스크립트를 생성해주세요.",
-            f"\n기본 장비 정보:",
-            f"- 호스트명: {hostname}",
-            f"- 관리 IP 주소: {mgmt_ip}",
-            f"- 서브넷 마스크: {mgmt_mask}",
-        ]
-        
-        # 제조사별 추가 정보
-        if vendor in ['cisco', 'arista', 'alcatel', 'hp', 'juniper']:
-            mgmt_vlan = form_data.get('mgmt_vlan', DEFAULT_CONFIGS[vendor].get('mgmt_vlan', 100))
-            mgmt_interface = form_data.get('mgmt_interface', DEFAULT_CONFIGS[vendor].get('mgmt_interface', ''))
-            gateway = form_data.get('gateway', DEFAULT_CONFIGS[vendor].get('gateway', '192.168.10.254'))
-            
-            prompt_parts.extend([
-                f"- 관리 VLAN ID: {mgmt_vlan}",
-                f"- 관리 인터페이스: {mgmt_interface}",
-                f"- 기본 게이트웨이: {gateway}",
-            ])
-        elif vendor == 'fortinet':
-            mgmt_port = form_data.get('mgmt_port', DEFAULT_CONFIGS[vendor].get('mgmt_port', 'port1'))
-            prompt_parts.append(f"- 관리 포트: {mgmt_port}")
-        
-        # 요구사항이 있는 경우 추가 정보 포함
-        if requirements:
-            prompt_parts.append(f"\n사용자 요구사항:\n{requirements}")
-            
-            if '_generated_ip_info' in form_data:
-                ip_info = form_data['_generated_ip_info']
-                if ip_info.get('additional_configs'):
-                    prompt_parts.append("\n생성된 네트워크 구성:")
-                    for config in ip_info['additional_configs']:
-                        if config['type'] == 'vlan':
-                            prompt_parts.append(f"- VLAN {config.get('vlan_id')} ({config.get('name', '')}): {config.get('ip')}/{config.get('subnet', '255.255.255.0')}")
-                        elif config['type'] == 'interface':
-                            prompt_parts.append(f"- 인터페이스 {config.get('name')}: {config.get('ip')}/{config.get('subnet', '255.255.255.0')} - {config.get('description', '')}")
-                        elif config['type'] == 'routing':
-                            prompt_parts.append(f"- 라우팅 프로토콜: {config.get('protocol')} - 네트워크: {config.get('network')}")
+        ip_info, error = analyze_requirements_and_generate_ips(
+            vendor, form_data['requirements'].strip(), api_key, use_cache)
+    except Exception as e:
+        return analysis_failed(form_data, e)
+    if error:
+        return None, error
+    
+    return check_analysis_plan(vendor, ip_info), None
+
+
+def local_plan(vendor, form_data):
+    """
+    ChatGPT 분석 없이 준비할 수 있는 주소 계획을 반환합니다 (미리 계획된 값, 구조화된 요구사항, 요구사항 없음).
+    
+    반환값: (IP 정보, 오류 메시지). 자연어 요구사항을 ChatGPT로 분석해야 하면 None입니다.
+    """
+    # 일괄 생성에서 미리 계획한 경우 (장비 간 주소가 겹치지 않도록 순서대로 할당됨)
+    if form_data.get('_ipam_plan'):
+        return form_data['_ipam_plan'], None
+    
+    if form_data.get('network') is not None:
+        try:
+            with STAGE_SECONDS.time(stage='ipam_plan', vendor=vendor):
+                ip_info = ipam.plan_network(
+                    form_data['network'],
+                    hostname=form_data.get('hostname'),
+                    defaults=ipam_defaults(vendor, form_data)
+                )
+            return ip_info, None
+        except ipam.IPAMError as e:
+            return None, f"주소 계획 오류: {str(e)}"
+    
+    if not form_data.get('requirements', '').strip():
+        return None, None
+    return None
+
+
+def analysis_failed(form_data, e):
+    """분석 호출의 서비스 장애를 form_data['_upstream_error']에 기록하고 (None, 오류 메시지)를 반환합니다."""
+    print(f"요구사항 분석 오류: {str(e)}")
+    form_data['_upstream_error'] = metrics.classify_error(e)
+    return None, f"요구사항 분석 오류: {str(e)}"
+
+
+def check_analysis_plan(vendor, ip_info):
+    """ChatGPT가 분석한 주소 계획을 IPAM으로 검증하여, 겹치거나 주소 풀 밖에 있는 주소를 고칩니다."""
+    if IPAM_CHECK_PLANS and isinstance(ip_info, dict):
+        try:
+            with STAGE_SECONDS.time(stage='ipam_check', vendor=vendor):
+                ip_info, corrections = ipam.check_plan(ip_info)
+        except Exception as e:
+            print(f"주소 계획 검증 오류: {e}")
+        else:
+            if corrections:
+                print(f"주소 계획 수정 ({len(corrections)}건): {'; '.join(corrections)}")
+                ip_info['ipam_corrections'] = corrections
+    return ip_info
+
+
+def build_config_messages(vendor, form_data):
+    """설정 스크립트 생성을 위한 ChatGPT 메시지 목록을 구성합니다."""
+    requirements = form_data.get('requirements', '').strip()
+    
+    # 장비별 값 (정적 프리픽스 뒤에 붙음)
+    prompt_parts = device_info_lines(vendor, form_data)
+    
+    # 요구사항이 있는 경우 추가 정보 포함
+    if requirements:
+        prompt_parts.append(f"\n사용자 요구사항:\n{requirements}")
+    
+    # 요구사항 분석 또는 IPAM으로 생성된 네트워크 구성 포함
+    if '_generated_ip_info' in form_data:
+        ip_info = form_data['_generated_ip_info']
+        if ip_info.get('additional_configs'):
+            prompt_parts.append("\n생성된 네트워크 구성:")
+            prompt_parts.extend(network_config_lines(ip_info['additional_configs']))
+    
+    prompt_parts.append(f"\n설정 스크립트:")
+    
+    return prompt_messages('config', vendor, prompt_parts)
+
+
+def device_info_lines(vendor, form_data):
+    """설정 생성 프롬프트의 기본 장비 정보 목록을 만듭니다."""
+    hostname = form_data.get('hostname', '')
+    mgmt_ip = form_data.get('mgmt_ip', '')
+    mgmt_mask = form_data.get('mgmt_mask', '255.255.255.0')
+    
+    prompt_parts = [
+        f"기본 장비 정보:",
+        f"- 호스트명: {hostname}",
+        f"- 관리 IP 주소: {mgmt_ip}",
+        f"- 서브넷 마스크: {mgmt_mask}",
+    ]
+    
+    # 제조사별 추가 정보
+    if vendor in ['cisco', 'arista', 'alcatel', 'hp', 'juniper']:
+        mgmt_vlan = form_data.get('mgmt_vlan', DEFAULT_CONFIGS[vendor].get('mgmt_vlan', 100))
+        mgmt_interface = form_data.get('mgmt_interface', DEFAULT_CONFIGS[vendor].get('mgmt_interface', ''))
         
         prompt_parts.extend([
-            f"\n생성 요구사항:",
-            f"1. {vendor_name} 장비의 표준 CLI 명령어 형식을 정확히 사용하세요.",
-            f"2. 호스트명, 관리 IP, 서브넷 마스크 설정을 포함하세요.",
-            f"3. 관리 인터페이스/VLAN 설정을 포함하세요.",
-            f"4. 기본 게이트웨이 설정을 포함하세요 (해당되는 경우).",
-            f"5. 요구사항에 명시된 모든 VLAN, 인터페이스, 라우팅 설정을 포함하세요.",
-            f"6. 주석은 '!' 또는 '#' 기호를 사용하세요.",
-            f"7. 실제 장비에 적용 가능한 정확한 명령어만 생성하세요.",
-            f"8. 불필요한 설명이나 마크다운 형식 없이 순수 CLI 명령어만 출력하세요.",
-            f"9. 모든 인터페이스를 활성화(no shutdown)하세요.",
-            f"10. 완전하고 실행 가능한 전체 설정 스크립트를 생성하세요.",
-            f"\n설정 스크립트:",
+            f"- 관리 VLAN ID: {mgmt_vlan}",
+            f"- 관리 인터페이스: {mgmt_interface}",
         ])
-        
-        prompt = "\n".join(prompt_parts)
-        
-        # ChatGPT API 호출
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"당신은 {vendor_name} 네트워크 장비 설정 전문가입니다. 사용자가 제공한 정보와 요구사항을 바탕으로 완전하고 정확한 CLI 설정 스크립트를 생성합니다."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=4000
-            )
-            
-            if not response or not response.choices or len(response.choices) == 0:
-                return None, "ChatGPT API 응답이 비어있습니다."
-            
-            config_content = response.choices[0].message.content.strip()
-            
-            if not config_content:
-                return None, "ChatGPT API 응답 내용이 비어있습니다."
-            
-            # 마크다운 코드 블록 제거 (있는 경우)
-            if config_content.startswith("```"):
-                lines = config_content.split("\n")
-                # 첫 번째와 마지막 코드 블록 라인 제거
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                config_content = "\n".join(lines)
-            
-            return config_content, None
-            
-        except Exception as api_error:
-            error_msg = str(api_error)
-            print(f"ChatGPT API 호출 오류: {error_msg}")
-            import traceback
-            traceback.print_exc()
-            
-            # API 키 관련 오류인지 확인
-            if "api" in error_msg.lower() or "key" in error_msg.lower() or "401" in error_msg or "403" in error_msg:
-                return None, f"ChatGPT API 키 오류: {error_msg}. API 키를 확인해주세요."
-            elif "rate limit" in error_msg.lower() or "429" in error_msg:
-                return None, f"ChatGPT API 사용량 초과: {error_msg}. 잠시 후 다시 시도해주세요."
+    elif vendor == 'fortinet':
+        mgmt_port = form_data.get('mgmt_port', DEFAULT_CONFIGS[vendor].get('mgmt_port', 'port1'))
+        prompt_parts.append(f"- 관리 포트: {mgmt_port}")
+    
+    # 기본 게이트웨이는 입력하거나 계획된 경우에만 전달 (없으면 기본 경로를 만들지 않음)
+    gateway = str(form_data.get('gateway') or '').strip()
+    if gateway:
+        prompt_parts.append(f"- 기본 게이트웨이: {gateway}")
+    return prompt_parts
+
+
+def network_config_lines(additional_configs):
+    """추가 구성(additional_configs)을 설정 생성 프롬프트의 목록 형식으로 변환합니다."""
+    lines = []
+    for config in additional_configs:
+        if config['type'] == 'vlan':
+            if config.get('ip'):
+                lines.append(f"- VLAN {config.get('vlan_id')} ({config.get('name', '')}): {config.get('ip')}/{config.get('subnet', '255.255.255.0')}")
             else:
-                return None, f"ChatGPT API 오류: {error_msg}"
-        
-    except Exception as e:
-        error_msg = str(e)
-        print(f"설정 생성 함수 오류: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return None, f"설정 생성 오류: {error_msg}"
+                lines.append(f"- VLAN {config.get('vlan_id')} ({config.get('name', '')})")
+        elif config['type'] == 'interface':
+            lines.append(f"- 인터페이스 {config.get('name')}: {config.get('ip')}/{config.get('subnet', '255.255.255.0')} - {config.get('description', '')}")
+        elif config['type'] == 'routing':
+            lines.append(f"- 라우팅 프로토콜: {config.get('protocol')} - 네트워크: {config.get('network')}")
+    return lines
 
 
-def generate_config(vendor, form_data):
-    """템플릿 기반 설정 파일을 생성합니다 (백업용)."""
-    try:
-        # 템플릿 로드
-        template = load_template(vendor)
+def strip_code_fence(config_content):
+    """마크다운 코드 블록 표시(```)를 제거합니다 (있는 경우)."""
+    config_content = config_content.strip()
+    if config_content.startswith("```"):
+        lines = config_content.split("\n")
+        # 첫 번째와 마지막 코드 블록 라인 제거
+        if lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        config_content = "\n".join(lines)
+    return config_content
+
+
+class CodeFenceStripper:
+    """
+    스트리밍 응답에서 마크다운 코드 블록 표시(```)를 제거합니다.
+    
+    완성된 줄 단위로 내보내며, 닫는 코드 블록일 수 있는 줄(``` 또는 빈 줄)은
+    뒤에 내용이 이어질 때까지 보류합니다. 결과는 strip_code_fence와 동일한 규칙을 따릅니다.
+    """
+    
+    def __init__(self):
+        self._buffer = ''
+        self._started = False  # 첫 번째 비어있지 않은 줄을 받았는지
+        self._fenced = False   # 응답이 ```로 시작했는지
+        self._held = []        # 보류 중인 줄
+    
+    def _process_line(self, line):
+        if not self._started:
+            if not line.strip():
+                return ''
+            self._started = True
+            line = line.lstrip()
+            if line.startswith("```"):
+                self._fenced = True
+                return ''
+            return line + '\n'
         
-        # 템플릿 변수 준비
-        template_vars = prepare_template_vars(vendor, form_data)
+        if not line.strip() or (self._fenced and line.startswith("```")):
+            self._held.append(line)
+            return ''
         
-        # 템플릿 렌더링
-        config_content = template.render(**template_vars)
+        output = ''.join(held + '\n' for held in self._held) + line + '\n'
+        self._held = []
+        return output
+    
+    def feed(self, text):
+        """수신한 토큰을 추가하고, 내보낼 수 있는 완성된 줄을 반환합니다."""
+        self._buffer += text
+        output = []
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            output.append(self._process_line(line))
+        return ''.join(output)
+    
+    def finish(self):
+        """스트림 종료 시 남은 내용을 반환합니다."""
+        output = self._process_line(self._buffer) if self._buffer else ''
+        self._buffer = ''
         
-        return config_content, None
-    except Exception as e:
-        return None, str(e)
+        held = self._held
+        self._held = []
+        while held and not held[-1].strip():
+            held.pop()
+        if self._fenced and held and held[-1].startswith("```"):
+            held.pop()
+        return output + ''.join(line + '\n' for line in held)
 
 
-@app.route('/')
-def index():
-    """메인 페이지"""
-    return render_template('index.html', vendors=SUPPORTED_VENDORS)
+def describe_api_error(error_msg):
+    """ChatGPT API 오류 메시지를 사용자용 메시지로 변환합니다."""
+    # API 키 관련 오류인지 확인
+    if "api" in error_msg.lower() or "key" in error_msg.lower() or "401" in error_msg or "403" in error_msg:
+        return f"ChatGPT API 키 오류: {error_msg}. API 키를 확인해주세요."
+    elif "rate limit" in error_msg.lower() or "429" in error_msg:
+        return f"ChatGPT API 사용량 초과: {error_msg}. 잠시 후 다시 시도해주세요."
+    else:
+        return f"ChatGPT API 오류: {error_msg}"
 
 
-@app.route('/api/generate', methods=['POST'])
-def api_generate():
-    """설정 파일 생성 API"""
+def build_single_call_messages(vendor, form_data):
+    """요구사항 분석과 설정 생성을 한 번에 요청하는 ChatGPT 메시지 목록을 구성합니다 (single_call 모드)."""
+    requirements = form_data.get('requirements', '').strip()
+    return prompt_messages('single_call', vendor, [f"사용자 요구사항:\n{requirements}"])
+
+
+def _is_ipv4(value):
     try:
-        # JSON 파싱
+        ipaddress.IPv4Address(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def validate_ip_info(ip_info):
+    """네트워크 구성 계획(IP 정보)의 형식을 검증합니다. 오류가 없으면 None을 반환합니다."""
+    for field in ('mgmt_ip', 'gateway'):
+        value = ip_info.get(field)
+        if value and not _is_ipv4(value):
+            return f"{field} 값이 올바른 IPv4 주소가 아닙니다: {value}"
+    
+    mask = ip_info.get('mgmt_mask')
+    if mask:
         try:
-            data = request.get_json()
-            if data is None:
-                return jsonify({
-                    'success': False,
-                    'error': '요청 데이터가 없습니다.'
-                }), 400
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': f'요청 데이터 파싱 오류: {str(e)}'
-            }), 400
-        
-        # API 키 검증
-        api_key = data.get('api_key', '').strip()
-        if not api_key:
-            return jsonify({
-                'success': False,
-                'error': 'ChatGPT API 키가 필요합니다.'
-            }), 400
-        
-        vendor = data.get('vendor', '').lower()
-        if vendor not in SUPPORTED_VENDORS:
-            return jsonify({
-                'success': False,
-                'error': f'지원하지 않는 제조사입니다: {vendor}'
-            }), 400
-        
-        # 요구사항이 없는 경우에만 필수 필드 검증
-        requirements = data.get('requirements', '').strip()
-        if not requirements:
-            required_fields = ['hostname', 'mgmt_ip', 'mgmt_mask']
-            for field in required_fields:
-                if not data.get(field):
-                    return jsonify({
-                        'success': False,
-                        'error': f'필수 필드가 누락되었습니다: {field} (또는 설정 요구사항을 입력하세요)'
-                    }), 400
-        else:
-            # 요구사항이 있는 경우 호스트명만 필수
-            if not data.get('hostname'):
-                data['hostname'] = 'Device-01'  # 기본값 설정
+            ipaddress.IPv4Network(f"0.0.0.0/{str(mask).lstrip('/')}")
+        except ValueError:
+            return f"mgmt_mask 값이 올바른 서브넷 마스크가 아닙니다: {mask}"
+    
+    vlan = ip_info.get('mgmt_vlan')
+    if vlan is not None:
+        try:
+            vlan = int(vlan)
+        except (TypeError, ValueError):
+            return f"mgmt_vlan 값이 숫자가 아닙니다: {vlan}"
+        if not 1 <= vlan <= 4094:
+            return f"mgmt_vlan 값이 범위(1-4094)를 벗어났습니다: {vlan}"
+    
+    additional_configs = ip_info.get('additional_configs', [])
+    if not isinstance(additional_configs, list):
+        return "additional_configs는 목록이어야 합니다."
+    for config in additional_configs:
+        if not isinstance(config, dict) or 'type' not in config:
+            return f"additional_configs 항목에 type이 없습니다: {config}"
+    
+    return None
+
+
+def parse_single_call_response(response_content):
+    """
+    single_call 모드 응답을 파싱하고 검증합니다.
+    
+    반환값: (IP 정보, 설정 내용, 오류 메시지)
+    """
+    try:
+        result = json.loads(response_content)
+    except json.JSONDecodeError as e:
+        print(f"JSON 파싱 오류: {e}")
+        print(f"응답 내용: {response_content[:500]}")  # 처음 500자만 출력
+        return None, None, f"응답 파싱 오류: {str(e)}. 응답 형식이 올바르지 않습니다."
+    
+    if not isinstance(result, dict):
+        return None, None, "응답 형식이 올바르지 않습니다. JSON 객체가 필요합니다."
+    
+    ip_info = result.get('plan')
+    config_content = result.get('config')
+    
+    if not isinstance(ip_info, dict):
+        return None, None, "응답에 네트워크 구성 계획(plan)이 없습니다."
+    if not isinstance(config_content, str) or not config_content.strip():
+        return None, None, "응답에 설정 스크립트(config)가 없습니다."
+    
+    error = validate_ip_info(ip_info)
+    if error:
+        return None, None, f"네트워크 구성 계획 검증 오류: {error}"
+    
+    return ip_info, strip_code_fence(config_content), None
+
+
+@timed_stage('single_call')
+def generate_config_single_call(vendor, form_data, api_key):
+    """요구사항 분석과 설정 생성을 한 번의 ChatGPT 호출로 처리합니다 (single_call 모드)."""
+    with STAGE_SECONDS.time(stage='single_call_prompt', vendor=vendor):
+        messages = build_single_call_messages(vendor, form_data)
+    
+    try:
+        response_content = chat_completion(
+            api_key, messages, use_cache=use_cache_for(form_data), vendor=vendor, stage='single_call',
+            **COMPLETION_OPTIONS['single_call']
+        )
+    except Exception as api_error:
+        return api_error_result(vendor, form_data, api_key, api_error)
+    
+    return apply_single_call_response(vendor, form_data, response_content)
+
+
+def apply_single_call_response(vendor, form_data, response_content):
+    """single_call 모드 응답을 파싱하여 form_data에 주소 계획을 반영하고 (설정 내용, 오류 메시지)를 반환합니다."""
+    if response_content is None:
+        return None, "ChatGPT API 응답이 비어있습니다."
+    if not response_content:
+        return None, "ChatGPT API 응답 내용이 비어있습니다."
+    
+    with STAGE_SECONDS.time(stage='single_call_parse', vendor=vendor):
+        ip_info, config_content, error = parse_single_call_response(response_content)
+    if error:
+        ERRORS.inc(stage='single_call', error_class='parse')
+        return None, error
+    
+    # 설정 스크립트가 이미 계획의 주소로 생성되었으므로 IPAM 검증 결과는 경고로만 전달
+    if IPAM_CHECK_PLANS:
+        try:
+            _, corrections = ipam.check_plan(ip_info)
+        except Exception as e:
+            print(f"주소 계획 검증 오류: {e}")
+        else:
+            if corrections:
+                ip_info['ipam_warnings'] = corrections
+    
+    # 2단계 방식과 동일하게 생성된 IP 정보로 form_data 업데이트
+    apply_ip_info(form_data, ip_info)
+    
+    if not config_content:
+        return None, "ChatGPT API 응답 내용이 비어있습니다."
+    
+    return config_content, None
+
+
+def get_additional_configs(form_data):
+    """분석 결과 또는 요청에 포함된 추가 구성(additional_configs) 목록을 반환합니다."""
+    ip_info = form_data.get('_generated_ip_info') or {}
+    return ip_info.get('additional_configs') or form_data.get('additional_configs') or []
+
+
+def needs_delta(form_data):
+    """hybrid 모드에서 템플릿 외에 ChatGPT로 생성할 추가 설정이 있는지 확인합니다."""
+    return bool(form_data.get('requirements', '').strip()) or bool(get_additional_configs(form_data))
+
+
+def build_delta_messages(vendor, form_data):
+    """hybrid 모드: 템플릿 기본 설정 뒤에 붙일 추가 설정만 요청하는 ChatGPT 메시지 목록을 구성합니다."""
+    requirements = form_data.get('requirements', '').strip()
+    additional_configs = get_additional_configs(form_data)
+    
+    prompt_parts = []
+    if additional_configs:
+        prompt_parts.append(f"추가 구성 (JSON):\n{json.dumps(additional_configs, ensure_ascii=False, indent=2)}")
+    if requirements:
+        prompt_parts.append(("\n" if prompt_parts else "") + f"사용자 요구사항:\n{requirements}")
+    prompt_parts.append(f"\n추가 설정 스크립트:")
+    
+    return prompt_messages('delta', vendor, prompt_parts)
+
+
+def merge_hybrid_config(base_config, delta_config):
+    """템플릿 기본 설정과 ChatGPT가 생성한 추가 설정을 합칩니다."""
+    delta_config = delta_config.strip()
+    if not delta_config:
+        return base_config
+    return f"{base_config.rstrip()}\n{delta_config}"
+
+
+def render_hybrid_base(vendor, form_data):
+    """hybrid 모드의 템플릿 기본 설정을 렌더링합니다. 반환값: (기본 설정, 오류 메시지)"""
+    base_config, error = generate_config(vendor, form_data)
+    if error:
+        return None, f"템플릿 렌더링 오류: {error}"
+    return base_config, None
+
+
+def delta_response_result(base_config, delta_config):
+    """hybrid 모드의 추가 설정 응답을 기본 설정과 합쳐 (설정 내용, 오류 메시지)를 반환합니다."""
+    if delta_config is None:
+        return None, "ChatGPT API 응답이 비어있습니다."
+    return merge_hybrid_config(base_config, strip_code_fence(delta_config)), None
+
+
+@timed_stage('hybrid')
+def generate_config_hybrid(vendor, form_data, api_key, use_cache=True):
+    """hybrid 모드: 기본 설정은 템플릿으로 렌더링하고, 추가 설정만 ChatGPT로 생성합니다."""
+    base_config, error = render_hybrid_base(vendor, form_data)
+    if error:
+        return None, error
+    
+    # 추가 구성이 없으면 ChatGPT를 호출하지 않음
+    if not needs_delta(form_data):
+        return base_config, None
+    
+    with STAGE_SECONDS.time(stage='delta_prompt', vendor=vendor):
+        messages = build_delta_messages(vendor, form_data)
+    
+    try:
+        delta_config = chat_completion(
+            api_key, messages, use_cache=use_cache, vendor=vendor, stage='delta',
+            **COMPLETION_OPTIONS['delta']
+        )
+    except Exception as api_error:
+        # 서비스 장애이면 추가 설정 없이 템플릿 기본 설정만 반환
+        return api_error_result(vendor, form_data, api_key, api_error, base_config=base_config)
+    
+    return delta_response_result(base_config, delta_config)
+
+
+def needs_chatgpt(form_data):
+    """ChatGPT 호출이 필요한 요청인지 확인합니다 (hybrid 모드는 요구사항이나 추가 구성이 있을 때만 호출)."""
+    return form_data.get('mode') != 'hybrid' or needs_delta(form_data)
+
+
+def chatgpt_unavailable(form_data):
+    """ChatGPT 호출이 필요한데 회로 차단기가 열려 있으면 True (호출하지 않고 템플릿 기반 설정으로 대체)"""
+    return needs_chatgpt(form_data) and circuit_breaker.is_open()
+
+
+def circuit_open_result(vendor, form_data, api_key):
+    """회로 차단기가 열려 있을 때의 (템플릿 기반 설정, 오류 메시지)를 반환합니다."""
+    config_content = generate_fallback_config(vendor, form_data, api_key, 'circuit_open')
+    if config_content is None:
+        return None, str(resilience.CircuitOpenError(circuit_breaker.retry_after()))
+    return config_content, None
+
+
+def planning_error_result(vendor, form_data, api_key, error):
+    """주소 계획 실패를 (설정 내용, 오류 메시지)로 반환합니다. 분석 호출의 서비스 장애이면 템플릿 기반 설정으로 대체합니다."""
+    if form_data.get('_upstream_error'):
+        config_content = generate_fallback_config(vendor, form_data, api_key, form_data['_upstream_error'])
+        if config_content is not None:
+            return config_content, None
+    return None, error
+
+
+def api_error_result(vendor, form_data, api_key, api_error, base_config=None):
+    """
+    ChatGPT 호출 예외를 (설정 내용, 오류 메시지)로 반환합니다.
+    
+    서비스 장애(타임아웃, 연결 오류, 5xx)이면 템플릿 기반 설정(hybrid 모드는 base_config)으로 대체하고,
+    그 밖의 오류는 사용자용 오류 메시지로 바꿉니다.
+    """
+    error_msg = str(api_error)
+    print(f"ChatGPT API 호출 오류: {error_msg}")
+    if resilience.is_upstream_failure(api_error):
+        config_content = generate_fallback_config(vendor, form_data, api_key, metrics.classify_error(api_error),
+                                                  base_config=base_config)
+        if config_content is not None:
+            return config_content, None
+    print_exception(api_error)
+    return None, describe_api_error(error_msg)
+
+
+def config_response_result(config_content):
+    """설정 생성 응답을 검사하여 (설정 내용, 오류 메시지)를 반환합니다."""
+    if config_content is None:
+        return None, "ChatGPT API 응답이 비어있습니다."
+    
+    if not config_content:
+        return None, "ChatGPT API 응답 내용이 비어있습니다."
+    
+    return strip_code_fence(config_content), None
+
+
+def generate_fallback_config(vendor, form_data, api_key, reason, base_config=None):
+    """
+    ChatGPT를 사용할 수 없을 때 템플릿 기반 설정(generate_config)으로 대체합니다.
+    
+    구조화된 요구사항(network)은 로컬 IPAM으로 계획하며, 이미 렌더링한 기본 설정(base_config)이 있으면 그대로 사용합니다.
+    자연어 요구사항만 있어 관리 주소를 알 수 없거나 렌더링에 실패하면 None을 반환합니다.
+    대체한 경우 form_data['_fallback']에 사유(circuit_open, timeout 등)를 기록합니다.
+    """
+    if base_config is None:
+        if '_generated_ip_info' not in form_data and (
+                form_data.get('_ipam_plan') or form_data.get('network') is not None):
+            ip_info, error = plan_addresses(vendor, form_data, api_key)
+            if error:
+                return None
+            apply_ip_info(form_data, ip_info)
         
-        # 제조사별 필수 필드 검증
-        if vendor in ['cisco', 'arista', 'alcatel', 'hp', 'juniper']:
-            if not data.get('mgmt_vlan') and not DEFAULT_CONFIGS[vendor].get('mgmt_vlan'):
-                return jsonify({
-                    'success': False,
-                    'error': f'{SUPPORTED_VENDORS[vendor]} 장비는 관리 VLAN이 필요합니다.'
-                }), 400
+        if not all(form_data.get(field) for field in FALLBACK_REQUIRED_FIELDS):
+            return None
+        
+        base_config, error = generate_config(vendor, form_data)
+        if error:
+            print(f"템플릿 대체 렌더링 오류: {error}")
+            return None
+    
+    form_data['_fallback'] = reason
+    FALLBACKS.inc(vendor=vendor, reason=reason)
+    print(f"ChatGPT를 사용할 수 없어 템플릿 기반 설정으로 대체합니다 ({reason}).")
+    return base_config
+
+
+def fallback_fields(form_data):
+    """템플릿 기반 설정으로 대체한 응답에 추가할 필드를 반환합니다."""
+    reason = form_data.get('_fallback')
+    return {'fallback': True, 'fallback_reason': reason} if reason else {}
+
+
+def generation_model(form_data):
+    """설정 생성에 사용한 ChatGPT 모델을 반환합니다 (템플릿으로만 생성한 경우 None)."""
+    if form_data.get('_fallback') or form_data.get('mode') == 'template':
+        return None
+    if form_data.get('mode') == 'hybrid' and not needs_delta(form_data):
+        return None
+    return OPENAI_MODEL
+
+
+def record_history(vendor, form_data, config_content, source, input_hash, started):
+    """생성 결과를 이력 저장소에 기록하고 이력 id를 반환합니다 (기록에 실패하면 None)."""
+    return history_store.record(
+        form_data.get('hostname'), vendor, config_content, source, input_hash,
+        mode=form_data.get('mode') or 'standard',
+        model=generation_model(form_data),
+        elapsed=time.perf_counter() - started,
+        fallback=form_data.get('_fallback')
+    )
+
+
+def is_single_call(form_data):
+    """요구사항이 있고 single_call 모드가 요청되었는지 확인합니다 (구조화된 요구사항은 IPAM으로 계획)."""
+    return (bool(form_data.get('requirements', '').strip()) and form_data.get('mode') == 'single_call'
+            and form_data.get('network') is None)
+
+
+@timed_stage('generate')
+def generate_config_with_chatgpt(vendor, form_data, api_key):
+    """
+    ChatGPT API를 사용하여 설정 파일을 생성합니다.
+    
+    회로 차단기가 열려 있거나 호출이 서비스 장애(타임아웃, 연결 오류, 5xx)로 실패하면
+    템플릿 기반 설정으로 대체합니다 (form_data['_fallback']에 사유 기록).
+    """
+    try:
+        # ChatGPT 장애 중에는 호출하지 않고 바로 템플릿 기반 설정으로 대체
+        if chatgpt_unavailable(form_data):
+            return circuit_open_result(vendor, form_data, api_key)
+        
+        # 단일 호출 모드: 분석과 설정 생성을 한 번에
+        if is_single_call(form_data):
+            return generate_config_single_call(vendor, form_data, api_key)
+        
+        use_cache = use_cache_for(form_data)
+        
+        # 요구사항이 있는 경우 IP 정보 자동 생성 (구조화된 요구사항은 로컬 IPAM)
+        ip_info, error = plan_addresses(vendor, form_data, api_key, use_cache)
+        if error:
+            return planning_error_result(vendor, form_data, api_key, error)
+        if ip_info is not None:
+            # 생성된 IP 정보로 form_data 업데이트
+            apply_ip_info(form_data, ip_info)
         
-        if vendor == 'fortinet':
-            if not data.get('mgmt_port') and not DEFAULT_CONFIGS[vendor].get('mgmt_port'):
+        # 하이브리드 모드: 템플릿 기본 설정 + 추가 설정만 ChatGPT로 생성
+        if form_data.get('mode') == 'hybrid':
+            return generate_config_hybrid(vendor, form_data, api_key, use_cache)
+        
+        with STAGE_SECONDS.time(stage='config_prompt', vendor=vendor):
+            messages = build_config_messages(vendor, form_data)
+        
+        # ChatGPT API 호출
+        try:
+            config_content = chat_completion(
+                api_key, messages, use_cache=use_cache, vendor=vendor, stage='config',
+                **COMPLETION_OPTIONS['config']
+            )
+        except Exception as api_error:
+            return api_error_result(vendor, form_data, api_key, api_error)
+        
+        return config_response_result(config_content)
+        
+    except Exception as e:
+        error_msg = str(e)
+        print(f"설정 생성 함수 오류: {error_msg}")
+        import traceback
+        traceback.print_exc()
+        return None, f"설정 생성 오류: {error_msg}"
+
+
+def fallback_events(vendor, form_data, config_content, meta=True, delta=True):
+    """템플릿 기반 설정으로 대체한 결과의 스트리밍 이벤트를 생성합니다 (이미 보낸 meta/delta는 생략)."""
+    if meta:
+        yield 'meta', {
+            'vendor': SUPPORTED_VENDORS[vendor],
+            'hostname': form_data.get('hostname'),
+            'generated_ip_info': form_data.get('_generated_ip_info')
+        }
+    if delta:
+        yield 'delta', {'text': config_content}
+    yield 'done', {
+        'config': config_content,
+        'vendor': SUPPORTED_VENDORS[vendor],
+        'hostname': form_data.get('hostname'),
+        **fallback_fields(form_data)
+    }
+
+
+def stream_config_with_chatgpt(vendor, form_data, api_key):
+    """
+    ChatGPT 스트리밍 API로 설정 파일을 생성합니다.
+    
+    (이벤트 이름, 데이터) 튜플을 순서대로 생성합니다:
+    - meta: 분석이 끝난 장비 정보 (호스트명, 생성된 IP 정보)
+    - delta: 코드 블록 표시가 제거된 설정 내용 조각
+    - done: 완성된 전체 설정 내용
+    - error: 오류 메시지
+    
+    회로 차단기가 열려 있거나, 설정 내용을 보내기 전에 호출이 서비스 장애(타임아웃, 연결 오류, 5xx)로
+    실패하면 generate_config_with_chatgpt와 같이 템플릿 기반 설정을 한 번에 전송합니다 (done에 fallback 표시).
+    """
+    try:
+        # ChatGPT 장애 중에는 호출하지 않고 바로 템플릿 기반 설정으로 대체
+        if chatgpt_unavailable(form_data):
+            config_content, error = circuit_open_result(vendor, form_data, api_key)
+            if error:
+                yield 'error', {'error': error}
+                return
+            yield from fallback_events(vendor, form_data, config_content)
+            return
+        
+        # 단일 호출 모드는 JSON 응답이므로 완성된 결과를 한 번에 전송
+        if is_single_call(form_data):
+            config_content, error = generate_config_single_call(vendor, form_data, api_key)
+            if error:
+                yield 'error', {'error': error}
+                return
+            yield 'meta', {
+                'vendor': SUPPORTED_VENDORS[vendor],
+                'hostname': form_data.get('hostname'),
+                'generated_ip_info': form_data.get('_generated_ip_info')
+            }
+            yield 'delta', {'text': config_content}
+            yield 'done', {
+                'config': config_content,
+                'vendor': SUPPORTED_VENDORS[vendor],
+                'hostname': form_data.get('hostname'),
+                **fallback_fields(form_data)
+            }
+            return
+        
+        use_cache = use_cache_for(form_data)
+        
+        ip_info, error = plan_addresses(vendor, form_data, api_key, use_cache)
+        if error:
+            config_content, error = planning_error_result(vendor, form_data, api_key, error)
+            if error:
+                yield 'error', {'error': error}
+                return
+            yield from fallback_events(vendor, form_data, config_content)
+            return
+        if ip_info is not None:
+            apply_ip_info(form_data, ip_info)
+        
+        yield 'meta', {
+            'vendor': SUPPORTED_VENDORS[vendor],
+            'hostname': form_data.get('hostname'),
+            'generated_ip_info': form_data.get('_generated_ip_info')
+        }
+        
+        # 하이브리드 모드: 템플릿 기본 설정을 먼저 전송하고 추가 설정만 스트리밍
+        base_config = None
+        if form_data.get('mode') == 'hybrid':
+            base_config, error = render_hybrid_base(vendor, form_data)
+            if error:
+                yield 'error', {'error': error}
+                return
+            
+            if not needs_delta(form_data):
+                yield 'delta', {'text': base_config}
+                yield 'done', {
+                    'config': base_config,
+                    'vendor': SUPPORTED_VENDORS[vendor],
+                    'hostname': form_data.get('hostname')
+                }
+                return
+            
+            yield 'delta', {'text': base_config.rstrip() + '\n'}
+            stage = 'delta'
+            with STAGE_SECONDS.time(stage='delta_prompt', vendor=vendor):
+                messages = build_delta_messages(vendor, form_data)
+        else:
+            stage = 'config'
+            with STAGE_SECONDS.time(stage='config_prompt', vendor=vendor):
+                messages = build_config_messages(vendor, form_data)
+        
+        def finalize(content):
+            content = strip_code_fence(content)
+            if base_config is not None:
+                return merge_hybrid_config(base_config, content)
+            return content
+        
+        params = {
+            'model': OPENAI_MODEL,
+            'messages': messages,
+            **COMPLETION_OPTIONS[stage],
+        }
+        
+        # 캐시된 결과가 있으면 한 번에 전송
+        cache_key = generation_cache_key(api_key, params) if use_cache else None
+        cached = generation_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            yield 'delta', {'text': strip_code_fence(cached)}
+            yield 'done', {
+                'config': finalize(cached),
+                'vendor': SUPPORTED_VENDORS[vendor],
+                'hostname': form_data.get('hostname'),
+                'cached': True
+            }
+            return
+        
+        raw_parts = []
+        try:
+            stream_start = time.perf_counter()
+            stream = create_completion(
+                api_key, vendor=vendor, stage=stage, stream=True,
+                stream_options={'include_usage': True}, **params
+            )
+            
+            stripper = CodeFenceStripper()
+            for chunk in consume_stream(stream):
+                # 마지막 청크에 전체 사용 토큰 수가 포함됨 (include_usage)
+                record_usage(vendor, getattr(chunk, 'usage', None))
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if not token:
+                    continue
+                raw_parts.append(token)
+                text = stripper.feed(token)
+                if text:
+                    yield 'delta', {'text': text}
+            
+            text = stripper.finish()
+            if text:
+                yield 'delta', {'text': text}
+            STAGE_SECONDS.observe(time.perf_counter() - stream_start, stage=f'{stage}_stream', vendor=vendor)
+        
+        except Exception as api_error:
+            ERRORS.inc(stage=f'{stage}_stream', error_class=metrics.classify_error(api_error))
+            error_msg = str(api_error)
+            print(f"ChatGPT API 스트리밍 오류: {error_msg}")
+            if not raw_parts and resilience.is_upstream_failure(api_error):
+                # 생성된 내용을 보내기 전이면 템플릿 기반 설정으로 대체 (hybrid는 이미 보낸 기본 설정만 사용)
+                config_content = generate_fallback_config(vendor, form_data, api_key,
+                                                          metrics.classify_error(api_error),
+                                                          base_config=base_config)
+                if config_content is not None:
+                    yield from fallback_events(vendor, form_data, config_content,
+                                               meta=False, delta=base_config is None)
+                    return
+            import traceback
+            traceback.print_exc()
+            yield 'error', {'error': describe_api_error(error_msg)}
+            return
+        
+        raw_content = ''.join(raw_parts).strip()
+        config_content = finalize(raw_content)
+        if not config_content:
+            yield 'error', {'error': "ChatGPT API 응답 내용이 비어있습니다."}
+            return
+        
+        if cache_key:
+            generation_cache.set(cache_key, raw_content)
+        
+        yield 'done', {
+            'config': config_content,
+            'vendor': SUPPORTED_VENDORS[vendor],
+            'hostname': form_data.get('hostname')
+        }
+    
+    except Exception as e:
+        error_msg = str(e)
+        print(f"설정 생성 함수 오류: {error_msg}")
+        import traceback
+        traceback.print_exc()
+        yield 'error', {'error': f"설정 생성 오류: {error_msg}"}
+
+
+@timed_stage('template')
+def generate_config(vendor, form_data):
+    """템플릿 기반 설정 파일을 생성합니다 (백업용)."""
+    try:
+        # 템플릿 로드
+        with STAGE_SECONDS.time(stage='template_load', vendor=vendor):
+            template = load_template(vendor)
+        
+        # 템플릿 변수 준비
+        template_vars = prepare_template_vars(vendor, form_data)
+        
+        # 템플릿 렌더링
+        with STAGE_SECONDS.time(stage='template_render', vendor=vendor):
+            config_content = template.render(**template_vars)
+        
+        return config_content, None
+    except Exception as e:
+        ERRORS.inc(stage='template', error_class=metrics.classify_error(e))
+        return None, str(e)
+
+
+@app.before_request
+def start_request_timer():
+    """요청 처리 시간 측정을 시작합니다."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """엔드포인트별 요청 처리 시간을 지표에 기록합니다."""
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+    return response
+
+
+@app.after_request
+def finalize_http_response(response):
+    """정적 파일의 캐시 헤더를 설정하고, 클라이언트가 지원하면 응답을 압축합니다."""
+    if request.endpoint == 'static':
+        filename = request.view_args.get('filename') if request.view_args else None
+        version = request.args.get('v')
+        versioned = bool(version) and version == http_cache.static_version(app.static_folder, filename)
+        http_cache.static_cache_control(response, versioned)
+    return response_compressor.compress_response(response, request.headers.get('Accept-Encoding'))
+
+
+@app.url_defaults
+def add_static_version(endpoint, values):
+    """정적 파일 URL에 내용 해시(?v=)를 붙입니다. 파일이 바뀌면 URL이 바뀌므로 브라우저가 오래 캐시할 수 있습니다."""
+    if endpoint == 'static' and 'v' not in values and values.get('filename'):
+        version = http_cache.static_version(app.static_folder, values['filename'])
+        if version:
+            values['v'] = version
+
+
+@app.route('/')
+def index():
+    """메인 페이지"""
+    return render_template('index.html', vendors=SUPPORTED_VENDORS)
+
+
+def strip_internal_fields(data):
+    """
+    밑줄로 시작하는 내부 필드(_ipam_plan, _generated_ip_info 등)를 제거합니다.
+    
+    내부 필드는 서버가 검증 후 채우는 값이므로, 클라이언트가 보낸 값은 사용하지 않습니다.
+    """
+    for key in [key for key in data if isinstance(key, str) and key.startswith('_')]:
+        del data[key]
+
+
+def validate_generate_request(data):
+    """
+    설정 생성 요청 데이터를 검증합니다.
+    
+    반환값: (api_key, vendor, 오류 메시지). 검증에 성공하면 오류 메시지는 None입니다.
+    """
+    strip_internal_fields(data)
+    
+    # API 키 검증
+    api_key = data.get('api_key', '').strip()
+    if not api_key:
+        return None, None, 'ChatGPT API 키가 필요합니다.'
+    
+    vendor = data.get('vendor', '').lower()
+    if vendor not in SUPPORTED_VENDORS:
+        return None, None, f'지원하지 않는 제조사입니다: {vendor}'
+    
+    mode = data.get('mode') or 'standard'
+    if mode not in GENERATION_MODES:
+        return None, None, f'지원하지 않는 생성 모드입니다: {mode}'
+    
+    error = validate_plan_fields(vendor, data)
+    if error:
+        return None, None, error
+    
+    # 포트 레이아웃은 템플릿으로 렌더링하므로 hybrid 모드에서만 사용
+    if data.get('layout') is not None and mode != 'hybrid':
+        return None, None, '포트 레이아웃(layout)은 hybrid 모드 또는 /api/render에서 사용할 수 있습니다.'
+    
+    error = validate_device_fields(vendor, data)
+    if error:
+        return None, None, error
+    
+    return api_key, vendor, None
+
+
+def validate_plan_fields(vendor, data):
+    """주소 계획에 필요한 필드(구조화된 요구사항 또는 필수 필드)를 검증합니다. 오류가 없으면 None을 반환합니다."""
+    # 구조화된 요구사항(network)은 로컬 IPAM으로 계획할 수 있는지 미리 확인
+    network = data.get('network')
+    if network is not None:
+        try:
+            ipam.plan_network(network, hostname=data.get('hostname'), defaults=ipam_defaults(vendor, data))
+        except ipam.IPAMError as e:
+            return f'주소 계획 오류: {str(e)}'
+    
+    # 요구사항이 없는 경우에만 필수 필드 검증
+    requirements = data.get('requirements', '').strip()
+    if network is not None:
+        if not data.get('hostname'):
+            data['hostname'] = 'Device-01'  # 기본값 설정
+    elif not requirements:
+        required_fields = ['hostname', 'mgmt_ip', 'mgmt_mask']
+        for field in required_fields:
+            if not data.get(field):
+                return f'필수 필드가 누락되었습니다: {field} (또는 설정 요구사항을 입력하세요)'
+    else:
+        # 요구사항이 있는 경우 호스트명만 필수
+        if not data.get('hostname'):
+            data['hostname'] = 'Device-01'  # 기본값 설정
+    
+    return None
+
+
+def validate_device_fields(vendor, data):
+    """제조사별 필수 필드, 주소 값, 포트 레이아웃을 검증합니다. 오류가 없으면 None을 반환합니다."""
+    # 제조사별 필수 필드 검증
+    if vendor in ['cisco', 'arista', 'alcatel', 'hp', 'juniper']:
+        if not data.get('mgmt_vlan') and not DEFAULT_CONFIGS[vendor].get('mgmt_vlan'):
+            return f'{SUPPORTED_VENDORS[vendor]} 장비는 관리 VLAN이 필요합니다.'
+    
+    if vendor == 'fortinet':
+        if not data.get('mgmt_port') and not DEFAULT_CONFIGS[vendor].get('mgmt_port'):
+            return 'Fortinet 장비는 관리 포트가 필요합니다.'
+    
+    # 입력된 주소 값의 형식과 일관성 검증 (마스크 연속성, 게이트웨이 위치, VLAN 범위 등)
+    address_errors = preflight.check_device(data)
+    if address_errors:
+        return address_errors[0]
+    
+    layout = data.get('layout')
+    if layout is not None:
+        # 웹 요청에서는 서버의 파일 경로를 참조하지 않도록 객체만 허용
+        if not isinstance(layout, dict):
+            return '포트 레이아웃(layout)은 JSON 객체여야 합니다.'
+        try:
+            port_layout.parse_layout(layout)
+        except port_layout.LayoutError as e:
+            return f'포트 레이아웃 오류: {str(e)}'
+    
+    return None
+
+
+def sse_event(event, data):
+    """Server-Sent Events 형식의 메시지를 생성합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/generate', methods=['POST'])
+def api_generate():
+    """설정 파일 생성 API"""
+    try:
+        # JSON 파싱
+        try:
+            data = request.get_json()
+            if data is None:
                 return jsonify({
                     'success': False,
-                    'error': 'Fortinet 장비는 관리 포트가 필요합니다.'
+                    'error': '요청 데이터가 없습니다.'
                 }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': f'요청 데이터 파싱 오류: {str(e)}'
+            }), 400
+        
+        api_key, vendor, error = validate_generate_request(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        rejected = admit_request(api_key)
+        if rejected:
+            return rejected
+        
+        started = time.perf_counter()
+        input_hash = history.input_hash(data)
         
         # ChatGPT API를 사용하여 설정 생성
         try:
@@ -456,10 +1714,16 @@ def api_generate():
             
             if error:
                 print(f"ChatGPT API 오류: {error}")  # 디버깅용
-                return jsonify({
+                response = jsonify({
                     'success': False,
                     'error': error
-                }), 500
+                })
+                # 회로 차단기가 열려 있고 템플릿으로 대체할 수도 없는 경우
+                retry_after = circuit_breaker.retry_after()
+                if retry_after:
+                    response.headers['Retry-After'] = str(int(retry_after) + 1)
+                    return response, 503
+                return response, 500
             
             if not config_content:
                 return jsonify({
@@ -471,7 +1735,9 @@ def api_generate():
                 'success': True,
                 'config': config_content,
                 'vendor': SUPPORTED_VENDORS[vendor],
-                'hostname': data.get('hostname')
+                'hostname': data.get('hostname'),
+                'history_id': record_history(vendor, data, config_content, 'api', input_hash, started),
+                **fallback_fields(data)
             })
         except Exception as e:
             print(f"설정 생성 중 오류: {str(e)}")  # 디버깅용
@@ -492,9 +1758,503 @@ def api_generate():
         }), 500
 
 
+@app.route('/api/generate/stream', methods=['POST'])
+def api_generate_stream():
+    """설정 파일 생성 API (Server-Sent Events 스트리밍)"""
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'요청 데이터 파싱 오류: {str(e)}'
+        }), 400
+    
+    if data is None:
+        return jsonify({
+            'success': False,
+            'error': '요청 데이터가 없습니다.'
+        }), 400
+    
+    api_key, vendor, error = validate_generate_request(data)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
+    rejected = admit_request(api_key)
+    if rejected:
+        return rejected
+    
+    started = time.perf_counter()
+    input_hash = history.input_hash(data)
+    
+    def generate():
+        for event, payload in stream_config_with_chatgpt(vendor, data, api_key):
+            if event == 'done':
+                payload['history_id'] = record_history(vendor, data, payload['config'], 'stream',
+                                                       input_hash, started)
+            yield sse_event(event, payload)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # 프록시 버퍼링 비활성화
+        }
+    )
+
+
+def generate_batch_item(index, vendor, spec, api_key, source='batch'):
+    """일괄 생성 요청의 장비 1대를 생성하고 결과 레코드를 반환합니다."""
+    started = time.perf_counter()
+    input_hash = history.input_hash(spec)
+    try:
+        config_content, error = generate_config_with_chatgpt(vendor, spec, api_key)
+    except Exception as e:
+        config_content, error = None, f'설정 생성 중 오류가 발생했습니다: {str(e)}'
+    
+    if not error and not config_content:
+        error = '설정 스크립트 생성에 실패했습니다. 응답이 비어있습니다.'
+    
+    result = {
+        'index': index,
+        'success': not error,
+        'vendor': SUPPORTED_VENDORS[vendor],
+        'hostname': spec.get('hostname')
+    }
+    if error:
+        result['error'] = error
+    else:
+        result['config'] = config_content
+        result['history_id'] = record_history(vendor, spec, config_content, source, input_hash, started)
+        result.update(fallback_fields(spec))
+    return result
+
+
+@app.route('/api/generate/batch', methods=['POST'])
+def api_generate_batch():
+    """
+    여러 장비의 설정 파일 일괄 생성 API
+    
+    요청: {"api_key": ..., "defaults": {공통 필드}, "devices": [{장비별 필드}, ...], "concurrency": N}
+    응답: 장비별 결과를 완료되는 순서대로 한 줄씩 전송 (application/x-ndjson)
+    """
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'요청 데이터 파싱 오류: {str(e)}'
+        }), 400
+    
+    if data is None:
+        return jsonify({
+            'success': False,
+            'error': '요청 데이터가 없습니다.'
+        }), 400
+    
+    api_key = data.get('api_key', '').strip()
+    if not api_key:
+        return jsonify({
+            'success': False,
+            'error': 'ChatGPT API 키가 필요합니다.'
+        }), 400
+    
+    devices = data.get('devices')
+    if not isinstance(devices, list) or not devices:
+        return jsonify({
+            'success': False,
+            'error': 'devices 목록이 필요합니다.'
+        }), 400
+    if len(devices) > BATCH_MAX_DEVICES:
+        return jsonify({
+            'success': False,
+            'error': f'한 번에 최대 {BATCH_MAX_DEVICES}대까지 생성할 수 있습니다.'
+        }), 400
+    
+    defaults = data.get('defaults') or {}
+    try:
+        concurrency = int(data.get('concurrency') or BATCH_MAX_CONCURRENCY)
+    except (TypeError, ValueError):
+        concurrency = BATCH_MAX_CONCURRENCY
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    
+    # 장비별 요청 검증 (잘못된 장비는 즉시 오류 결과로 전송)
+    tasks = []
+    invalid = []
+    allocators = {}  # 주소 풀 -> 장비 간에 공유하는 IPAM 할당기
+    for index, device in enumerate(devices):
+        if not isinstance(device, dict):
+            invalid.append({'index': index, 'success': False, 'error': '장비 정보 형식이 올바르지 않습니다.'})
+            continue
+        spec = {**defaults, **device, 'api_key': api_key}
+        _, vendor, error = validate_generate_request(spec)
+        if not error and isinstance(spec.get('network'), dict):
+            # 구조화된 요구사항은 장비 순서대로 같은 풀에서 할당하여 장비 간 주소가 겹치지 않게 함
+            pools = tuple(spec['network'].get('pools') or ipam.DEFAULT_POOLS)
+            try:
+                if pools not in allocators:
+                    allocators[pools] = ipam.SubnetAllocator(pools)
+                spec['_ipam_plan'] = ipam.plan_network(
+                    spec['network'], hostname=spec.get('hostname'),
+                    defaults=ipam_defaults(vendor, spec), allocator=allocators[pools]
+                )
+            except ipam.IPAMError as e:
+                error = f'주소 계획 오류: {str(e)}'
+        if error:
+            invalid.append({'index': index, 'success': False, 'hostname': spec.get('hostname'), 'error': error})
+            continue
+        tasks.append((index, vendor, spec))
+    
+    # 생성할 장비 수만큼 요청 허용량을 사용 (스트리밍을 시작하기 전에 거부할 수 있도록 먼저 확인)
+    if tasks:
+        rejected = admit_request(api_key, cost=len(tasks))
+        if rejected:
+            return rejected
+    
+    def generate():
+        succeeded = 0
+        for result in invalid:
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+        
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch')
+        try:
+            futures = [executor.submit(generate_batch_item, index, vendor, spec, api_key)
+                       for index, vendor, spec in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                if result['success']:
+                    succeeded += 1
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+        finally:
+            # 클라이언트 연결이 끊긴 경우 대기 중인 장비는 취소
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield json.dumps({
+            'done': True,
+            'total': len(devices),
+            'succeeded': succeeded,
+            'failed': len(devices) - succeeded
+        }, ensure_ascii=False) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+def fanout_spec(data, vendor, ip_info=None):
+    """
+    fan-out 요청에서 제조사 1개의 생성 요청을 만듭니다 (공통 필드 + vendor_overrides의 제조사별 값).
+    
+    공통 주소 계획(ip_info)이 있으면 관리 인터페이스만 제조사 값으로 바꿔 미리 계획한 주소로 사용합니다.
+    """
+    spec = {key: value for key, value in data.items()
+            if key not in ('vendors', 'vendor_overrides') and not key.startswith('_')}
+    spec.update((data.get('vendor_overrides') or {}).get(vendor) or {})
+    spec['vendor'] = vendor
+    if ip_info is not None:
+        plan = dict(ip_info)
+        plan['mgmt_interface'] = spec.get('mgmt_interface') or DEFAULT_CONFIGS[vendor].get('mgmt_interface', '')
+        spec['_ipam_plan'] = plan
+    return spec
+
+
+def validate_fanout_request(data):
+    """
+    다중 제조사 생성 요청 데이터를 검증합니다.
+    
+    반환값: (api_key, 제조사 목록, 생성 모드, 오류 메시지). 검증에 성공하면 오류 메시지는 None입니다.
+    """
+    strip_internal_fields(data)
+    
+    vendors = data.get('vendors') or list(SUPPORTED_VENDORS)
+    if not isinstance(vendors, list) or not all(isinstance(vendor, str) for vendor in vendors):
+        return None, None, None, 'vendors는 제조사 목록이어야 합니다.'
+    vendors = list(dict.fromkeys(vendor.lower() for vendor in vendors))
+    for vendor in vendors:
+        if vendor not in SUPPORTED_VENDORS:
+            return None, None, None, f'지원하지 않는 제조사입니다: {vendor}'
+    
+    mode = data.get('mode') or 'template'
+    if mode not in FANOUT_MODES:
+        return None, None, None, f'지원하지 않는 생성 모드입니다: {mode}'
+    data['mode'] = mode  # 기본값 설정 (제조사별 요청과 생성 이력에 사용)
+    
+    # 템플릿은 관리 설정만 렌더링하므로, 추가 구성을 요청하면 결과에서 빠지지 않도록 미리 거부
+    network = data.get('network')
+    if mode == 'template' and isinstance(network, dict):
+        extras = [field for field in TEMPLATE_UNRENDERED_NETWORK_FIELDS if network.get(field)]
+        if extras:
+            return None, None, None, (f"template 모드는 추가 구성(network의 {', '.join(extras)})을 "
+                                      "렌더링하지 않습니다. hybrid 또는 standard 모드를 사용하세요.")
+    
+    overrides = data.get('vendor_overrides') or {}
+    if not isinstance(overrides, dict) or not all(isinstance(value, dict) for value in overrides.values()):
+        return None, None, None, 'vendor_overrides는 {제조사: {필드: 값}} 형식이어야 합니다.'
+    for vendor, values in overrides.items():
+        if vendor not in vendors:
+            return None, None, None, f'vendor_overrides의 제조사가 vendors에 없습니다: {vendor}'
+        unknown = set(values) - set(VENDOR_SPECIFIC_FIELDS)
+        if unknown:
+            return None, None, None, f"vendor_overrides에는 {', '.join(VENDOR_SPECIFIC_FIELDS)}만 지정할 수 있습니다."
+    for field in VENDOR_SPECIFIC_FIELDS:
+        if data.get(field) is not None:
+            return None, None, None, f'{field}은(는) 제조사마다 다르므로 vendor_overrides에 제조사별로 지정하세요.'
+    
+    # 템플릿 모드에서 요구사항 분석이 없으면 ChatGPT를 호출하지 않으므로 API 키 불필요
+    api_key = data.get('api_key', '').strip()
+    if not api_key and (mode != 'template' or data.get('requirements', '').strip()):
+        return None, None, None, 'ChatGPT API 키가 필요합니다.'
+    
+    error = validate_plan_fields(fanout_plan_vendor(data, vendors), data)
+    if error:
+        return None, None, None, error
+    
+    for vendor in vendors:
+        spec = fanout_spec(data, vendor)
+        if spec.get('layout') is not None and mode == 'standard':
+            return None, None, None, '포트 레이아웃(layout)은 template, hybrid 모드에서 사용할 수 있습니다.'
+        error = validate_device_fields(vendor, spec)
+        if error:
+            return None, None, None, f'{SUPPORTED_VENDORS[vendor]}: {error}'
+    
+    return api_key, vendors, mode, None
+
+
+def fanout_plan_vendor(data, vendors):
+    """공통 주소 계획(요구사항 분석)에 사용할 제조사 (요청의 vendor, 없으면 첫 번째 제조사)"""
+    vendor = str(data.get('vendor', '')).lower()
+    return vendor if vendor in vendors else vendors[0]
+
+
+def generate_fanout_item(index, vendor, spec, mode, api_key):
+    """fan-out 요청의 제조사 1개를 생성하고 결과 레코드를 반환합니다."""
+    started = time.perf_counter()
+    if mode == 'template':
+        input_hash = history.input_hash(spec)
+        try:
+            if spec.get('_ipam_plan'):
+                apply_ip_info(spec, spec['_ipam_plan'])
+            config_content, error = generate_config(vendor, spec)
+        except Exception as e:
+            config_content, error = None, f'설정 생성 중 오류가 발생했습니다: {str(e)}'
+        result = {
+            'index': index,
+            'success': not error,
+            'vendor': SUPPORTED_VENDORS[vendor],
+            'hostname': spec.get('hostname')
+        }
+        if error:
+            result['error'] = error
+        else:
+            result['config'] = config_content
+            result['history_id'] = record_history(vendor, spec, config_content, 'fanout', input_hash, started)
+            # 요구사항 분석 결과의 추가 구성은 템플릿에 반영되지 않으므로 결과에 표시
+            unrendered = (spec.get('_ipam_plan') or {}).get('additional_configs')
+            if unrendered:
+                result['unrendered_configs'] = unrendered
+                result['warning'] = (f'template 모드는 추가 구성 {len(unrendered)}건을 렌더링하지 않았습니다. '
+                                     'hybrid 또는 standard 모드를 사용하세요.')
+    else:
+        result = generate_batch_item(index, vendor, spec, api_key, source='fanout')
+    result['vendor_id'] = vendor
+    result['elapsed'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+@app.route('/api/generate/fanout', methods=['POST'])
+def api_generate_fanout():
+    """
+    하나의 설계를 여러 제조사의 설정 파일로 동시에 생성하는 API
+    
+    요청: /api/generate 필드 + {"vendors": [...], "mode": "template"|"hybrid"|"standard",
+          "vendor_overrides": {제조사: {"mgmt_interface", "mgmt_port", "layout"}}}
+    응답: 공통 주소 계획, 제조사별 결과(완료되는 순서대로), 요약을 한 줄씩 전송 (application/x-ndjson)
+    """
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'요청 데이터 파싱 오류: {str(e)}'
+        }), 400
+    
+    if not isinstance(data, dict):
+        return jsonify({
+            'success': False,
+            'error': '요청 데이터가 없습니다.'
+        }), 400
+    
+    api_key, vendors, mode, error = validate_fanout_request(data)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
+    # 제조사 수와 관계없이 요청 1건으로 허용량 확인
+    if api_key:
+        rejected = admit_request(api_key)
+        if rejected:
+            return rejected
+    
+    def generate():
+        started = time.perf_counter()
+        
+        # 주소 계획은 한 번만 (구조화된 요구사항은 로컬 IPAM, 자연어 요구사항은 ChatGPT 분석)
+        ip_info, error = plan_addresses(fanout_plan_vendor(data, vendors), data, api_key, use_cache_for(data))
+        if error:
+            yield json.dumps({'success': False, 'error': error}, ensure_ascii=False) + '\n'
+            yield json.dumps({
+                'done': True,
+                'total': len(vendors),
+                'succeeded': 0,
+                'failed': len(vendors),
+                'elapsed': round(time.perf_counter() - started, 3)
+            }, ensure_ascii=False) + '\n'
+            return
+        yield json.dumps({'plan': ip_info, 'vendors': vendors, 'mode': mode}, ensure_ascii=False) + '\n'
+        
+        succeeded = 0
+        executor = ThreadPoolExecutor(max_workers=len(vendors), thread_name_prefix='fanout')
+        try:
+            futures = [executor.submit(generate_fanout_item, index, vendor,
+                                       fanout_spec(data, vendor, ip_info), mode, api_key)
+                       for index, vendor in enumerate(vendors)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result['success']:
+                    succeeded += 1
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+        finally:
+            # 클라이언트 연결이 끊긴 경우 대기 중인 제조사는 취소
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield json.dumps({
+            'done': True,
+            'total': len(vendors),
+            'succeeded': succeeded,
+            'failed': len(vendors) - succeeded,
+            'elapsed': round(time.perf_counter() - started, 3)
+        }, ensure_ascii=False) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+def run_generation_job(job, vendor, data, api_key):
+    """작업 큐에서 설정을 생성합니다. 생성 중인 내용은 작업 진행 정보(partial)로 갱신됩니다."""
+    started = time.perf_counter()
+    input_hash = history.input_hash(data)
+    parts = []
+    for event, payload in stream_config_with_chatgpt(vendor, data, api_key):
+        if event == 'meta':
+            job.update(hostname=payload.get('hostname'))
+        elif event == 'delta':
+            parts.append(payload['text'])
+            job.update(partial=''.join(parts))
+        elif event == 'done':
+            return {
+                'success': True,
+                'config': payload['config'],
+                'vendor': payload['vendor'],
+                'hostname': payload['hostname'],
+                'history_id': record_history(vendor, data, payload['config'], 'job', input_hash, started),
+                **fallback_fields(data)
+            }
+        elif event == 'error':
+            raise jobs.JobError(payload['error'])
+    raise jobs.JobError('설정 스크립트 생성에 실패했습니다. 응답이 비어있습니다.')
+
+
+@app.route('/api/jobs', methods=['POST'])
+def api_create_job():
+    """설정 생성 작업 등록 API (작업 ID를 즉시 반환)"""
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'요청 데이터 파싱 오류: {str(e)}'
+        }), 400
+    
+    if data is None:
+        return jsonify({
+            'success': False,
+            'error': '요청 데이터가 없습니다.'
+        }), 400
+    
+    api_key, vendor, error = validate_generate_request(data)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
+    # 같은 요청의 작업이 진행 중이면 그 작업을 반환 (허용량도 사용하지 않음)
+    key = request_key(data)
+    job = job_queue.find_pending(key)
+    if job is None:
+        rejected = admit_request(api_key)
+        if rejected:
+            return rejected
+    
+    try:
+        job = job or job_queue.submit(run_generation_job, vendor, data, api_key, key=key)
+    except jobs.QueueFullError as e:
+        response = jsonify({
+            'success': False,
+            'error': f'{str(e)} 잠시 후 다시 시도해주세요.'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    response = jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status
+    })
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response, 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """설정 생성 작업 상태 및 결과 조회 API"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': '작업을 찾을 수 없습니다. (만료되었거나 잘못된 작업 ID)'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **job.to_dict()
+    })
+
+
+def download_filename(hostname, vendor):
+    """다운로드 파일명을 생성합니다: [hostname]_[vendor]_config.txt"""
+    return f"{zip_stream.safe_filename(hostname)}_{zip_stream.safe_filename(vendor, 'unknown')}_config.txt"
+
+
 @app.route('/api/download', methods=['POST'])
 def api_download():
-    """설정 파일 다운로드"""
+    """설정 파일 다운로드 (디스크에 쓰지 않고 메모리에서 바로 전송)"""
     try:
         data = request.get_json()
         
@@ -508,22 +2268,13 @@ def api_download():
                 'error': '설정 내용이 없습니다.'
             }), 400
         
-        # 임시 파일 생성
-        output_dir = Path('output')
-        output_dir.mkdir(exist_ok=True)
-        
-        filename = f"{hostname}_{vendor}_config.txt"
-        filepath = output_dir / filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(config_content)
-        
-        return send_file(
-            str(filepath),
-            as_attachment=True,
-            download_name=filename,
-            mimetype='text/plain'
-        )
+        with STAGE_SECONDS.time(stage='download', vendor=metric_vendor(vendor)):
+            return send_file(
+                io.BytesIO(config_content.encode('utf-8')),
+                as_attachment=True,
+                download_name=download_filename(hostname, vendor),
+                mimetype='text/plain'
+            )
         
     except Exception as e:
         return jsonify({
@@ -532,31 +2283,281 @@ def api_download():
         }), 500
 
 
-@app.route('/api/vendor-config', methods=['GET'])
-def api_vendor_config():
-    """제조사별 기본 설정값 반환"""
-    vendor = request.args.get('vendor', '').lower()
+@app.route('/api/render', methods=['POST'])
+def api_render():
+    """
+    템플릿만으로 설정 파일을 생성하여 스트리밍으로 전송 (ChatGPT 미사용)
     
+    포트 레이아웃(layout)으로 인터페이스가 수천 개인 설정도 전체 문자열을 만들지 않고 조각 단위로 전송합니다.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            'success': False,
+            'error': '요청 데이터가 없습니다.'
+        }), 400
+    
+    vendor = str(data.get('vendor', '')).lower()
     if vendor not in SUPPORTED_VENDORS:
         return jsonify({
             'success': False,
-            'error': '지원하지 않는 제조사입니다.'
+            'error': f'지원하지 않는 제조사입니다: {vendor}'
         }), 400
     
-    defaults = DEFAULT_CONFIGS.get(vendor, {})
+    for field in ('hostname', 'mgmt_ip', 'mgmt_mask'):
+        if not data.get(field):
+            return jsonify({
+                'success': False,
+                'error': f'필수 필드가 누락되었습니다: {field}'
+            }), 400
+    
+    error = validate_device_fields(vendor, data)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
     
+    try:
+        with STAGE_SECONDS.time(stage='template_load', vendor=vendor):
+            template = load_template(vendor)
+        template_vars = prepare_template_vars(vendor, data)
+    except Exception as e:
+        ERRORS.inc(stage='template', error_class=metrics.classify_error(e))
+        return jsonify({
+            'success': False,
+            'error': f'템플릿 렌더링 오류: {str(e)}'
+        }), 500
+    
+    response = Response(
+        stream_with_context(template_registry.iter_render(template, template_vars)),
+        mimetype='text/plain'
+    )
+    response.headers.set('Content-Disposition', 'attachment',
+                         filename=download_filename(data['hostname'], vendor))
+    return response
+
+
+def iter_bundle_entries(configs):
+    """묶음 다운로드 항목을 (ZIP 내 파일 이름, 설정 내용)으로 변환합니다. 중복 파일명에는 번호를 붙입니다."""
+    used_names = set()
+    for item in configs:
+        filename = download_filename(item.get('hostname', 'device'), item.get('vendor', 'unknown'))
+        stem, suffix = filename[:-len('.txt')], '.txt'
+        number = 2
+        while filename in used_names:
+            filename = f"{stem}_{number}{suffix}"
+            number += 1
+        used_names.add(filename)
+        yield filename, item['config']
+
+
+@app.route('/api/download/bundle', methods=['POST'])
+def api_download_bundle():
+    """
+    여러 설정 파일을 하나의 ZIP으로 다운로드
+    
+    요청 JSON: {"configs": [{"config": "...", "hostname": "...", "vendor": "..."}, ...]}
+    ZIP은 파일 단위로 압축되는 즉시 스트리밍되므로 전체 압축 파일을 메모리에 보관하지 않습니다.
+    """
+    data = request.get_json(silent=True) or {}
+    configs = data.get('configs')
+    
+    if not isinstance(configs, list) or not configs:
+        return jsonify({
+            'success': False,
+            'error': 'configs 목록이 필요합니다.'
+        }), 400
+    
+    if len(configs) > BUNDLE_MAX_FILES:
+        return jsonify({
+            'success': False,
+            'error': f'한 번에 최대 {BUNDLE_MAX_FILES}개 파일까지 다운로드할 수 있습니다.'
+        }), 400
+    
+    for index, item in enumerate(configs):
+        if not isinstance(item, dict) or not isinstance(item.get('config'), str) or not item['config']:
+            return jsonify({
+                'success': False,
+                'error': f'{index + 1}번째 항목의 설정 내용이 없습니다.'
+            }), 400
+    
+    return Response(
+        stream_with_context(zip_stream.iter_zip(iter_bundle_entries(configs))),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=network_configs.zip'}
+    )
+
+
+@app.route('/api/diff', methods=['POST'])
+def api_diff():
+    """
+    생성된 설정과 장비의 현재 설정을 비교하여 적용할 추가/삭제 명령 반환
+    
+    요청 JSON: {"vendor": "cisco", "generated": "...", "running": "...", "partial": false}
+    """
+    data = request.get_json(silent=True) or {}
+    vendor = str(data.get('vendor', '')).lower()
+    generated = data.get('generated')
+    running = data.get('running')
+    
+    if vendor not in SUPPORTED_VENDORS:
+        return jsonify({
+            'success': False,
+            'error': f'지원하지 않는 제조사입니다: {vendor}'
+        }), 400
+    
+    if not isinstance(generated, str) or not generated.strip():
+        return jsonify({
+            'success': False,
+            'error': '생성된 설정 내용이 없습니다.'
+        }), 400
+    
+    if not isinstance(running, str):
+        return jsonify({
+            'success': False,
+            'error': '현재 설정 내용이 없습니다.'
+        }), 400
+    
+    try:
+        with STAGE_SECONDS.time(stage='diff', vendor=vendor):
+            result = config_diff.diff_configs(vendor, generated, running, partial=bool(data.get('partial')))
+    except Exception as e:
+        ERRORS.inc(stage='diff', error_class=metrics.classify_error(e))
+        print(f"설정 비교 오류: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'설정 비교 오류: {str(e)}'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'commands': '\n'.join(result['commands']),
+        'added': result['added'],
+        'removed': result['removed']
+    })
+
+
+@app.route('/api/history', methods=['GET'])
+def api_history():
+    """
+    설정 생성 이력 조회 API (최신순, 설정 본문 제외)
+    
+    쿼리: hostname, vendor, since/until (epoch 초 또는 ISO 8601, until 미포함),
+          limit (기본값 50, 최대 500), cursor (이전 응답의 next_cursor)
+    """
+    vendor = request.args.get('vendor', '').lower() or None
+    if vendor and vendor not in SUPPORTED_VENDORS:
+        return jsonify({
+            'success': False,
+            'error': f'지원하지 않는 제조사입니다: {vendor}'
+        }), 400
+    
+    try:
+        page = history_store.query(
+            hostname=request.args.get('hostname') or None,
+            vendor=vendor,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            cursor=request.args.get('cursor') or None,
+            limit=request.args.get('limit', history.DEFAULT_PAGE_SIZE)
+        )
+    except history.HistoryError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        **page
+    })
+
+
+@app.route('/api/history/<int:entry_id>', methods=['GET'])
+def api_history_entry(entry_id):
+    """설정 생성 이력 1건 조회 API (설정 본문 포함)"""
+    entry = history_store.get(entry_id)
+    if entry is None:
+        return jsonify({
+            'success': False,
+            'error': '이력을 찾을 수 없습니다.'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **entry
+    })
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """생성 결과 캐시, 클라이언트 풀, 요청 합치기/허용 제어, 헤지 요청, 회로 차단기, 생성 이력, 응답 압축 통계"""
     return jsonify({
         'success': True,
-        'vendor': vendor,
-        'config': defaults
+        'stats': generation_cache.stats(),
+        'client_pool': client_pool.stats(),
+        'single_flight': in_flight.stats(),
+        'admission': admission_controller.stats(),
+        'hedging': hedger.stats(),
+        'circuit_breaker': circuit_breaker.stats(),
+        'history': history_store.stats(),
+        'compression': response_compressor.stats(),
+        'prompt_version': PROMPT_VERSION
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def api_metrics():
+    """Prometheus 형식 지표 (단계별 소요 시간, 토큰 사용량, 오류 수, 캐시 상태)"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@functools.lru_cache(maxsize=None)
+def vendor_config_body(vendor=None):
+    """
+    /api/vendor-config 응답 본문과 ETag (기본값은 실행 중 바뀌지 않으므로 한 번만 만듦)
+
+    vendor가 None이면 모든 제조사의 기본값을 반환합니다.
+    """
+    if vendor is None:
+        payload = {'success': True, 'configs': DEFAULT_CONFIGS}
+    else:
+        payload = {'success': True, 'vendor': vendor, 'config': DEFAULT_CONFIGS.get(vendor, {})}
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return body, http_cache.content_etag(body)
+
+
+@app.route('/api/vendor-config', methods=['GET'])
+def api_vendor_config():
+    """
+    제조사별 기본 설정값 반환 (vendor를 지정하지 않으면 모든 제조사)
+
+    ETag와 Cache-Control을 함께 보내므로, 브라우저는 캐시 시간 동안 다시 요청하지 않고
+    그 뒤에는 If-None-Match로 재검증하여 바뀌지 않았으면 304(본문 없음)를 받습니다.
+    """
+    vendor = request.args.get('vendor', '').lower() or None
+    
+    if vendor is not None and vendor not in SUPPORTED_VENDORS:
+        return jsonify({
+            'success': False,
+            'error': '지원하지 않는 제조사입니다.'
+        }), 400
+    
+    body, etag = vendor_config_body(vendor)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = VENDOR_CONFIG_MAX_AGE
+    return response.make_conditional(request)
+
+
 if __name__ == '__main__':
     # templates 폴더 생성
     Path('templates').mkdir(exist_ok=True)
     Path('static').mkdir(exist_ok=True)
-    Path('output').mkdir(exist_ok=True)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
 
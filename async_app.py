@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 서버 (ASGI)
+/api/generate와 그 과정의 ChatGPT 호출을 이벤트 루프에서 AsyncOpenAI로 처리합니다.
+네트워크 응답을 기다리는 동안 작업 스레드를 점유하지 않으므로, 작업자 프로세스 하나가
+수백 건의 생성 요청을 동시에 기다릴 수 있습니다.
+
+- 템플릿 렌더링, JSON 파싱, 캐시(SQLite) 조회처럼 CPU나 디스크를 쓰는 작업은 스레드 풀로 넘겨
+  이벤트 루프를 막지 않습니다.
+- 그 밖의 경로(웹 페이지, 스트리밍, 다운로드 등)는 기존 Flask 앱을 별도 스레드 풀에서 실행하여 그대로 제공합니다.
+- 사용량 제한 스케줄러, 생성 결과 캐시, 지표는 app.py와 공유합니다.
+
+실행 (uvicorn 필요: pip install uvicorn):
+  uvicorn async_app:app --host 0.0.0.0 --port 5000
+  python async_app.py
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import app as sync_app
+import history
+import metrics
+import openai_pool
+import rate_limiter
+import resilience
+import template_registry
+from app import ERRORS, REQUEST_SECONDS, STAGE_SECONDS, SUPPORTED_VENDORS
+
+# 요청 본문 최대 크기 (바이트)
+MAX_BODY_BYTES = int(os.environ.get('ASYNC_MAX_BODY_BYTES', 16 * 1024 * 1024))
+
+# Flask 앱(그 밖의 경로)을 실행할 스레드 수. 스트리밍 응답은 끝날 때까지 스레드 하나를 사용합니다.
+WSGI_THREADS = int(os.environ.get('ASYNC_WSGI_THREADS', 32))
+
+# Flask 앱 응답 조각을 전달하는 대기열 크기 (느린 클라이언트에 대한 배압)
+WSGI_QUEUE_SIZE = 16
+
+async_client_pool = openai_pool.AsyncOpenAIClientPool(max_retries=0)
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='wsgi')
+
+
+class RequestBodyTooLarge(Exception):
+    """요청 본문이 MAX_BODY_BYTES를 넘을 때 발생하는 예외"""
+
+
+class ClientDisconnected(Exception):
+    """요청 본문을 받는 중 클라이언트 연결이 끊겼을 때 발생하는 예외"""
+
+
+class _Usage:
+    """응답 JSON의 usage를 app.record_usage()가 읽을 수 있는 속성 형태로 감쌉니다."""
+
+    def __init__(self, usage):
+        self.prompt_tokens = usage.get('prompt_tokens')
+        self.completion_tokens = usage.get('completion_tokens')
+        self.total_tokens = usage.get('total_tokens')
+        details = usage.get('prompt_tokens_details') or {}
+        self.prompt_tokens_details = types.SimpleNamespace(cached_tokens=details.get('cached_tokens'))
+
+
+async def create_completion(api_key, vendor='other', stage='completion', **params):
+    """
+    app.create_completion()의 비동기 버전. 응답 JSON(dict)을 반환합니다.
+
+    응답 본문은 스레드 풀에서 파싱하므로 큰 응답도 이벤트 루프를 막지 않습니다.
+    헤지 요청과 회로 차단기는 app.py와 같은 상태(app.hedger, app.circuit_breaker)를 사용합니다.
+    """
+    client = async_client_pool.get(api_key)
+    key_hash = openai_pool.hash_api_key(api_key)
+    estimated = rate_limiter.estimate_tokens(params.get('messages', []), params.get('max_tokens'))
+
+    async def call():
+        raw = await client.chat.completions.with_raw_response.create(**params)
+        response = await asyncio.to_thread(json.loads, raw.content)
+        usage = response.get('usage') or {}
+        if usage:
+            # 헤지 요청에서 버려지는 응답의 토큰도 과금되므로 호출마다 기록
+            sync_app.record_usage(vendor, _Usage(usage))
+        return response, raw.headers, usage.get('total_tokens')
+
+    async def hedged_call():
+        return await sync_app.hedger.call_async(
+            stage, call, can_hedge=lambda: sync_app.rate_scheduler.try_acquire(key_hash, estimated)
+        )
+
+    with STAGE_SECONDS.time(stage=f'{stage}_call', vendor=vendor):
+        try:
+            sync_app.circuit_breaker.before_call()
+            response = await sync_app.rate_scheduler.call_async(key_hash, hedged_call, estimated)
+        except Exception as e:
+            sync_app.circuit_breaker.record_error(e)
+            ERRORS.inc(stage=stage, error_class=metrics.classify_error(e))
+            raise
+
+    sync_app.circuit_breaker.record_success()
+    return response
+
+
+async def chat_completion(api_key, messages, temperature=0.3, max_tokens=4000,
+                          response_format=None, use_cache=True, vendor='other', stage='completion'):
+    """app.chat_completion()의 비동기 버전 (같은 캐시 키와 캐시 저장소를 사용, 진행 중인 같은 호출은 합침)."""
+    params = {
+        'model': sync_app.OPENAI_MODEL,
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+    }
+    if response_format:
+        params['response_format'] = response_format
+
+    cache_key = sync_app.generation_cache_key(api_key, params) if use_cache else None
+    if cache_key:
+        cached = await asyncio.to_thread(sync_app.generation_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    async def call():
+        response = await create_completion(api_key, vendor=vendor, stage=stage, **params)
+
+        choices = response.get('choices') or []
+        if not choices:
+            return None
+
+        content = ((choices[0].get('message') or {}).get('content') or '').strip()
+
+        if cache_key and content:
+            cacheable = await asyncio.to_thread(sync_app.is_cacheable_content, content, response_format)
+            if cacheable:
+                await asyncio.to_thread(sync_app.generation_cache.set, cache_key, content)
+
+        return content
+
+    return await sync_app.in_flight.do_async(sync_app.flight_key(api_key, params), call)
+
+
+async def analyze_requirements_and_generate_ips(vendor, requirements, api_key, use_cache=True):
+    """app.analyze_requirements_and_generate_ips()의 비동기 버전. 응답 파싱은 스레드 풀에서 실행합니다."""
+    try:
+        with STAGE_SECONDS.time(stage='analysis_prompt', vendor=vendor):
+            messages = sync_app.build_analysis_messages(vendor, requirements)
+
+        response_content = await chat_completion(
+            api_key, messages, use_cache=use_cache, vendor=vendor, stage='analysis',
+            **sync_app.COMPLETION_OPTIONS['analysis']
+        )
+        return await asyncio.to_thread(sync_app.parse_analysis_response, vendor, response_content)
+
+    except Exception as e:
+        # 서비스 장애는 호출 측(plan_addresses)에서 템플릿 대체 여부를 판단하도록 전달
+        if resilience.is_upstream_failure(e):
+            raise
+        return sync_app.analysis_error(e)
+
+
+async def plan_addresses(vendor, form_data, api_key, use_cache=True):
+    """app.plan_addresses()의 비동기 버전. ChatGPT 분석이 필요 없는 계획은 스레드 풀에서 처리합니다."""
+    planned = await asyncio.to_thread(sync_app.local_plan, vendor, form_data)
+    if planned is not None:
+        return planned
+
+    try:
+        ip_info, error = await analyze_requirements_and_generate_ips(
+            vendor, form_data['requirements'].strip(), api_key, use_cache)
+    except Exception as e:
+        return sync_app.analysis_failed(form_data, e)
+    if error:
+        return None, error
+
+    return await asyncio.to_thread(sync_app.check_analysis_plan, vendor, ip_info), None
+
+
+async def generate_config_single_call(vendor, form_data, api_key):
+    """app.generate_config_single_call()의 비동기 버전"""
+    with STAGE_SECONDS.time(stage='single_call', vendor=vendor):
+        with STAGE_SECONDS.time(stage='single_call_prompt', vendor=vendor):
+            messages = sync_app.build_single_call_messages(vendor, form_data)
+
+        try:
+            response_content = await chat_completion(
+                api_key, messages, use_cache=sync_app.use_cache_for(form_data), vendor=vendor, stage='single_call',
+                **sync_app.COMPLETION_OPTIONS['single_call']
+            )
+        except Exception as api_error:
+            return await asyncio.to_thread(sync_app.api_error_result, vendor, form_data, api_key, api_error)
+
+        return await asyncio.to_thread(sync_app.apply_single_call_response, vendor, form_data, response_content)
+
+
+async def generate_config_hybrid(vendor, form_data, api_key, use_cache=True):
+    """app.generate_config_hybrid()의 비동기 버전. 템플릿 렌더링은 스레드 풀에서 실행합니다."""
+    with STAGE_SECONDS.time(stage='hybrid', vendor=vendor):
+        base_config, error = await asyncio.to_thread(sync_app.render_hybrid_base, vendor, form_data)
+        if error:
+            return None, error
+
+        # 추가 구성이 없으면 ChatGPT를 호출하지 않음
+        if not sync_app.needs_delta(form_data):
+            return base_config, None
+
+        with STAGE_SECONDS.time(stage='delta_prompt', vendor=vendor):
+            messages = sync_app.build_delta_messages(vendor, form_data)
+
+        try:
+            delta_config = await chat_completion(
+                api_key, messages, use_cache=use_cache, vendor=vendor, stage='delta',
+                **sync_app.COMPLETION_OPTIONS['delta']
+            )
+        except Exception as api_error:
+            # 서비스 장애이면 추가 설정 없이 템플릿 기본 설정만 반환
+            return await asyncio.to_thread(
+                sync_app.api_error_result, vendor, form_data, api_key, api_error, base_config=base_config)
+
+        return sync_app.delta_response_result(base_config, delta_config)
+
+
+async def generate_config_with_chatgpt(vendor, form_data, api_key):
+    """app.generate_config_with_chatgpt()의 비동기 버전"""
+    try:
+        with STAGE_SECONDS.time(stage='generate', vendor=vendor):
+            # ChatGPT 장애 중에는 호출하지 않고 바로 템플릿 기반 설정으로 대체
+            if sync_app.chatgpt_unavailable(form_data):
+                return await asyncio.to_thread(sync_app.circuit_open_result, vendor, form_data, api_key)
+
+            # 단일 호출 모드: 분석과 설정 생성을 한 번에
+            if sync_app.is_single_call(form_data):
+                return await generate_config_single_call(vendor, form_data, api_key)
+
+            use_cache = sync_app.use_cache_for(form_data)
+
+            # 요구사항이 있는 경우 IP 정보 자동 생성 (구조화된 요구사항은 로컬 IPAM)
+            ip_info, error = await plan_addresses(vendor, form_data, api_key, use_cache)
+            if error:
+                return await asyncio.to_thread(sync_app.planning_error_result, vendor, form_data, api_key, error)
+            if ip_info is not None:
+                sync_app.apply_ip_info(form_data, ip_info)
+
+            # 하이브리드 모드: 템플릿 기본 설정 + 추가 설정만 ChatGPT로 생성
+            if form_data.get('mode') == 'hybrid':
+                return await generate_config_hybrid(vendor, form_data, api_key, use_cache)
+
+            with STAGE_SECONDS.time(stage='config_prompt', vendor=vendor):
+                messages = sync_app.build_config_messages(vendor, form_data)
+
+            try:
+                config_content = await chat_completion(
+                    api_key, messages, use_cache=use_cache, vendor=vendor, stage='config',
+                    **sync_app.COMPLETION_OPTIONS['config']
+                )
+            except Exception as api_error:
+                return await asyncio.to_thread(sync_app.api_error_result, vendor, form_data, api_key, api_error)
+
+            return sync_app.config_response_result(config_content)
+
+    except Exception as e:
+        error_msg = str(e)
+        print(f"설정 생성 함수 오류: {error_msg}")
+        import traceback
+        traceback.print_exc()
+        return None, f"설정 생성 오류: {error_msg}"
+
+
+async def read_body(receive):
+    """ASGI 요청 본문 전체를 읽습니다."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        body = message.get('body', b'')
+        size += len(body)
+        if size > MAX_BODY_BYTES:
+            raise RequestBodyTooLarge()
+        chunks.append(body)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def request_header(scope, name):
+    """요청 헤더 값을 반환합니다 (name은 소문자 바이트, 없으면 None)."""
+    values = [value.decode('latin-1') for key, value in scope.get('headers', []) if key.lower() == name]
+    return ','.join(values) if values else None
+
+
+async def send_json(send, status, payload, accept_encoding=None):
+    """
+    JSON 응답을 보냅니다. 응답에 retry_after가 있으면 Retry-After 헤더도 보냅니다.
+
+    accept_encoding(요청의 Accept-Encoding)이 있으면 일정 크기 이상의 응답을 압축합니다 (Flask 응답과 같은 기준).
+    """
+    body = json.dumps(payload).encode('utf-8')
+    body, encoding = sync_app.response_compressor.compress_body(body, accept_encoding)
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    if encoding:
+        headers.append((b'content-encoding', encoding.encode()))
+    if sync_app.response_compressor.enabled:
+        headers.append((b'vary', b'Accept-Encoding'))
+    if payload.get('retry_after'):
+        headers.append((b'retry-after', str(payload['retry_after']).encode()))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': headers,
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def api_generate(body):
+    """설정 파일 생성 API (비동기). 반환값: (상태 코드, 응답 JSON)"""
+    try:
+        try:
+            data = await asyncio.to_thread(json.loads, body) if body else None
+        except ValueError as e:
+            return 400, {
+                'success': False,
+                'error': f'요청 데이터 파싱 오류: {str(e)}'
+            }
+        if not isinstance(data, dict):
+            return 400, {
+                'success': False,
+                'error': '요청 데이터가 없습니다.'
+            }
+
+        api_key, vendor, error = await asyncio.to_thread(sync_app.validate_generate_request, data)
+        if error:
+            return 400, {
+                'success': False,
+                'error': error
+            }
+
+        retry_after = await sync_app.admission_controller.admit_async(openai_pool.hash_api_key(api_key))
+        if retry_after is not None:
+            seconds = int(retry_after) + 1
+            return 429, {
+                'success': False,
+                'error': f'요청이 너무 많습니다. {seconds}초 후 다시 시도해주세요.',
+                'retry_after': seconds
+            }
+
+        started = time.perf_counter()
+        input_hash = history.input_hash(data)
+        config_content, error = await generate_config_with_chatgpt(vendor, data, api_key)
+
+        if error:
+            print(f"ChatGPT API 오류: {error}")  # 디버깅용
+            # 회로 차단기가 열려 있고 템플릿으로 대체할 수도 없는 경우
+            retry_after = sync_app.circuit_breaker.retry_after()
+            if retry_after:
+                return 503, {
+                    'success': False,
+                    'error': error,
+                    'retry_after': int(retry_after) + 1
+                }
+            return 500, {
+                'success': False,
+                'error': error
+            }
+
+        if not config_content:
+            return 500, {
+                'success': False,
+                'error': '설정 스크립트 생성에 실패했습니다. 응답이 비어있습니다.'
+            }
+
+        # 이력 기록(SQLite 쓰기)은 스레드 풀에서
+        history_id = await asyncio.to_thread(
+            sync_app.record_history, vendor, data, config_content, 'api', input_hash, started
+        )
+
+        return 200, {
+            'success': True,
+            'config': config_content,
+            'vendor': SUPPORTED_VENDORS[vendor],
+            'hostname': data.get('hostname'),
+            'history_id': history_id,
+            **sync_app.fallback_fields(data)
+        }
+
+    except Exception as e:
+        print(f"API 처리 중 오류: {str(e)}")  # 디버깅용
+        import traceback
+        traceback.print_exc()
+        return 500, {
+            'success': False,
+            'error': f'서버 오류: {str(e)}'
+        }
+
+
+def build_environ(scope, body):
+    """ASGI 요청 정보로 WSGI environ을 만듭니다."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'] = client[0]
+        environ['REMOTE_PORT'] = str(client[1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            continue
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope, body, send):
+    """
+    기존 Flask 앱으로 요청을 처리합니다.
+
+    Flask 앱 실행과 응답 반복은 하나의 작업 스레드에서 이루어지고(stream_with_context 등 요청 컨텍스트 유지),
+    응답 조각은 크기가 제한된 대기열을 거쳐 이벤트 루프에서 전송됩니다.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=WSGI_QUEUE_SIZE)
+    closed = False
+    environ = build_environ(scope, body)
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def run():
+        result = None
+        try:
+            def start_response(status, headers, exc_info=None):
+                put(('start', int(status.split(' ', 1)[0]), headers))
+
+            result = sync_app.app(environ, start_response)
+            for chunk in result:
+                if closed:
+                    break
+                if chunk:
+                    put(('body', chunk))
+            put(('end', None))
+        except Exception as e:
+            put(('error', e))
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    worker = loop.run_in_executor(wsgi_executor, run)
+    started = False
+    try:
+        while True:
+            kind, *payload = await queue.get()
+            if kind == 'start':
+                status, headers = payload
+                await send({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                for name, value in headers],
+                })
+                started = True
+            elif kind == 'body':
+                await send({'type': 'http.response.body', 'body': payload[0], 'more_body': True})
+            elif kind == 'end':
+                await send({'type': 'http.response.body', 'body': b''})
+                break
+            else:
+                print(f"Flask 앱 처리 오류: {payload[0]}")
+                if not started:
+                    await send_json(send, 500, {'success': False, 'error': f'서버 오류: {payload[0]}'})
+                break
+    finally:
+        # 클라이언트 연결이 끊긴 경우에도 작업 스레드가 대기열에서 막히지 않도록 남은 조각을 비움
+        closed = True
+        while not worker.done():
+            try:
+                await asyncio.wait_for(queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def lifespan(receive, send):
+    """서버 시작 시 템플릿을 미리 컴파일하고, 종료 시 연결 풀을 닫습니다."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await asyncio.to_thread(template_registry.warm)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_client_pool.aclose()
+            wsgi_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI 애플리케이션"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    try:
+        body = await read_body(receive)
+    except ClientDisconnected:
+        return
+    except RequestBodyTooLarge:
+        await send_json(send, 413, {'success': False, 'error': '요청 데이터가 너무 큽니다.'})
+        return
+
+    if scope['path'] == '/api/generate' and scope['method'] == 'POST':
+        start = time.perf_counter()
+        status, payload = await api_generate(body)
+        await send_json(send, status, payload, request_header(scope, b'accept-encoding'))
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint='/api/generate', method='POST', status=status
+        )
+        return
+
+    await call_flask(scope, body, send)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("비동기 서버를 실행하려면 uvicorn이 필요합니다: pip install uvicorn", file=sys.stderr)
+        sys.exit(1)
+
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+부하 테스트 벤치마크
+로컬 OpenAI 호환 테스트 서버(fake_openai.py)를 사용하여 실제 토큰 없이(오프라인) 동시 요청 부하에서의
+지연 시간(p50/p95/p99)과 초당 처리량을 측정합니다.
+
+시나리오:
+  template  app.generate_config (웹 버전 템플릿 경로, 프로세스 내 호출)
+  cli       main.py 렌더링 경로 (인수 검증 + 템플릿 렌더링, 프로세스 내 호출)
+  generate  POST /api/generate (요구사항 분석 + 설정 생성, ChatGPT 2회 호출)
+  stream    POST /api/generate/stream (스트리밍 응답 전체 수신까지)
+  download  POST /api/download
+
+사용법:
+  python benchmarks/bench_load.py [--scenarios template,generate] [--requests 200] [--concurrency 8]
+  python benchmarks/bench_load.py --latency 0.05 --rate-limit-ratio 0.05
+  python benchmarks/bench_load.py --save-baseline      # 결과를 기준값 파일에 저장
+  python benchmarks/bench_load.py --compare            # 기준값과 비교 (성능 저하 시 종료 코드 1)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from fake_openai import start_fake_server  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+SCENARIOS = ('template', 'cli', 'generate', 'stream', 'download')
+
+SAMPLE_DEVICE = {
+    'vendor': 'cisco',
+    'hostname': 'SW-LOAD-01',
+    'mgmt_ip': '192.168.10.10',
+    'mgmt_mask': '255.255.255.0',
+    'mgmt_vlan': 100,
+    'mgmt_interface': 'Gi1/0/1',
+}
+
+SAMPLE_ROW = {
+    'hostname': 'SW-LOAD-01',
+    'device_type': 'cisco',
+    'mgmt_ip': '192.168.10.10',
+    'mgmt_mask': '255.255.255.0',
+    'mgmt_vlan': '100',
+    'mgmt_interface': 'Gi1/0/1',
+}
+
+
+def percentile(sorted_values, percent):
+    """정렬된 목록의 백분위수를 반환합니다 (nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def run_load(func, requests, concurrency):
+    """
+    func를 동시에 requests번 호출하고 결과를 집계합니다.
+
+    func는 성공 여부(bool)를 반환해야 하며, 예외도 실패로 집계됩니다.
+    """
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+
+    def task(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = func()
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            timings.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(task, range(requests)))
+    duration = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'rps': round(requests / duration, 2) if duration else 0.0,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+    }
+
+
+class AppServer:
+    """Flask 앱을 백그라운드 스레드의 멀티스레드 WSGI 서버로 실행합니다."""
+
+    def __init__(self, flask_app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self._server = make_server('127.0.0.1', 0, flask_app, threaded=True, request_handler=QuietHandler)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def post(self, path, payload):
+        """JSON POST 요청을 보내고 (상태 코드, 응답 본문)을 반환합니다."""
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            body = json.dumps(payload).encode('utf-8')
+            conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def shutdown(self):
+        self._server.shutdown()
+
+
+def build_scenarios(app_module, server):
+    """시나리오 이름 -> 요청 1건을 실행하는 함수"""
+    import bulk
+
+    generate_payload = dict(
+        SAMPLE_DEVICE, api_key='sk-bench', requirements='사용자 VLAN 10, 음성 VLAN 20, OSPF 구성',
+        no_cache=True
+    )
+    download_payload = {'config': 'hostname SW-LOAD-01\n!\n' * 200, 'hostname': 'SW-LOAD-01', 'vendor': 'cisco'}
+
+    def template():
+        content, error = app_module.generate_config('cisco', dict(SAMPLE_DEVICE))
+        return error is None and bool(content)
+
+    def cli():
+        _, chunks = bulk.render_row(dict(SAMPLE_ROW))
+        return bool(''.join(chunks))
+
+    def generate():
+        status, body = server.post('/api/generate', generate_payload)
+        return status == 200 and json.loads(body).get('success', False)
+
+    def stream():
+        status, body = server.post('/api/generate/stream', generate_payload)
+        return status == 200 and b'event: done' in body
+
+    def download():
+        status, body = server.post('/api/download', download_payload)
+        return status == 200 and bool(body)
+
+    return {
+        'template': template,
+        'cli': cli,
+        'generate': generate,
+        'stream': stream,
+        'download': download,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """기준값과 비교하여 결과를 출력하고 성능 저하가 있으면 True를 반환합니다."""
+    regressed = False
+    print(f"\n기준값 비교 (허용 범위 {tolerance:.0%})")
+    for name, result in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            print(f"  {name:<9}: 기준값 없음")
+            continue
+        p95_ratio = result['p95_ms'] / base['p95_ms'] if base['p95_ms'] else 1.0
+        rps_ratio = result['rps'] / base['rps'] if base['rps'] else 1.0
+        slow = p95_ratio > 1 + tolerance or rps_ratio < 1 - tolerance
+        regressed = regressed or slow
+        mark = '성능 저하' if slow else '정상'
+        print(f"  {name:<9}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms ({p95_ratio:.2f}x), "
+              f"처리량 {base['rps']:.1f} -> {result['rps']:.1f} req/s ({rps_ratio:.2f}x) [{mark}]")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='부하 테스트 벤치마크 (오프라인)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"실행할 시나리오 (쉼표 구분, 기본값: {','.join(SCENARIOS)})")
+    parser.add_argument('--requests', type=int, default=200, help='시나리오별 요청 수 (기본값: 200)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수 (기본값: 8)')
+    parser.add_argument('--latency', type=float, default=0.0, help='테스트 서버 응답 지연 시간 (초)')
+    parser.add_argument('--chunk-latency', type=float, default=0.0, help='테스트 서버 스트리밍 청크 간 지연 (초)')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='429 응답을 주입할 요청 비율')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='기준값 파일 경로')
+    parser.add_argument('--save-baseline', action='store_true', help='결과를 기준값 파일에 저장')
+    parser.add_argument('--compare', action='store_true', help='기준값 파일과 비교')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='성능 저하로 판단할 변화 비율 (기본값: 0.5 = 50%%)')
+    parser.add_argument('--output', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+
+    fake = start_fake_server(latency=args.latency, chunk_latency=args.chunk_latency,
+                             rate_limit_ratio=args.rate_limit_ratio, retry_after_ms=10)
+    cache_dir = tempfile.TemporaryDirectory()
+
+    # app 모듈은 환경 변수를 import 시점에 읽으므로 먼저 설정
+    os.environ['OPENAI_BASE_URL'] = fake.base_url
+    os.environ['LLM_CACHE_PATH'] = os.path.join(cache_dir.name, 'generations.sqlite3')
+    os.environ['HISTORY_PATH'] = os.path.join(cache_dir.name, 'history.sqlite3')
+    os.environ.setdefault('OPENAI_RETRY_BASE_DELAY', '0.01')
+    # 부하 테스트는 API 키 하나로 요청하므로 키별 요청 허용량 제한은 끔
+    os.environ.setdefault('ADMISSION_RATE', '0')
+    os.chdir(ROOT_DIR)
+    import app as app_module
+
+    server = AppServer(app_module.app)
+    scenarios = build_scenarios(app_module, server)
+    results = {}
+    try:
+        for name in names:
+            # 준비 실행 (import, 템플릿 컴파일, 연결 생성)
+            scenarios[name]()
+            results[name] = run_load(scenarios[name], args.requests, args.concurrency)
+            result = results[name]
+            print(f"{name:<9}: p50 {result['p50_ms']:8.2f} ms, p95 {result['p95_ms']:8.2f} ms, "
+                  f"p99 {result['p99_ms']:8.2f} ms, {result['rps']:8.1f} req/s, 오류 {result['errors']}")
+    finally:
+        server.shutdown()
+        fake.shutdown()
+        cache_dir.cleanup()
+
+    if args.rate_limit_ratio:
+        print(f"429 주입: {fake.stats_rate_limited}/{fake.stats_requests} 요청, "
+              f"재시도 {app_module.rate_scheduler.stats()['retries']}회")
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'options': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'latency': args.latency,
+            'chunk_latency': args.chunk_latency,
+            'rate_limit_ratio': args.rate_limit_ratio,
+        },
+        'scenarios': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"기준값 파일이 없습니다: {args.baseline} (--save-baseline으로 생성)")
+            exit_code = 1
+        else:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('options') != report['options']:
+                print(f"주의: 기준값과 측정 옵션이 다릅니다 (기준값: {baseline.get('options')})")
+            if compare(results, baseline, args.tolerance):
+                exit_code = 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"기준값 저장: {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenAI 클라이언트 풀 벤치마크
+요청마다 OpenAI 클라이언트를 새로 만드는 기존 방식과 클라이언트 풀의 요청당 오버헤드를 비교합니다.
+로컬 테스트 서버(fake_openai.py)를 사용하므로 실제 토큰을 사용하지 않습니다.
+
+사용법:
+  python benchmarks/bench_openai_pool.py [--requests 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from openai import OpenAI  # noqa: E402
+
+import openai_pool  # noqa: E402
+from fake_openai import start_fake_server  # noqa: E402
+
+MESSAGES = [{'role': 'user', 'content': 'hostname SW-BENCH-01'}]
+
+
+def call(client):
+    client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES, max_tokens=10)
+
+
+def measure(get_client, requests):
+    """요청별 소요 시간(ms) 목록을 반환합니다."""
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        call(get_client())
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<14}: 평균 {statistics.mean(timings):7.2f} ms, "
+          f"중앙값 {statistics.median(timings):7.2f} ms, p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenAI 클라이언트 풀 벤치마크')
+    parser.add_argument('--requests', type=int, default=200, help='측정 요청 수 (기본값: 200)')
+    args = parser.parse_args()
+
+    server = start_fake_server()
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    api_key = 'sk-bench'
+
+    try:
+        # 기존 방식: 요청마다 새 클라이언트 (새 연결)
+        before = measure(lambda: OpenAI(api_key=api_key), args.requests)
+
+        # 클라이언트 풀: 클라이언트 및 keep-alive 연결 재사용
+        pool = openai_pool.OpenAIClientPool()
+        after = measure(lambda: pool.get(api_key), args.requests)
+        pool.close()
+    finally:
+        server.shutdown()
+
+    report('요청마다 생성', before)
+    report('클라이언트 풀', after)
+    print(f"요청당 오버헤드 감소: {statistics.mean(before) - statistics.mean(after):.2f} ms "
+          f"({statistics.mean(before) / statistics.mean(after):.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
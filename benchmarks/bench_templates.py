@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+템플릿 렌더링 마이크로 벤치마크
+매 호출마다 Environment를 새로 만드는 기존 방식과 공유 템플릿 레지스트리의 초당 렌더링 수를 비교합니다.
+
+사용법:
+  python benchmarks/bench_templates.py [--seconds 2.0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from jinja2 import Environment, FileSystemLoader  # noqa: E402
+
+import template_registry  # noqa: E402
+
+TEMPLATE_DIR = os.path.join(ROOT_DIR, 'config_templates')
+
+SAMPLE_VARS = {
+    'hostname': 'SW-BENCH-01',
+    'mgmt_ip': '192.168.10.254',
+    'mgmt_mask': '255.255.255.0',
+    'mgmt_mask_cidr': '24',
+    'mgmt_vlan': 100,
+    'mgmt_interface': 'Gi1/0/1',
+    'mgmt_port': 'port1',
+    'gateway': '192.168.10.1',
+}
+
+
+def render_uncached(vendor):
+    """기존 load_template 방식: 호출마다 Environment 생성 및 템플릿 컴파일"""
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    return env.get_template(template_registry.template_filename(vendor)).render(**SAMPLE_VARS)
+
+
+def render_cached(vendor):
+    """공유 레지스트리 방식"""
+    return template_registry.get_template(vendor, TEMPLATE_DIR).render(**SAMPLE_VARS)
+
+
+def measure(render, seconds):
+    """주어진 시간 동안 모든 제조사를 순환하며 렌더링하고 초당 렌더링 수를 반환합니다."""
+    vendors = template_registry.VENDORS
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for vendor in vendors:
+            render(vendor)
+        count += len(vendors)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='템플릿 렌더링 벤치마크')
+    parser.add_argument('--seconds', type=float, default=2.0, help='측정 시간 (초, 기본값: 2.0)')
+    args = parser.parse_args()
+
+    # 결과가 동일한지 먼저 확인
+    for vendor in template_registry.VENDORS:
+        assert render_uncached(vendor) == render_cached(vendor), vendor
+
+    template_registry.clear()
+    start = time.perf_counter()
+    template_registry.warm(TEMPLATE_DIR)
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    before = measure(render_uncached, args.seconds)
+    after = measure(render_cached, args.seconds)
+
+    print(f"레지스트리 예열 시간 : {warm_ms:10.2f} ms ({len(template_registry.VENDORS)}개 템플릿)")
+    print(f"기존 방식           : {before:10.0f} renders/sec")
+    print(f"공유 레지스트리      : {after:10.0f} renders/sec")
+    print(f"개선 배율           : {after / before:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 OpenAI 호환 테스트 서버
+실제 토큰을 사용하지 않고 /v1/chat/completions 요청에 고정된 응답을 반환합니다.
+
+- 지연 시간: 응답 전 대기 시간 (스트리밍은 첫 청크 전 대기 + 청크 간 대기)
+- 스트리밍: stream=true 요청에 Server-Sent Events 청크로 응답 (include_usage 지원)
+- 429 주입: 지정한 비율의 요청에 Retry-After 헤더와 함께 429 응답
+- 꼬리 지연 주입: 지정한 비율의 요청에 긴 지연 시간 적용 (헤지 요청 측정용)
+- 장애 주입: 지정한 비율의 요청에 503 응답 (회로 차단기 측정용)
+- 프롬프트 캐시: 이전 요청과 앞부분(마지막 메시지를 제외한 메시지)이 같으면 그 토큰 수를
+  usage.prompt_tokens_details.cached_tokens로 보고 (토큰 수는 문자 수 / 3으로 추정)
+
+사용법:
+  python benchmarks/fake_openai.py --port 8081 --latency 0.2 --rate-limit-ratio 0.1
+  python benchmarks/fake_openai.py --latency 0.1 --slow-ratio 0.05 --slow-latency 3
+  OPENAI_BASE_URL=http://127.0.0.1:8081/v1 python app.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 요구사항 분석(JSON 모드) 요청에 대한 응답
+SAMPLE_IP_INFO = {
+    "hostname": "SW-FAKE-01",
+    "mgmt_ip": "10.10.0.2",
+    "mgmt_mask": "255.255.255.0",
+    "mgmt_vlan": 100,
+    "mgmt_interface": "Gi1/0/1",
+    "gateway": "10.10.0.1",
+    "additional_configs": [
+        {"type": "vlan", "vlan_id": 10, "name": "USERS", "ip": "10.10.10.1", "subnet": "255.255.255.0"},
+        {"type": "vlan", "vlan_id": 20, "name": "VOICE", "ip": "10.10.20.1", "subnet": "255.255.255.0"},
+        {"type": "routing", "protocol": "OSPF", "network": "10.10.0.0/16", "area": "0"}
+    ]
+}
+
+# 설정 생성 요청에 대한 응답
+SAMPLE_CONFIG = """```
+hostname SW-FAKE-01
+!
+vlan 100
+ name MANAGEMENT
+!
+interface Vlan100
+ ip address 10.10.0.2 255.255.255.0
+ no shutdown
+!
+ip default-gateway 10.10.0.1
+!
+```"""
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """chat.completions 요청을 처리하는 핸들러"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive 지원
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _ratelimit_headers(self):
+        return {
+            'x-ratelimit-limit-requests': '10000',
+            'x-ratelimit-remaining-requests': '9999',
+            'x-ratelimit-limit-tokens': '10000000',
+            'x-ratelimit-remaining-tokens': '9999000',
+        }
+
+    def _send_stream(self, content, include_usage, usage):
+        """응답 내용을 SSE 청크로 나누어 전송합니다 (chunked 전송)."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in self._ratelimit_headers().items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        def write_event(payload):
+            data = f"data: {payload}\n\n".encode('utf-8')
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+
+        base = {'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk',
+                'created': int(time.time()), 'model': 'fake'}
+        size = self.server.chunk_size
+        for start in range(0, len(content), size):
+            if self.server.chunk_latency:
+                time.sleep(self.server.chunk_latency)
+            write_event(json.dumps(dict(base, choices=[{
+                'index': 0,
+                'delta': {'content': content[start:start + size]},
+                'finish_reason': None
+            }]), ensure_ascii=False))
+        write_event(json.dumps(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])))
+        if include_usage:
+            write_event(json.dumps(dict(base, choices=[], usage=usage)))
+        write_event('[DONE]')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def usage(self, body, content):
+        """토큰 사용량을 반환합니다. 앞부분이 이전 요청과 같으면 그 토큰 수를 캐시 적중으로 보고합니다."""
+        messages = body.get('messages') or []
+        prefix = json.dumps(messages[:-1], ensure_ascii=False, sort_keys=True)
+        prefix_tokens = sum(len(message.get('content') or '') for message in messages[:-1]) // 3
+        prompt_tokens = prefix_tokens + sum(len(message.get('content') or '') for message in messages[-1:]) // 3
+        with self.server.stats_lock:
+            cached_tokens = prefix_tokens if prefix in self.server.seen_prefixes else 0
+            self.server.seen_prefixes.add(prefix)
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': prompt_tokens + len(content) // 4,
+            'prompt_tokens_details': {'cached_tokens': cached_tokens}
+        }
+
+    def response_content(self, body):
+        """요청 형식에 맞는 응답 내용을 반환합니다."""
+        response_format = body.get('response_format') or {}
+        prompt = '\n'.join(message.get('content') or '' for message in body.get('messages', []))
+        if response_format.get('type') == 'json_object':
+            # single_call 모드: 구성 계획과 설정 스크립트를 함께 반환
+            if '"plan"' in prompt:
+                return json.dumps({'plan': SAMPLE_IP_INFO, 'config': SAMPLE_CONFIG}, ensure_ascii=False)
+            return json.dumps(SAMPLE_IP_INFO, ensure_ascii=False)
+        return SAMPLE_CONFIG
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': 'invalid json', 'type': 'invalid_request_error'}})
+            return
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+            return
+
+        with self.server.stats_lock:
+            self.server.stats_requests += 1
+            rate_limited = random.random() < self.server.rate_limit_ratio
+            if rate_limited:
+                self.server.stats_rate_limited += 1
+            failed = not rate_limited and random.random() < self.server.error_ratio
+            if failed:
+                self.server.stats_failed += 1
+            slow = random.random() < self.server.slow_ratio
+
+        if failed:
+            self._send_json(503, {
+                'error': {'message': 'Service unavailable (fake)', 'type': 'server_error'}
+            })
+            return
+
+        if rate_limited:
+            self._send_json(429, {
+                'error': {'message': 'Rate limit reached (fake)', 'type': 'requests', 'code': 'rate_limit_exceeded'}
+            }, headers={'retry-after-ms': str(self.server.retry_after_ms), 'x-ratelimit-remaining-requests': '0'})
+            return
+
+        latency = self.server.slow_latency if slow else self.server.latency
+        if latency:
+            time.sleep(latency)
+
+        content = self.response_content(body)
+        if body.get('stream'):
+            include_usage = (body.get('stream_options') or {}).get('include_usage', False)
+            self._send_stream(content, include_usage, self.usage(body, content))
+            return
+
+        self._send_json(200, {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': self.usage(body, content)
+        }, headers=self._ratelimit_headers())
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """설정 가능한 지연 시간을 가진 테스트 서버"""
+
+    daemon_threads = True
+    # 동시 연결이 수백 개인 부하 테스트에서 연결 대기열이 넘쳐 재전송 지연이 생기지 않도록 크게 설정
+    request_queue_size = 1024
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, chunk_latency=0.0, chunk_size=16,
+                 rate_limit_ratio=0.0, retry_after_ms=50, slow_ratio=0.0, slow_latency=0.0, error_ratio=0.0):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.chunk_size = chunk_size
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after_ms = retry_after_ms
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency
+        self.error_ratio = error_ratio
+        self.stats_lock = threading.Lock()
+        self.stats_requests = 0
+        self.stats_rate_limited = 0
+        self.stats_failed = 0
+        self.seen_prefixes = set()
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 먼저 연결을 끊은 경우(재시도, 스트림 중단)는 무시
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_fake_server(host='127.0.0.1', port=0, **options):
+    """백그라운드 스레드에서 테스트 서버를 시작하고 서버 객체를 반환합니다."""
+    server = FakeOpenAIServer(host, port, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 OpenAI 호환 테스트 서버')
+    parser.add_argument('--host', default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8081, help='포트 (기본값: 8081)')
+    parser.add_argument('--latency', type=float, default=0.0, help='응답 지연 시간 (초)')
+    parser.add_argument('--chunk-latency', type=float, default=0.0, help='스트리밍 청크 간 지연 시간 (초)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='스트리밍 청크 크기 (문자 수, 기본값: 16)')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0,
+                        help='429 응답을 반환할 요청 비율 (0.0-1.0)')
+    parser.add_argument('--retry-after-ms', type=int, default=50, help='429 응답의 retry-after-ms 값 (기본값: 50)')
+    parser.add_argument('--slow-ratio', type=float, default=0.0, help='긴 지연 시간을 적용할 요청 비율 (0.0-1.0)')
+    parser.add_argument('--slow-latency', type=float, default=0.0, help='느린 요청의 지연 시간 (초)')
+    parser.add_argument('--error-ratio', type=float, default=0.0, help='503 응답을 반환할 요청 비율 (0.0-1.0)')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        args.host, args.port, latency=args.latency, chunk_latency=args.chunk_latency,
+        chunk_size=args.chunk_size, rate_limit_ratio=args.rate_limit_ratio,
+        retry_after_ms=args.retry_after_ms, slow_ratio=args.slow_ratio,
+        slow_latency=args.slow_latency, error_ratio=args.error_ratio
+    )
+    print(f"테스트 서버 실행 중: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
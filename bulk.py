@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+대량 설정 생성 모드
+인벤토리 파일의 모든 장비를 프로세스 풀에서 병렬로 렌더링하여 output 폴더에 저장합니다.
+
+사용 예시:
+  python main.py bulk --inventory devices.csv
+  python main.py bulk --inventory devices.jsonl --workers 8 --batch-size 500
+  python main.py bulk --inventory devices.csv --incremental   # 바뀐 장비만 다시 생성
+
+인벤토리의 layout 컬럼에 포트 레이아웃 파일 경로를 지정하면(JSONL/YAML은 객체로 직접 지정 가능)
+포트 범위, VLAN 목록, 인터페이스 프로필이 함께 렌더링됩니다. 설정은 조각 단위로 파일에 바로 기록됩니다.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import manifest
+import template_registry
+from inventory import InventoryError, iter_inventory, row_to_args
+from main import (
+    DEVICE_TYPES,
+    GENERATOR_VERSION,
+    collect_argument_errors,
+    output_filename,
+    prepare_template_vars,
+    write_atomic,
+)
+
+
+def parse_bulk_arguments(argv):
+    """bulk 명령의 인수를 파싱합니다."""
+    parser = argparse.ArgumentParser(
+        prog='main.py bulk',
+        description='인벤토리 파일로 여러 장비의 설정 스크립트를 한 번에 생성합니다.'
+    )
+    parser.add_argument(
+        '--inventory',
+        required=True,
+        help='인벤토리 파일 경로 (.csv, .yaml/.yml, .jsonl)'
+    )
+    parser.add_argument(
+        '--format',
+        dest='fmt',
+        choices=['csv', 'yaml', 'jsonl'],
+        help='인벤토리 형식 (기본값: 확장자로 판별)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='output',
+        help='설정 파일 저장 폴더 (기본값: output)'
+    )
+    parser.add_argument(
+        '--template-dir',
+        default='config_templates',
+        help='템플릿 폴더 (기본값: config_templates)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='작업 프로세스 수 (기본값: CPU 코어 수)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=256,
+        help='프로세스당 한 번에 처리할 장비 수 (기본값: 256)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='매니페스트를 사용해 입력이 바뀐 장비만 다시 생성하고, 인벤토리에서 빠진 장비의 파일을 삭제'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='증분 모드에서 매니페스트와 관계없이 모든 장비를 다시 렌더링 (내용이 같은 파일은 쓰지 않음)'
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error('--workers는 1 이상이어야 합니다.')
+    if args.batch_size < 1:
+        parser.error('--batch-size는 1 이상이어야 합니다.')
+    return args
+
+
+def _init_worker(template_dir):
+    """작업 프로세스 시작 시 템플릿을 미리 컴파일합니다."""
+    template_registry.warm(template_dir)
+
+
+def render_row(row, template_dir='config_templates'):
+    """
+    인벤토리 한 행을 렌더링합니다.
+
+    반환값: (args, 설정 내용 조각의 iterator). 입력 오류가 있으면 InventoryError 또는 LayoutError가 발생합니다.
+    """
+    if isinstance(row, Exception):
+        raise row
+
+    args = row_to_args(row)
+
+    if args.device_type not in DEVICE_TYPES:
+        raise InventoryError(f"지원하지 않는 장비 타입입니다: {args.device_type}")
+    if '/' in args.hostname or '\\' in args.hostname or args.hostname in ('.', '..'):
+        raise InventoryError(f"호스트명에 경로 문자를 사용할 수 없습니다: {args.hostname}")
+
+    errors = collect_argument_errors(args)
+    if errors:
+        raise InventoryError('; '.join(errors))
+
+    template_vars = prepare_template_vars(args)
+    template = template_registry.get_template(args.device_type, template_dir)
+    return args, template_registry.iter_render(template, template_vars)
+
+
+def render_batch(batch, output_dir, template_dir):
+    """
+    행 묶음을 렌더링하고 파일로 저장합니다 (작업 프로세스에서 실행).
+
+    반환값: (저장된 파일 수, [(행 번호, 호스트명, 오류 메시지), ...])
+    """
+    written = 0
+    errors = []
+    for line_no, row in batch:
+        hostname = row.get('hostname', '') if isinstance(row, dict) else ''
+        try:
+            args, chunks = render_row(row, template_dir)
+            filepath = Path(output_dir) / output_filename(args.hostname, args.device_type)
+            write_atomic(filepath, chunks)
+            written += 1
+        except Exception as e:
+            errors.append((line_no, hostname, str(e)))
+    return written, errors
+
+
+def _write_if_changed(filepath, chunks, previous_hash):
+    """
+    렌더링 조각을 임시 파일에 쓰면서 해시를 계산하고, 내용이 달라진 경우에만 파일을 교체합니다.
+
+    previous_hash가 None이면(매니페스트에 없던 파일) 디스크에 있는 파일의 해시와 비교합니다.
+    반환값: (출력 해시, 파일을 교체했는지 여부)
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+    digest = manifest.new_hash()
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                digest.update(chunk.encode('utf-8'))
+                f.write(chunk)
+        digest = digest.hexdigest()
+        if previous_hash is not None:
+            same = previous_hash == digest and filepath.exists()
+        else:
+            # 매니페스트가 없던 파일(일반 모드로 생성 등)은 디스크 내용과 직접 비교
+            same = manifest.file_hash(filepath) == digest
+        if same:
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, filepath)
+        return digest, not same
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def render_changed_batch(batch, output_dir, template_dir):
+    """
+    입력이 바뀐 행 묶음을 렌더링하고, 내용이 달라진 파일만 저장합니다 (증분 모드, 작업 프로세스에서 실행).
+
+    batch 항목: (행 번호, 행 데이터, 행 해시, 이전 출력 해시 또는 None)
+    반환값: (저장된 파일 수, 내용이 같아 건너뛴 파일 수,
+            [(파일명, 행 해시, 장비 타입, 출력 해시), ...], [(행 번호, 호스트명, 오류 메시지), ...])
+    """
+    written = 0
+    unchanged = 0
+    results = []
+    errors = []
+    for line_no, row, row_digest, previous_hash in batch:
+        hostname = row.get('hostname', '') if isinstance(row, dict) else ''
+        try:
+            args, chunks = render_row(row, template_dir)
+            filename = output_filename(args.hostname, args.device_type)
+            digest, replaced = _write_if_changed(Path(output_dir) / filename, chunks, previous_hash)
+            if replaced:
+                written += 1
+            else:
+                unchanged += 1
+            results.append((filename, row_digest, args.device_type, digest))
+        except Exception as e:
+            errors.append((line_no, hostname, str(e)))
+    return written, unchanged, results, errors
+
+
+def iter_batches(rows, batch_size):
+    """행 스트림을 batch_size 크기의 리스트로 묶습니다."""
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_bulk(inventory, output_dir='output', template_dir='config_templates',
+             workers=None, batch_size=256, fmt=None, on_error=None):
+    """
+    인벤토리 전체를 렌더링합니다.
+
+    메모리 사용량을 일정하게 유지하기 위해 처리 중인 묶음 수를 작업 프로세스 수의 2배로 제한합니다.
+    반환값: (저장된 파일 수, 오류 수)
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    total_written = 0
+    total_errors = 0
+
+    def collect(done):
+        nonlocal total_written, total_errors
+        for future in done:
+            written, errors = future.result()
+            total_written += written
+            total_errors += len(errors)
+            if on_error:
+                for error in errors:
+                    on_error(*error)
+
+    batches = iter_batches(iter_inventory(inventory, fmt), batch_size)
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(template_dir,)) as executor:
+        pending = set()
+        for batch in batches:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(render_batch, batch, output_dir, template_dir))
+        collect(pending)
+
+    return total_written, total_errors
+
+
+def run_incremental(inventory, output_dir='output', template_dir='config_templates',
+                    workers=None, batch_size=256, fmt=None, force=False, on_error=None):
+    """
+    매니페스트를 사용해 인벤토리를 증분 생성합니다.
+
+    - 행, 템플릿, 생성기 지문이 이전 실행과 같고 출력 파일이 있으면 렌더링하지 않습니다.
+    - 다시 렌더링한 결과가 기존 파일과 같으면 파일을 쓰지 않습니다.
+    - 매니페스트에 있지만 인벤토리에서 빠진 장비의 출력 파일을 삭제합니다.
+      오류가 있는 행이 하나라도 있으면 잘못 삭제하지 않도록 삭제를 건너뜁니다.
+
+    반환값: {'total', 'skipped', 'rendered', 'written', 'unchanged', 'deleted', 'errors'}
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    build = manifest.Manifest(output_dir, manifest.generator_fingerprint(GENERATOR_VERSION))
+    build.load()
+    if force:
+        build.compatible = False
+    template_hashes = manifest.TemplateHashes(template_dir)
+    layout_hashes = manifest.FileHashes()
+    existing = manifest.existing_outputs(output_dir)
+
+    stats = dict.fromkeys(('total', 'skipped', 'rendered', 'written', 'unchanged', 'deleted', 'errors'), 0)
+    entries = {}
+    seen = set()
+
+    def report(line_no, hostname, message):
+        stats['errors'] += 1
+        if on_error:
+            on_error(line_no, hostname, message)
+
+    def collect(done):
+        for future in done:
+            written, unchanged, results, errors = future.result()
+            stats['written'] += written
+            stats['unchanged'] += unchanged
+            for filename, row_digest, device_type, digest in results:
+                entries[filename] = [row_digest, template_hashes.get(device_type), digest]
+            for error in errors:
+                report(*error)
+
+    def changed_rows():
+        """입력이 바뀐 행만 (행 번호, 행, 행 해시, 이전 출력 해시)로 내보냅니다."""
+        for line_no, row in iter_inventory(inventory, fmt):
+            stats['total'] += 1
+            if isinstance(row, Exception):
+                report(line_no, '', str(row))
+                continue
+            try:
+                args = row_to_args(row)
+            except InventoryError as e:
+                report(line_no, row.get('hostname', '') if isinstance(row, dict) else '', str(e))
+                continue
+            filename = output_filename(args.hostname, args.device_type)
+            seen.add(filename)
+            row_digest = manifest.row_hash(args)
+            if isinstance(args.layout, str):
+                # 레이아웃 파일은 경로만 행에 기록되므로 파일 내용의 해시를 함께 반영
+                row_digest = manifest.content_hash(f"{row_digest}/{layout_hashes.get(args.layout)}")
+            if (filename in existing
+                    and build.is_current(filename, row_digest, template_hashes.get(args.device_type))):
+                entries[filename] = build.entries[filename]
+                stats['skipped'] += 1
+                continue
+            stats['rendered'] += 1
+            yield line_no, row, row_digest, build.output_hash(filename)
+
+    batches = iter_batches(changed_rows(), batch_size)
+
+    # 작업 프로세스는 첫 묶음을 제출할 때 시작되므로, 바뀐 장비가 없으면 프로세스를 띄우지 않음
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(template_dir,)) as executor:
+        pending = set()
+        for batch in batches:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(render_changed_batch, batch, output_dir, template_dir))
+        collect(pending)
+
+    if stats['errors']:
+        # 오류 행의 이전 출력과 기록은 그대로 유지
+        for filename, entry in build.entries.items():
+            entries.setdefault(filename, entry)
+    else:
+        for filename in build.entries.keys() - seen:
+            # 매니페스트에 기록된, 출력 폴더 바로 아래의 파일만 삭제
+            if os.path.basename(filename) != filename or filename.startswith('.'):
+                continue
+            try:
+                (output_path / filename).unlink()
+                stats['deleted'] += 1
+            except FileNotFoundError:
+                pass
+
+    build.save(entries)
+    return stats
+
+
+def bulk_main(argv):
+    """bulk 명령 진입점. 종료 코드를 반환합니다."""
+    args = parse_bulk_arguments(argv)
+
+    def report_error(line_no, hostname, message):
+        label = f" ({hostname})" if hostname else ''
+        print(f"  - {line_no}행{label}: {message}", file=sys.stderr)
+
+    start = time.perf_counter()
+    try:
+        if args.incremental:
+            stats = run_incremental(
+                args.inventory,
+                output_dir=args.output_dir,
+                template_dir=args.template_dir,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                fmt=args.fmt,
+                force=args.force,
+                on_error=report_error
+            )
+        else:
+            written, error_count = run_bulk(
+                args.inventory,
+                output_dir=args.output_dir,
+                template_dir=args.template_dir,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                fmt=args.fmt,
+                on_error=report_error
+            )
+    except (InventoryError, OSError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if args.incremental:
+        print(f"[SUCCESS] 증분 생성 완료: {args.output_dir} ({elapsed:.2f}초) - "
+              f"전체 {stats['total']}대, 변경 없음 {stats['skipped']}대, 다시 렌더링 {stats['rendered']}대 "
+              f"(저장 {stats['written']}, 내용 동일 {stats['unchanged']}), 삭제 {stats['deleted']}개")
+        error_count = stats['errors']
+        if error_count:
+            print("[INFO] 오류가 있어 인벤토리에서 빠진 장비의 파일 삭제를 건너뛰었습니다.", file=sys.stderr)
+    else:
+        rate = written / elapsed if elapsed > 0 else 0
+        print(f"[SUCCESS] {written}개 설정 파일 생성 완료: {args.output_dir} "
+              f"({elapsed:.2f}초, {rate:.0f}대/초, 작업 프로세스 {args.workers}개)")
+    if error_count:
+        print(f"[WARNING] {error_count}개 행에서 오류가 발생했습니다 (위 목록 참고).", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+설정 차이 계산
+생성된 설정과 장비의 현재(running) 설정을 제조사별 구조로 파싱하여,
+현재 설정을 생성된 설정으로 바꾸는 데 필요한 최소한의 추가/삭제 명령을 계산합니다.
+
+제조사별 구문:
+  cisco, arista, hp  들여쓰기 블록 (hp는 블록 끝에 'exit', cisco/arista 물리 인터페이스 삭제는 'default interface')
+  juniper            'set' 명령 (삭제는 'delete')
+  fortinet           'config' / 'edit' / 'next' / 'end' 블록 (삭제는 'unset' / 'delete')
+  alcatel            'configure' 명령 (삭제는 'configure no ...')
+
+각 설정을 한 번씩 읽어 줄 텍스트를 키로 하는 트리를 만들고 같은 키끼리 비교하므로,
+수십만 줄 설정에서도 줄 수에 비례하는 시간 안에 계산됩니다.
+
+사용 예시:
+  python main.py diff --vendor cisco --generated output/SW-01_cisco_config.txt --running running.txt
+"""
+
+import argparse
+import re
+import sys
+
+# 줄 전체가 주석이거나 구분선인 경우
+COMMENT_PREFIXES = ('!', '#')
+
+# 장비가 설정 출력 앞에 붙이는 머리말 (비교 대상 아님)
+BANNER_PREFIXES = ('Building configuration', 'Current configuration', 'Last configuration change')
+
+# 값이 하나뿐인 명령: 새 값을 설정하면 이전 값이 대체되므로 삭제 명령을 따로 만들지 않음
+# '*'는 VLAN ID, 포트, 따옴표로 묶은 이름 등 명령 중간의 값 하나 (예: 'configure vlan * name')
+SINGLE_VALUE_COMMANDS = {
+    'cisco': ('hostname', 'description', 'name', 'ip address', 'ip default-gateway', 'switchport mode',
+              'switchport access vlan'),
+    'arista': ('hostname', 'description', 'name', 'ip address', 'ip default-gateway', 'switchport mode',
+               'switchport access vlan'),
+    'hp': ('hostname', 'name', 'ip address', 'ip default-gateway'),
+    'juniper': ('set system host-name',),
+    'alcatel': ('configure system name', 'configure vlan * name', 'configure vlan * ipaddress',
+                'configure vlan * ip-mtu', 'configure vlan * port *', 'configure port * description',
+                'configure port * admin-state', 'configure router interface * ip address'),
+    'fortinet': (),
+}
+
+
+# 삭제할 수 없는 물리 인터페이스가 아닌 논리 인터페이스 (cisco, arista)
+LOGICAL_INTERFACE_PREFIXES = ('vlan', 'loopback', 'port-channel', 'tunnel', 'vxlan', 'nve', 'bvi', 'null',
+                              'recirc-channel')
+
+
+class ConfigDiffError(ValueError):
+    """설정 차이를 계산할 수 없을 때 발생하는 예외"""
+
+
+class Node:
+    """설정 트리의 한 줄. 하위 줄은 키(정규화된 줄) 순서대로 보관합니다."""
+
+    __slots__ = ('line', 'children')
+
+    def __init__(self, line=''):
+        self.line = line
+        self.children = {}
+
+    def child(self, key, line=None):
+        """키에 해당하는 하위 노드를 반환하고, 없으면 만듭니다. 같은 블록이 여러 번 나오면 합쳐집니다."""
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = Node(key if line is None else line)
+        elif line is not None:
+            # 같은 키의 값이 다시 설정되면 마지막 값이 적용됨 (fortinet 'set')
+            node.line = line
+        return node
+
+
+def _command_pattern(command):
+    """값이 하나뿐인 명령을 줄 앞부분과 비교하는 정규식으로 변환합니다."""
+    return re.compile(r'(?:"[^"]*"|\S+)'.join(re.escape(part) for part in command.split('*')) + ' ')
+
+
+def _significant_lines(text):
+    """비교 대상이 되는 (원본 줄, 앞뒤 공백을 제거한 줄)을 반환합니다."""
+    for raw in text.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith(COMMENT_PREFIXES) or stripped.startswith(BANNER_PREFIXES):
+            continue
+        yield raw, ' '.join(stripped.split())
+
+
+def parse_indented(text, block_end=None):
+    """들여쓰기로 계층을 표현하는 설정(cisco, arista, hp)을 트리로 변환합니다."""
+    root = Node()
+    stack = [(-1, root)]
+    for raw, line in _significant_lines(text):
+        if line == 'end' or line == block_end:
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        node = stack[-1][1].child(line)
+        stack.append((indent, node))
+    return root
+
+
+def parse_flat(text, prefix):
+    """한 줄이 하나의 완전한 명령인 설정(juniper 'set', alcatel 'configure')을 트리로 변환합니다."""
+    root = Node()
+    for _, line in _significant_lines(text):
+        if line.startswith(prefix):
+            root.child(line)
+    return root
+
+
+def parse_fortinet(text):
+    """config/edit/next/end 블록으로 이루어진 Fortinet 설정을 트리로 변환합니다."""
+    root = Node()
+    stack = [root]
+    for _, line in _significant_lines(text):
+        if line.startswith(('config ', 'edit ')):
+            stack.append(stack[-1].child(line))
+        elif line in ('next', 'end'):
+            if len(stack) > 1:
+                stack.pop()
+        elif line.startswith('set '):
+            # 'set <속성> <값>'은 속성 이름이 키 (값이 바뀌면 같은 키의 다른 줄)
+            stack[-1].child(' '.join(line.split(' ', 2)[:2]), line)
+        elif line.startswith('unset '):
+            stack[-1].children.pop('set ' + line[len('unset '):], None)
+        else:
+            stack[-1].child(line)
+    return root
+
+
+class _Syntax:
+    """제조사 구문별 파싱, 삭제 명령, 출력 형식"""
+
+    def __init__(self, vendor):
+        self.vendor = vendor
+        self.single_value = [_command_pattern(command) for command in SINGLE_VALUE_COMMANDS[vendor]]
+        if vendor in ('cisco', 'arista', 'hp'):
+            self.indent = ' ' if vendor == 'cisco' else '   '
+            self.separator = '!'
+        elif vendor == 'fortinet':
+            self.indent = '    '
+            self.separator = None
+        else:
+            self.indent = ''
+            self.separator = None
+
+    def parse(self, text):
+        if self.vendor == 'hp':
+            return parse_indented(text, block_end='exit')
+        if self.vendor in ('cisco', 'arista'):
+            return parse_indented(text)
+        if self.vendor == 'juniper':
+            return parse_flat(text, 'set ')
+        if self.vendor == 'alcatel':
+            return parse_flat(text, 'configure ')
+        return parse_fortinet(text)
+
+    def block_end(self, line):
+        """블록을 닫는 줄을 반환합니다 (없으면 None)."""
+        if self.vendor == 'hp':
+            return 'exit'
+        if self.vendor == 'fortinet':
+            return 'end' if line.startswith('config ') else 'next'
+        return None
+
+    def removable(self, node):
+        """블록 전체를 한 줄로 삭제할 수 있으면 True (fortinet 'config' 블록은 하위 항목을 각각 삭제)."""
+        return not (self.vendor == 'fortinet' and node.line.startswith('config '))
+
+    def negate(self, line):
+        """설정 줄을 삭제하는 명령을 반환합니다."""
+        if self.vendor == 'juniper':
+            return 'delete ' + line[len('set '):]
+        if self.vendor == 'alcatel':
+            return 'configure no ' + line[len('configure '):]
+        if self.vendor == 'fortinet':
+            if line.startswith('edit '):
+                return 'delete ' + line[len('edit '):]
+            return 'unset ' + line.split(' ', 2)[1]
+        if line.startswith('no '):
+            return line[len('no '):]
+        if self.vendor in ('cisco', 'arista') and line.startswith('interface ') and _is_physical(line):
+            # 물리 인터페이스는 삭제할 수 없으므로 기본 설정으로 되돌림
+            return 'default ' + line
+        return 'no ' + line
+
+    def replace_key(self, line):
+        """값이 하나뿐인 명령이면 명령 부분을 반환합니다."""
+        if line.endswith(' secondary'):
+            # 보조 주소는 여러 개일 수 있음
+            return None
+        for pattern in self.single_value:
+            match = pattern.match(line)
+            if match:
+                return match.group(0).rstrip()
+        return None
+
+
+def _is_physical(line):
+    """'interface <이름>' 줄이 물리 인터페이스이면 True (하위 인터페이스 Gi1/0/1.100은 논리 인터페이스)"""
+    name = line[len('interface '):].strip().lower()
+    return not name.startswith(LOGICAL_INTERFACE_PREFIXES) and '.' not in name
+
+
+def _diff_tree(syntax, generated, running, path, groups, partial):
+    """
+    두 트리를 비교하여 (경로, 삭제 노드 목록, 추가 노드 목록) 묶음을 groups에 추가합니다.
+
+    같은 경로(상위 블록)의 변경은 하나의 묶음으로 모아 블록 진입 명령을 한 번만 출력합니다.
+    """
+    added = []
+    nested = []
+    for key, node in generated.children.items():
+        current = running.children.get(key)
+        if current is None or current.line != node.line:
+            added.append(node)
+        elif node.children or current.children:
+            nested.append((node, current))
+
+    removed = []
+    replaced = {syntax.replace_key(node.line) for node in added} - {None}
+    added_lines = {node.line for node in added}
+    for key, node in running.children.items():
+        if key in generated.children:
+            continue
+        if replaced and syntax.replace_key(node.line) in replaced:
+            continue
+        if not node.children and syntax.negate(node.line) in added_lines:
+            # 'shutdown' -> 'no shutdown'처럼 추가 명령이 곧 삭제 명령인 경우
+            continue
+        if partial and not path:
+            # 생성 설정이 일부분인 경우 생성 설정에 없는 최상위 항목은 유지
+            continue
+        if syntax.removable(node):
+            removed.append(node)
+        else:
+            nested.append((Node(node.line), node))
+
+    if added or removed:
+        groups.append((path, removed, added))
+    for node, current in nested:
+        _diff_tree(syntax, node, current, path + (node.line,), groups, partial)
+
+
+def _render(syntax, groups):
+    """변경 묶음을 제조사 형식의 명령 목록으로 변환합니다."""
+    commands = []
+    current_path = ()
+
+    def close_to(depth):
+        for level in range(len(current_path) - 1, depth - 1, -1):
+            end = syntax.block_end(current_path[level])
+            if end:
+                commands.append(syntax.indent * level + end)
+
+    def emit_subtree(node, depth):
+        if depth == 0 and node.children and commands and syntax.separator and commands[-1] != syntax.separator:
+            commands.append(syntax.separator)
+        commands.append(syntax.indent * depth + node.line)
+        if node.children:
+            for child in node.children.values():
+                emit_subtree(child, depth + 1)
+            end = syntax.block_end(node.line)
+            if end:
+                commands.append(syntax.indent * depth + end)
+
+    for path, removed, added in groups:
+        common = 0
+        while common < min(len(path), len(current_path)) and path[common] == current_path[common]:
+            common += 1
+        close_to(common)
+        if common == 0 and path and commands and syntax.separator and commands[-1] != syntax.separator:
+            commands.append(syntax.separator)
+        for depth in range(common, len(path)):
+            commands.append(syntax.indent * depth + path[depth])
+        current_path = path
+
+        depth = len(path)
+        for node in removed:
+            commands.append(syntax.indent * depth + syntax.negate(node.line))
+        for node in added:
+            emit_subtree(node, depth)
+    close_to(0)
+    return commands
+
+
+def diff_configs(vendor, generated, running, partial=False):
+    """
+    현재 설정(running)을 생성된 설정(generated)으로 바꾸는 명령을 계산합니다.
+
+    partial이 True이면 생성 설정을 전체가 아닌 일부로 보고, 생성 설정에 없는 최상위 항목은 삭제하지 않습니다.
+    반환값: {'commands': [명령, ...], 'added': 추가 줄 수, 'removed': 삭제 명령 수}
+    """
+    vendor = str(vendor or '').lower()
+    if vendor not in SINGLE_VALUE_COMMANDS:
+        raise ConfigDiffError(f"지원하지 않는 제조사입니다: {vendor}")
+
+    syntax = _Syntax(vendor)
+    groups = []
+    _diff_tree(syntax, syntax.parse(generated), syntax.parse(running), (), groups, partial)
+
+    def count(nodes):
+        total = 0
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            total += 1
+            stack.extend(node.children.values())
+        return total
+
+    return {
+        'commands': _render(syntax, groups),
+        'added': sum(count(added) for _, _, added in groups),
+        'removed': sum(len(removed) for _, removed, _ in groups),
+    }
+
+
+def parse_diff_arguments(argv):
+    """diff 명령의 인수를 파싱합니다."""
+    parser = argparse.ArgumentParser(
+        prog='main.py diff',
+        description='생성된 설정과 장비의 현재 설정을 비교하여 적용할 추가/삭제 명령을 출력합니다.'
+    )
+    parser.add_argument(
+        '--vendor',
+        required=True,
+        choices=sorted(SINGLE_VALUE_COMMANDS),
+        help='제조사'
+    )
+    parser.add_argument(
+        '--generated',
+        required=True,
+        help='생성된 설정 파일 경로'
+    )
+    parser.add_argument(
+        '--running',
+        required=True,
+        help='장비의 현재 설정 파일 경로 (show running-config 등)'
+    )
+    parser.add_argument(
+        '--partial',
+        action='store_true',
+        help='생성된 설정에 없는 최상위 항목은 삭제하지 않음 (생성 설정이 일부분인 경우)'
+    )
+    parser.add_argument(
+        '--output',
+        help='변경 명령을 저장할 파일 경로 (기본값: 표준 출력)'
+    )
+    return parser.parse_args(argv)
+
+
+def diff_main(argv):
+    """diff 명령 진입점. 종료 코드를 반환합니다."""
+    args = parse_diff_arguments(argv)
+    try:
+        with open(args.generated, 'r', encoding='utf-8') as f:
+            generated = f.read()
+        with open(args.running, 'r', encoding='utf-8', errors='replace') as f:
+            running = f.read()
+        result = diff_configs(args.vendor, generated, running, partial=args.partial)
+    except (OSError, ConfigDiffError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+    text = '\n'.join(result['commands'])
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n' if text else '')
+    elif text:
+        print(text)
+
+    print(f"[INFO] 추가 {result['added']}줄, 삭제 {result['removed']}줄", file=sys.stderr)
+    return 0
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다중 제조사 생성 모드 (fan-out)
+하나의 설계(호스트명, 관리 IP, VLAN, 게이트웨이)를 여러 제조사의 설정 스크립트로 한 번에 렌더링합니다.
+기본 설정은 제조사당 1ms 미만이므로 현재 프로세스에서 렌더링하고, 큰 포트 레이아웃(FANOUT_POOL_MIN_INTERFACES개
+이상의 인터페이스)이 붙은 제조사가 둘 이상일 때만 그 제조사들을 작업 프로세스에서 동시에 렌더링합니다.
+
+사용 예시:
+  python main.py fanout --hostname SW-HQ-01 --ip 192.168.10.2 --mask 255.255.255.0 --vlan 100 --gateway 192.168.10.254
+  python main.py fanout --hostname SW-HQ-01 --ip 192.168.10.2 --mask 255.255.255.0 --vlan 100 \\
+      --vendors cisco,juniper --interface juniper=ge-0/0/1 --layout cisco=stack.yaml
+
+관리 인터페이스와 포트 레이아웃은 제조사마다 이름이 다르므로 제조사=값 형식으로 지정하며,
+지정하지 않은 제조사는 기본 관리 인터페이스를 사용합니다.
+"""
+
+import argparse
+import os
+import sys
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import history
+import port_layout
+import template_registry
+from main import (
+    DEVICE_TYPES,
+    collect_argument_errors,
+    output_filename,
+    prepare_template_vars,
+    record_history,
+    write_atomic,
+)
+
+# 제조사별 기본 관리 인터페이스 (웹 화면의 기본값과 동일)
+DEFAULT_INTERFACES = {
+    'cisco': 'Gi1/0/1',
+    'arista': 'Management1',
+    'alcatel': '1/1/1',
+    'hp': '1',
+    'juniper': 'ge-0/0/0',
+}
+DEFAULT_PORT = 'port1'
+
+# 작업 프로세스에서 렌더링할 포트 레이아웃 크기 (인터페이스 수, 약 5ms/1000개). 작업 프로세스 시작 비용(약 20ms)보다
+# 렌더링이 오래 걸리는 레이아웃만 프로세스를 나누어 렌더링
+FANOUT_POOL_MIN_INTERFACES = int(os.environ.get('FANOUT_POOL_MIN_INTERFACES', 5000))
+
+
+def _vendor_values(parser, values, option):
+    """제조사=값 형식의 옵션 목록을 {제조사: 값}으로 변환합니다."""
+    result = {}
+    for item in values or []:
+        vendor, sep, value = item.partition('=')
+        vendor = vendor.strip().lower()
+        if not sep or not value.strip():
+            parser.error(f"{option}은(는) 제조사=값 형식이어야 합니다: {item}")
+        if vendor not in DEVICE_TYPES:
+            parser.error(f"{option}: 지원하지 않는 장비 타입입니다: {vendor}")
+        result[vendor] = value.strip()
+    return result
+
+
+def parse_fanout_arguments(argv):
+    """fanout 명령의 인수를 파싱합니다."""
+    parser = argparse.ArgumentParser(
+        prog='main.py fanout',
+        description='하나의 설계로 여러 제조사의 설정 스크립트를 동시에 생성합니다.'
+    )
+    parser.add_argument('--hostname', required=True, help='장비 호스트명')
+    parser.add_argument('--ip', '--mgmt-ip', dest='mgmt_ip', required=True, help='관리 IP 주소')
+    parser.add_argument('--mask', '--mgmt-mask', dest='mgmt_mask', required=True, help='서브넷 마스크')
+    parser.add_argument('--vlan', '--mgmt-vlan', dest='mgmt_vlan', type=int,
+                        help='관리 VLAN ID (Fortinet 외 장비용)')
+    parser.add_argument('--gateway',
+                        help='기본 게이트웨이 (지정한 경우에만 기본 경로를 설정)')
+    parser.add_argument('--port', '--mgmt-port', dest='mgmt_port', default=DEFAULT_PORT,
+                        help=f'Fortinet 관리 포트 (기본값: {DEFAULT_PORT})')
+    parser.add_argument(
+        '--vendors',
+        default=','.join(DEVICE_TYPES),
+        help=f"생성할 제조사 목록, 쉼표로 구분 (기본값: {','.join(DEVICE_TYPES)})"
+    )
+    parser.add_argument(
+        '--interface',
+        dest='interfaces',
+        action='append',
+        metavar='VENDOR=INTERFACE',
+        help='제조사별 관리 인터페이스 (여러 번 지정 가능, 예: juniper=ge-0/0/1)'
+    )
+    parser.add_argument(
+        '--layout',
+        dest='layouts',
+        action='append',
+        metavar='VENDOR=FILE',
+        help='제조사별 포트 레이아웃 파일 (여러 번 지정 가능, 예: cisco=stack.yaml)'
+    )
+    parser.add_argument('--output-dir', default='output', help='설정 파일 저장 폴더 (기본값: output)')
+    parser.add_argument('--template-dir', default='config_templates',
+                        help='템플릿 폴더 (기본값: config_templates)')
+    args = parser.parse_args(argv)
+
+    vendors = []
+    for vendor in args.vendors.split(','):
+        vendor = vendor.strip().lower()
+        if vendor and vendor not in vendors:
+            if vendor not in DEVICE_TYPES:
+                parser.error(f"지원하지 않는 장비 타입입니다: {vendor}")
+            vendors.append(vendor)
+    if not vendors:
+        parser.error('--vendors에 제조사를 하나 이상 지정해야 합니다.')
+    args.vendors = vendors
+    args.interfaces = _vendor_values(parser, args.interfaces, '--interface')
+    args.layouts = _vendor_values(parser, args.layouts, '--layout')
+    return args
+
+
+def vendor_args(args, vendor):
+    """공통 설계에 제조사별 값을 적용하여 단일 생성 모드와 같은 형식의 인수를 만듭니다."""
+    return Namespace(
+        device_type=vendor,
+        hostname=args.hostname,
+        mgmt_ip=args.mgmt_ip,
+        mgmt_mask=args.mgmt_mask,
+        mgmt_vlan=args.mgmt_vlan,
+        mgmt_interface=args.interfaces.get(vendor, DEFAULT_INTERFACES.get(vendor)),
+        gateway=args.gateway,
+        mgmt_port=args.mgmt_port,
+        layout=args.layouts.get(vendor),
+    )
+
+
+def render_vendor(args, output_dir, template_dir):
+    """
+    제조사 하나의 설정을 렌더링하여 저장합니다 (큰 레이아웃은 작업 프로세스에서 실행).
+
+    반환값: (파일 경로, 렌더링 시간(초))
+    """
+    started = time.perf_counter()
+    template_vars = prepare_template_vars(args)
+    template = template_registry.get_template(args.device_type, template_dir)
+    filepath = Path(output_dir) / output_filename(args.hostname, args.device_type)
+    write_atomic(filepath, template_registry.iter_render(template, template_vars))
+    return filepath, time.perf_counter() - started
+
+
+def layout_size(device_args):
+    """제조사에 붙은 포트 레이아웃의 인터페이스 수 (레이아웃이 없거나 읽을 수 없으면 0, 오류는 렌더링할 때 보고)"""
+    try:
+        layout = port_layout.resolve_layout(device_args.layout)
+    except port_layout.LayoutError:
+        return 0
+    return len(layout.interfaces) if layout is not None else 0
+
+
+def run_fanout(args, on_result=None):
+    """
+    선택한 모든 제조사를 렌더링합니다.
+
+    큰 포트 레이아웃이 붙은 제조사가 둘 이상이면 그 제조사들은 작업 프로세스에서 동시에 렌더링하고,
+    나머지는 그동안 현재 프로세스에서 렌더링합니다.
+    on_result(제조사, 파일 경로 또는 None, 렌더링 시간 또는 오류 메시지)는 완료되는 순서대로 호출됩니다.
+    생성한 설정은 생성 이력 저장소에 기록합니다.
+    반환값: 오류 수
+    """
+    jobs = {}
+    errors = 0
+    for vendor in args.vendors:
+        device_args = vendor_args(args, vendor)
+        problems = collect_argument_errors(device_args)
+        if problems:
+            errors += 1
+            if on_result:
+                on_result(vendor, None, '; '.join(problems))
+            continue
+        jobs[vendor] = device_args
+    if not jobs:
+        return errors
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    store = history.HistoryStore()
+
+    def finish(vendor, render):
+        nonlocal errors
+        try:
+            filepath, elapsed = render()
+        except port_layout.LayoutError as e:
+            errors += 1
+            result = (None, f"포트 레이아웃 - {e}")
+        except Exception as e:
+            errors += 1
+            result = (None, str(e))
+        else:
+            result = (filepath, elapsed)
+            record_history(jobs[vendor], filepath, elapsed, source='cli_fanout', store=store)
+        if on_result:
+            on_result(vendor, *result)
+
+    large = [vendor for vendor, device_args in jobs.items()
+             if device_args.layout and layout_size(device_args) >= FANOUT_POOL_MIN_INTERFACES]
+    if len(large) < 2:
+        large = []
+    executor = ProcessPoolExecutor(max_workers=len(large)) if large else None
+    try:
+        futures = {
+            executor.submit(render_vendor, jobs[vendor], args.output_dir, args.template_dir): vendor
+            for vendor in large
+        }
+        for vendor, device_args in jobs.items():
+            if vendor not in large:
+                finish(vendor, lambda: render_vendor(device_args, args.output_dir, args.template_dir))
+        for future in as_completed(futures):
+            finish(futures[future], future.result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return errors
+
+
+def fanout_main(argv):
+    """fanout 명령 진입점. 종료 코드를 반환합니다."""
+    args = parse_fanout_arguments(argv)
+
+    def report(vendor, filepath, detail):
+        if filepath is None:
+            print(f"  - {vendor}: {detail}", file=sys.stderr)
+        else:
+            print(f"  {vendor}: {filepath} ({detail * 1000:.1f}ms)")
+
+    start = time.perf_counter()
+    try:
+        error_count = run_fanout(args, on_result=report)
+    except OSError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    succeeded = len(args.vendors) - error_count
+    if error_count:
+        print(f"오류: {len(args.vendors)}개 제조사 중 {error_count}개 생성 실패", file=sys.stderr)
+    print(f"[SUCCESS] {succeeded}개 제조사 설정 생성 완료: {args.output_dir} ({elapsed:.2f}초)")
+    return 1 if error_count else 0
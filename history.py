@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+설정 생성 이력 저장소
+웹(/api/generate 등)과 CLI(main.py)에서 생성한 설정을 SQLite에 기록하고, 호스트명/제조사/시간으로 조회합니다.
+
+- 기록 항목: 생성 시각, 호스트명, 제조사, 경로(web, cli 등), 생성 모드, 입력 해시, 모델, 소요 시간,
+  템플릿 대체 사유, 설정 크기, 압축(zlib)된 설정 본문
+- 조회는 (조건, 생성 시각, id) 인덱스를 따라가는 커서 방식 페이지네이션이므로,
+  이력이 수백만 건이어도 페이지마다 읽는 행 수가 일정합니다 (OFFSET 사용하지 않음).
+- 최대 보관 건수를 넘으면 오래된 이력부터 삭제합니다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_HISTORY_PATH = os.environ.get('HISTORY_PATH', os.path.join('.history', 'history.sqlite3'))
+DEFAULT_MAX_ROWS = int(os.environ.get('HISTORY_MAX_ROWS', 1000000))  # 0이면 삭제하지 않음
+HISTORY_ENABLED = os.environ.get('HISTORY', '1').lower() not in ('0', 'false', 'no')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# 최대 보관 건수 검사 주기 (기록 횟수)와 한 번에 삭제하는 최대 건수
+# (보관 건수를 크게 줄인 경우에도 기록 요청이 오래 기다리지 않도록 여러 번에 나눠 삭제)
+EVICTION_INTERVAL = 1000
+EVICTION_BATCH = 10 * EVICTION_INTERVAL
+
+# 입력 해시에서 제외하는 필드 (API 키, 내부 상태)
+_EXCLUDED_INPUT_FIELDS = ('api_key',)
+
+_LIST_COLUMNS = ('id, created_at, hostname, vendor, source, mode, input_hash, model, '
+                 'elapsed_ms, fallback, config_size')
+
+
+class HistoryError(ValueError):
+    """조회 조건이 올바르지 않을 때 발생하는 예외"""
+
+
+def input_hash(data):
+    """
+    생성 입력(요청 필드 또는 CLI 인수)의 해시를 만듭니다.
+
+    API 키와 내부 상태(_로 시작하는 필드)는 제외하므로, 같은 입력은 사용자와 관계없이 같은 해시가 됩니다.
+    """
+    fields = {key: value for key, value in data.items()
+              if key not in _EXCLUDED_INPUT_FIELDS and not key.startswith('_')}
+    payload = json.dumps(fields, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def parse_time(value, field):
+    """조회 시간 조건(epoch 초 또는 ISO 8601 문자열)을 epoch 초로 변환합니다."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        raise HistoryError(f'{field}는 epoch 초 또는 ISO 8601 시각이어야 합니다: {value}')
+
+
+def encode_cursor(created_at, row_id):
+    """다음 페이지 커서 (마지막 행의 생성 시각과 id)"""
+    return f"{created_at!r}:{row_id}"
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, row_id = cursor.rsplit(':', 1)
+        return float(created_at), int(row_id)
+    except (AttributeError, ValueError):
+        raise HistoryError(f'잘못된 커서입니다: {cursor}')
+
+
+class HistoryStore:
+    """SQLite 설정 생성 이력 저장소"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, max_rows=DEFAULT_MAX_ROWS, enabled=HISTORY_ENABLED):
+        self.path = path if enabled else None
+        self.max_rows = max_rows
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+
+        self.recorded = 0
+        self.errors = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        """SQLite 연결을 지연 생성합니다. 디스크를 사용할 수 없으면 None을 반환합니다."""
+        if self._conn is None and self.path:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS history ('
+                    ' id INTEGER PRIMARY KEY,'
+                    ' created_at REAL NOT NULL,'
+                    ' hostname TEXT NOT NULL,'
+                    ' vendor TEXT NOT NULL,'
+                    ' source TEXT NOT NULL,'
+                    ' mode TEXT,'
+                    ' input_hash TEXT NOT NULL,'
+                    ' model TEXT,'
+                    ' elapsed_ms REAL,'
+                    ' fallback TEXT,'
+                    ' config_size INTEGER NOT NULL,'
+                    ' config BLOB NOT NULL)'
+                )
+                # 조회 조건별 인덱스 (id는 rowid이므로 각 인덱스의 마지막 열로 포함됨)
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_history_created ON history(created_at)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_history_hostname ON history(hostname, created_at)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_history_vendor ON history(vendor, created_at)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_history_input ON history(input_hash)')
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                print(f"생성 이력 저장소 초기화 실패 (이력을 기록하지 않음): {e}")
+                self.path = None
+        return self._conn
+
+    def record(self, hostname, vendor, config, source, input_hash, mode=None, model=None,
+               elapsed=None, fallback=None):
+        """
+        생성 결과 1건을 기록하고 id를 반환합니다. 기록에 실패하면 None을 반환합니다 (생성 결과에는 영향 없음).
+
+        elapsed는 초 단위 소요 시간이며, 설정 본문은 zlib으로 압축하여 저장합니다.
+        """
+        if not self.enabled or not config:
+            return None
+        body = config.encode('utf-8')
+        compressed = zlib.compress(body, 6)
+        elapsed_ms = round(elapsed * 1000, 3) if elapsed is not None else None
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                cursor = conn.execute(
+                    'INSERT INTO history (created_at, hostname, vendor, source, mode, input_hash, model,'
+                    ' elapsed_ms, fallback, config_size, config) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (now, hostname or '', vendor, source, mode, input_hash, model,
+                     elapsed_ms, fallback, len(body), compressed)
+                )
+                self._writes += 1
+                if self.max_rows and self._writes % EVICTION_INTERVAL == 0:
+                    self._evict(conn)
+                conn.commit()
+                self.recorded += 1
+                return cursor.lastrowid
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"생성 이력 기록 오류: {e}")
+                return None
+
+    def _evict(self, conn):
+        """최대 보관 건수를 넘은 오래된 이력을 삭제합니다 (id는 기록 순서대로 증가)."""
+        cursor = conn.execute(
+            'DELETE FROM history WHERE id <= MIN((SELECT MAX(id) FROM history) - ?,'
+            ' (SELECT MIN(id) FROM history) + ?)',
+            (self.max_rows, EVICTION_BATCH - 1)
+        )
+        self.evictions += cursor.rowcount
+
+    def query(self, hostname=None, vendor=None, since=None, until=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        조건에 맞는 이력을 최신순으로 조회합니다 (설정 본문 제외).
+
+        since/until은 epoch 초 또는 ISO 8601 시각이며 until은 포함하지 않습니다.
+        반환값: {'items': [...], 'next_cursor': 다음 페이지 커서 또는 None}
+        """
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise HistoryError(f'limit는 정수여야 합니다: {limit}')
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        conditions = []
+        params = []
+        if hostname:
+            conditions.append('hostname = ?')
+            params.append(hostname)
+        if vendor:
+            conditions.append('vendor = ?')
+            params.append(vendor)
+        since = parse_time(since, 'since')
+        if since is not None:
+            conditions.append('created_at >= ?')
+            params.append(since)
+        until = parse_time(until, 'until')
+        if until is not None:
+            conditions.append('created_at < ?')
+            params.append(until)
+        if cursor:
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+
+        table = 'history'
+        if hostname:
+            # 제조사 조건이 함께 있어도 선택도가 높은 호스트명 인덱스를 사용
+            table += ' INDEXED BY idx_history_hostname'
+        sql = f'SELECT {_LIST_COLUMNS} FROM {table}'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return {'items': [], 'next_cursor': None}
+            rows = conn.execute(sql, params).fetchall()
+
+        items = [self._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def get(self, entry_id):
+        """이력 1건을 설정 본문과 함께 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                f'SELECT {_LIST_COLUMNS}, config FROM history WHERE id = ?', (entry_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = self._row_to_dict(row[:-1])
+        entry['config'] = zlib.decompress(row[-1]).decode('utf-8')
+        return entry
+
+    @staticmethod
+    def _row_to_dict(row):
+        (row_id, created_at, hostname, vendor, source, mode, digest, model,
+         elapsed_ms, fallback, config_size) = row
+        return {
+            'id': row_id,
+            'created_at': created_at,
+            'hostname': hostname,
+            'vendor': vendor,
+            'source': source,
+            'mode': mode,
+            'input_hash': digest,
+            'model': model,
+            'elapsed_ms': elapsed_ms,
+            'fallback': fallback,
+            'config_size': config_size,
+        }
+
+    def stats(self):
+        """저장소 상태를 반환합니다."""
+        with self._lock:
+            entries = 0
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    # COUNT(*) 대신 id 범위로 추정 (오래된 이력은 id 순서대로 삭제됨)
+                    low, high = conn.execute('SELECT MIN(id), MAX(id) FROM history').fetchone()
+                    entries = high - low + 1 if high is not None else 0
+                except sqlite3.Error:
+                    pass
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'max_rows': self.max_rows,
+                'recorded': self.recorded,
+                'errors': self.errors,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 응답 압축과 캐시 검증자(ETag, Cache-Control)
+
+- 압축: 클라이언트의 Accept-Encoding에 따라 일정 크기 이상의 텍스트/JSON 응답을 brotli(설치된 경우) 또는
+  gzip으로 압축합니다. 스트리밍 응답(NDJSON, SSE, 조각 단위 렌더링, ZIP)은 압축하지 않습니다.
+- 압축한 응답의 ETag는 약한 ETag(W/"...")로 바꿔, 압축 여부와 관계없이 If-None-Match 재검증(304)이 동작합니다.
+- 정적 파일은 내용 해시를 URL(?v=...)에 붙여 오래 캐시하고, ETag가 있는 응답의 압축 결과는 메모리에 재사용합니다.
+
+brotli 압축은 brotli 패키지가 필요합니다 (pip install brotli). 없으면 gzip만 사용합니다.
+"""
+
+import functools
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 기본 설정값 (환경 변수로 변경 가능)
+COMPRESS_ENABLED = os.environ.get('HTTP_COMPRESS', '1').lower() not in ('0', 'false', 'no')
+DEFAULT_MIN_SIZE = int(os.environ.get('HTTP_COMPRESS_MIN_SIZE', 1024))  # 바이트
+DEFAULT_GZIP_LEVEL = int(os.environ.get('HTTP_GZIP_LEVEL', 6))
+DEFAULT_BROTLI_QUALITY = int(os.environ.get('HTTP_BROTLI_QUALITY', 5))
+# 파일 응답(send_file)은 이 크기까지만 메모리에서 압축
+MAX_FILE_SIZE = 4 * 1024 * 1024
+# 압축 결과를 보관할 ETag 응답 수
+CACHE_SIZE = 128
+
+# 버전(?v=)이 붙은 정적 파일과 그 밖의 정적 파일/기본값 API의 캐시 시간 (초)
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 0))
+DEFAULT_VENDOR_CONFIG_MAX_AGE = int(os.environ.get('VENDOR_CONFIG_MAX_AGE', 3600))
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+    'image/svg+xml',
+)
+
+
+def accepted_encodings(accept_encoding):
+    """Accept-Encoding 헤더를 {인코딩: 가중치}로 변환합니다."""
+    encodings = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding):
+    """사용할 압축 방식(br, gzip)을 선택합니다. 압축하지 않으면 None을 반환합니다."""
+    encodings = accepted_encodings(accept_encoding)
+    wildcard = encodings.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = None
+    best_quality = 0.0
+    for name in candidates:
+        quality = encodings.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(data, encoding):
+    """바이트 데이터를 지정한 방식으로 압축합니다."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=DEFAULT_BROTLI_QUALITY)
+    # mtime=0: 같은 내용은 항상 같은 압축 결과
+    return gzip.compress(data, compresslevel=DEFAULT_GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_TYPES
+
+
+class ResponseCompressor:
+    """
+    Flask 응답 압축기 (after_request에서 호출)
+
+    ETag가 있는 응답(정적 파일, 기본값 API)은 (ETag, 압축 방식)별 압축 결과를 메모리에 보관하여 재사용합니다.
+    """
+
+    def __init__(self, min_size=DEFAULT_MIN_SIZE, enabled=COMPRESS_ENABLED, cache_size=CACHE_SIZE):
+        self.min_size = min_size
+        self.enabled = enabled
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.compressed = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _compress(self, data, encoding, etag=None):
+        if etag is None:
+            return compress(data, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return body
+        body = compress(data, encoding)
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return body
+
+    def compress_response(self, response, accept_encoding):
+        """응답을 압축합니다. 압축할 수 없는 응답은 그대로 반환합니다."""
+        if not self.enabled or not is_compressible(response.mimetype):
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if 'Content-Encoding' in response.headers or 'Content-Range' in response.headers:
+            return response
+        if response.is_streamed and not response.direct_passthrough:
+            # 생성기로 보내는 스트리밍 응답은 조각이 바로 전달되어야 하므로 압축하지 않음
+            return response
+        length = response.content_length
+        if length is not None and (length < self.min_size
+                                   or (response.direct_passthrough and length > MAX_FILE_SIZE)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            return response
+
+        # 파일 응답(send_file)은 내용을 읽어 일반 응답으로 전환
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        body = self._compress(data, encoding, etag if etag and not weak else None)
+        if not self._accept(data, body):
+            return response
+
+        if etag and not weak:
+            # 압축 표현은 원본과 바이트가 다르므로 약한 ETag로 표시 (If-None-Match는 약한 비교)
+            response.set_etag(etag, weak=True)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compress_body(self, data, accept_encoding):
+        """
+        응답 본문(바이트)을 압축합니다 (비동기 서버의 JSON 응답용).
+
+        반환값: (본문, 압축 방식). 압축하지 않으면 압축 방식은 None입니다.
+        """
+        if not self.enabled or len(data) < self.min_size:
+            return data, None
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            return data, None
+        body = compress(data, encoding)
+        if not self._accept(data, body):
+            return data, None
+        return body, encoding
+
+    def _accept(self, data, body):
+        """압축 결과가 원본보다 작으면 통계에 반영하고 True를 반환합니다."""
+        if len(body) >= len(data):
+            return False
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(body)
+        return True
+
+    def stats(self):
+        """압축기 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'min_size': self.min_size,
+                'brotli': brotli is not None,
+                'compressed': self.compressed,
+                'cache_entries': len(self._cache),
+                'cache_hits': self.cache_hits,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+            }
+
+
+def content_etag(payload):
+    """응답 내용(바이트 또는 문자열)의 ETag 값을 만듭니다."""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+@functools.lru_cache(maxsize=256)
+def _file_version(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        return content_etag(f.read())[:12]
+
+
+def static_version(static_folder, filename):
+    """정적 파일 내용의 짧은 해시 (URL의 ?v= 값). 파일이 없으면 None을 반환합니다."""
+    path = os.path.join(static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _file_version(path, stat.st_mtime_ns, stat.st_size)
+
+
+def static_cache_control(response, versioned, max_age=DEFAULT_STATIC_MAX_AGE):
+    """
+    정적 파일 응답의 Cache-Control을 설정합니다.
+
+    내용 해시가 URL에 포함된 경우(versioned)는 내용이 바뀌면 URL도 바뀌므로 오래 캐시하고(immutable),
+    그 밖에는 max_age 동안 캐시한 뒤 ETag/Last-Modified로 재검증합니다 (0이면 매번 재검증).
+    """
+    cache_control = response.cache_control
+    cache_control.public = True
+    if versioned or max_age:
+        # send_file이 기본으로 붙이는 no-cache 제거
+        cache_control.no_cache = None
+        cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE if versioned else max_age
+        if versioned:
+            cache_control.immutable = True
+    else:
+        cache_control.no_cache = True
+    return response
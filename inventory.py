@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+장비 인벤토리 로더
+CSV, YAML, JSONL 형식의 인벤토리 파일을 한 행씩 읽어 main.py와 같은 형태의 인수로 변환합니다.
+"""
+
+import argparse
+import csv
+import functools
+import json
+from pathlib import Path
+
+# 인벤토리 컬럼명 별칭 -> main.py 인수 이름
+FIELD_ALIASES = {
+    'device_type': 'device_type',
+    'vendor': 'device_type',
+    'hostname': 'hostname',
+    'ip': 'mgmt_ip',
+    'mgmt_ip': 'mgmt_ip',
+    'mask': 'mgmt_mask',
+    'mgmt_mask': 'mgmt_mask',
+    'vlan': 'mgmt_vlan',
+    'mgmt_vlan': 'mgmt_vlan',
+    'interface': 'mgmt_interface',
+    'mgmt_interface': 'mgmt_interface',
+    'port': 'mgmt_port',
+    'mgmt_port': 'mgmt_port',
+    'gateway': 'gateway',
+    'layout': 'layout',
+}
+
+# main.py의 argparse 기본값과 동일하게 유지
+DEFAULT_FIELDS = {
+    'device_type': None,
+    'hostname': None,
+    'mgmt_ip': None,
+    'mgmt_mask': None,
+    'mgmt_vlan': None,
+    'mgmt_interface': None,
+    'gateway': None,
+    'mgmt_port': None,
+    'layout': None,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _field_name(key):
+    """컬럼명을 main.py 인수 이름으로 변환합니다 (행마다 같은 컬럼명이 반복되므로 캐시)."""
+    return FIELD_ALIASES.get(str(key).strip().lower())
+
+
+class InventoryError(ValueError):
+    """인벤토리 행을 해석할 수 없을 때 발생하는 예외"""
+
+
+def detect_format(path):
+    """파일 확장자로 인벤토리 형식을 판별합니다."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.yaml', '.yml'):
+        return 'yaml'
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise InventoryError(f"지원하지 않는 인벤토리 형식입니다: {path} (csv, yaml, jsonl 지원)")
+
+
+def _iter_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        # 헤더가 1행이므로 데이터는 2행부터 시작
+        for line_no, row in enumerate(reader, start=2):
+            yield line_no, row
+
+
+def _iter_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, InventoryError(f"JSON 파싱 오류: {e}")
+
+
+def _iter_yaml(path):
+    try:
+        import yaml
+    except ImportError:
+        raise InventoryError("YAML 인벤토리를 읽으려면 PyYAML이 필요합니다: pip install pyyaml")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        # 여러 문서(---)로 나뉜 파일도 문서 단위로 순차 처리
+        index = 0
+        for document in yaml.safe_load_all(f):
+            if document is None:
+                continue
+            if isinstance(document, dict) and 'devices' in document:
+                document = document['devices']
+            if isinstance(document, dict):
+                document = [document]
+            for row in document:
+                index += 1
+                yield index, row
+
+
+def iter_inventory(path, fmt=None):
+    """
+    인벤토리 파일을 스트리밍으로 읽어 (행 번호, 행 데이터) 튜플을 생성합니다.
+
+    행 데이터는 dict이며, 행 자체를 해석할 수 없는 경우 InventoryError 인스턴스가 전달됩니다.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == 'csv':
+        return _iter_csv(path)
+    if fmt == 'jsonl':
+        return _iter_jsonl(path)
+    if fmt == 'yaml':
+        return _iter_yaml(path)
+    raise InventoryError(f"지원하지 않는 인벤토리 형식입니다: {fmt}")
+
+
+def row_to_args(row):
+    """인벤토리 행을 main.py의 argparse.Namespace와 같은 형태로 변환합니다."""
+    if not isinstance(row, dict):
+        raise InventoryError("행 형식이 올바르지 않습니다 (키-값 객체가 필요합니다).")
+
+    values = dict(DEFAULT_FIELDS)
+    for key, value in row.items():
+        if key is None:
+            continue
+        field = _field_name(key)
+        if field is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value == '' or value is None:
+            continue
+        values[field] = value
+
+    for field in ('device_type', 'hostname', 'mgmt_ip', 'mgmt_mask'):
+        if not values[field]:
+            raise InventoryError(f"필수 필드가 누락되었습니다: {field}")
+
+    values['device_type'] = str(values['device_type']).lower()
+    values['hostname'] = str(values['hostname'])
+
+    if values['mgmt_vlan'] is not None:
+        try:
+            values['mgmt_vlan'] = int(values['mgmt_vlan'])
+        except (TypeError, ValueError):
+            raise InventoryError(f"VLAN ID가 숫자가 아닙니다: {values['mgmt_vlan']}")
+
+    return argparse.Namespace(**values)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 IP 주소 관리(IPAM)
+설정 가능한 주소 풀에서 서로 겹치지 않는 서브넷을 결정적으로(같은 입력이면 같은 결과) 할당합니다.
+
+- 빈 주소 범위는 버디(buddy) 방식으로 관리합니다. 프리픽스 길이별로 빈 블록의 힙(가장 낮은 주소)과
+  집합(존재 확인)을 두고, 할당 시 필요한 크기가 될 때까지 큰 블록을 반으로 나누며, 반환 시 짝(buddy) 블록과
+  다시 합칩니다. 힙에서 뺀 블록은 꺼낼 때 건너뛰므로(지연 삭제) 할당/예약/반환은 모두 O(32 · log n)입니다.
+- 할당 상태는 SubnetAllocator 객체에만 있습니다. 일괄 생성처럼 같은 할당기를 공유하는 요청끼리만
+  주소가 겹치지 않으며, 따로 보낸 요청은 각각 풀의 처음부터 할당합니다.
+- 구조화된 요구사항(network)으로 요구사항 분석 결과와 같은 형식(additional_configs 포함)의 계획을 만들어
+  ChatGPT 분석 호출을 대신합니다.
+- ChatGPT가 제안한 계획은 check_plan으로 검증하여 겹치거나 풀 밖에 있는 서브넷을 새로 할당합니다.
+"""
+
+import bisect
+import heapq
+import ipaddress
+import os
+
+# 기본 주소 풀 (환경 변수 IPAM_POOLS로 변경 가능, 쉼표 구분) - RFC 1918 사설 주소
+DEFAULT_POOLS = tuple(
+    pool.strip() for pool in os.environ.get(
+        'IPAM_POOLS', '10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+    ).split(',') if pool.strip()
+)
+
+# 기본 서브넷 크기
+DEFAULT_MGMT_PREFIX = 24
+DEFAULT_VLAN_PREFIX = 24
+DEFAULT_INTERFACE_PREFIX = 30
+
+
+class IPAMError(ValueError):
+    """주소 할당 또는 구조화된 요구사항 해석 오류"""
+
+
+def prefix_for_hosts(hosts):
+    """필요한 호스트 수를 담을 수 있는 가장 작은 서브넷의 프리픽스 길이를 반환합니다 (최소 /30)."""
+    try:
+        hosts = int(hosts)
+    except (TypeError, ValueError):
+        raise IPAMError(f"호스트 수가 숫자가 아닙니다: {hosts}")
+    if hosts < 1:
+        raise IPAMError(f"호스트 수는 1 이상이어야 합니다: {hosts}")
+    prefix = 30
+    while prefix > 0 and (2 ** (32 - prefix) - 2) < hosts:
+        prefix -= 1
+    return prefix
+
+
+def usable_hosts(network, count):
+    """서브넷의 앞쪽 사용 가능한 호스트 주소 count개를 반환합니다."""
+    if network.prefixlen >= 31:
+        first = int(network.network_address)
+    else:
+        first = int(network.network_address) + 1
+    return [ipaddress.IPv4Address(first + offset) for offset in range(count)]
+
+
+class SubnetAllocator:
+    """주소 풀에서 겹치지 않는 서브넷을 할당하는 버디 할당기"""
+
+    def __init__(self, pools=DEFAULT_POOLS):
+        try:
+            networks = [ipaddress.IPv4Network(pool, strict=True) for pool in pools]
+        except ValueError as e:
+            raise IPAMError(f"주소 풀 형식이 올바르지 않습니다: {e}")
+        if not networks:
+            raise IPAMError("주소 풀이 비어있습니다.")
+
+        self.pools = list(ipaddress.collapse_addresses(networks))
+        self._pool_starts = [int(pool.network_address) for pool in self.pools]
+        self._free = {prefix: set() for prefix in range(33)}  # 프리픽스 길이 -> 빈 블록 시작 주소
+        self._heaps = {prefix: [] for prefix in range(33)}  # 같은 블록의 최소 힙 (지연 삭제)
+        self._allocated = {}  # 시작 주소 -> 프리픽스 길이
+        for pool in self.pools:
+            self._push_free(pool.prefixlen, int(pool.network_address))
+
+    def _pool_of(self, address):
+        """주소가 속한 풀을 반환합니다 (없으면 None)."""
+        index = bisect.bisect_right(self._pool_starts, address) - 1
+        if index >= 0 and address <= int(self.pools[index].broadcast_address):
+            return self.pools[index]
+        return None
+
+    def _push_free(self, prefix, address):
+        if address not in self._free[prefix]:
+            self._free[prefix].add(address)
+            heapq.heappush(self._heaps[prefix], address)
+
+    def _pop_free(self, prefix, address):
+        """빈 블록을 꺼냅니다. 힙에 남은 항목은 _pop_lowest에서 건너뜁니다."""
+        blocks = self._free[prefix]
+        if address not in blocks:
+            return False
+        blocks.remove(address)
+        heap = self._heaps[prefix]
+        if len(heap) > 2 * len(blocks) + 64:
+            # 지운 항목이 쌓이면 힙을 다시 만듦 (분할 상환 O(1))
+            heap[:] = blocks
+            heapq.heapify(heap)
+        return True
+
+    def _pop_lowest(self, prefix):
+        """가장 낮은 주소의 빈 블록을 꺼냅니다 (없으면 None)."""
+        blocks, heap = self._free[prefix], self._heaps[prefix]
+        while heap:
+            address = heapq.heappop(heap)
+            if address in blocks:
+                blocks.remove(address)
+                return address
+        return None
+
+    def _split_to(self, address, prefix, target_address, target_prefix):
+        """빈 블록을 target이 될 때까지 반으로 나누고, target이 아닌 절반은 빈 목록에 넣습니다."""
+        while prefix < target_prefix:
+            prefix += 1
+            half = 2 ** (32 - prefix)
+            if target_address >= address + half:
+                self._push_free(prefix, address)
+                address += half
+            else:
+                self._push_free(prefix, address + half)
+
+    def allocate(self, prefix):
+        """지정한 크기의 서브넷을 가장 낮은 주소부터 할당합니다."""
+        if not 0 <= prefix <= 32:
+            raise IPAMError(f"프리픽스 길이가 범위(0-32)를 벗어났습니다: {prefix}")
+        for size in range(prefix, -1, -1):
+            address = self._pop_lowest(size)
+            if address is not None:
+                self._split_to(address, size, address, prefix)
+                self._allocated[address] = prefix
+                return ipaddress.IPv4Network((address, prefix))
+        raise IPAMError(f"주소 풀에 /{prefix} 서브넷을 할당할 공간이 없습니다.")
+
+    def reserve(self, network):
+        """
+        특정 서브넷을 할당된 것으로 표시합니다.
+
+        풀 밖에 있거나 이미 할당된 서브넷과 겹치면 IPAMError가 발생합니다.
+        """
+        network = ipaddress.IPv4Network(network, strict=False)
+        address, prefix = int(network.network_address), network.prefixlen
+        pool = self._pool_of(address)
+        if pool is None or not network.subnet_of(pool):
+            raise IPAMError(f"{network}는 주소 풀({', '.join(map(str, self.pools))}) 밖에 있습니다.")
+        for size in range(prefix, pool.prefixlen - 1, -1):
+            block = address & ~(2 ** (32 - size) - 1)
+            if self._pop_free(size, block):
+                self._split_to(block, size, address, prefix)
+                self._allocated[address] = prefix
+                return network
+        raise IPAMError(f"{network}는 이미 할당된 서브넷과 겹칩니다.")
+
+    def release(self, network):
+        """할당된 서브넷을 반환하고, 짝 블록이 비어 있으면 합칩니다."""
+        network = ipaddress.IPv4Network(network, strict=False)
+        address, prefix = int(network.network_address), network.prefixlen
+        if self._allocated.get(address) != prefix:
+            raise IPAMError(f"{network}는 할당된 서브넷이 아닙니다.")
+        del self._allocated[address]
+        pool = self._pool_of(address)
+        while prefix > pool.prefixlen:
+            buddy = address ^ (2 ** (32 - prefix))
+            if not self._pop_free(prefix, buddy):
+                break
+            address = min(address, buddy)
+            prefix -= 1
+        self._push_free(prefix, address)
+
+    def allocated(self):
+        """할당된 서브넷 목록을 주소 순으로 반환합니다."""
+        return [ipaddress.IPv4Network((address, prefix)) for address, prefix in sorted(self._allocated.items())]
+
+    def free_addresses(self):
+        """남은 주소 수를 반환합니다."""
+        return sum(len(blocks) * 2 ** (32 - prefix) for prefix, blocks in self._free.items())
+
+
+def _subnet_prefix(entry, default_prefix):
+    """구조화된 요구사항 항목에서 서브넷 크기(prefix 또는 hosts)를 읽습니다."""
+    if entry.get('prefix') is not None:
+        try:
+            prefix = int(str(entry['prefix']).lstrip('/'))
+        except ValueError:
+            raise IPAMError(f"프리픽스 길이가 숫자가 아닙니다: {entry['prefix']}")
+        if not 8 <= prefix <= 31:
+            raise IPAMError(f"프리픽스 길이가 범위(8-31)를 벗어났습니다: {prefix}")
+        return prefix
+    if entry.get('hosts') is not None:
+        return prefix_for_hosts(entry['hosts'])
+    return default_prefix
+
+
+def _vlan_id(value, label):
+    try:
+        vlan_id = int(value)
+    except (TypeError, ValueError):
+        raise IPAMError(f"{label} 값이 숫자가 아닙니다: {value}")
+    if not 1 <= vlan_id <= 4094:
+        raise IPAMError(f"{label} 값이 범위(1-4094)를 벗어났습니다: {vlan_id}")
+    return vlan_id
+
+
+def plan_network(spec, hostname=None, defaults=None, allocator=None):
+    """
+    구조화된 요구사항으로 네트워크 구성 계획을 만듭니다.
+
+    spec 예시:
+      {"pools": ["10.20.0.0/16"], "mgmt_vlan": 100, "mgmt_hosts": 50,
+       "vlans": [{"vlan_id": 10, "name": "USERS", "hosts": 200}],
+       "interfaces": [{"name": "Gi1/0/48", "description": "uplink"}],
+       "routing": [{"protocol": "OSPF", "area": "0"}]}
+
+    반환값은 요구사항 분석 결과와 같은 형식입니다 (hostname, mgmt_ip, mgmt_mask, mgmt_vlan,
+    mgmt_interface, gateway, additional_configs). allocator를 넘기면 여러 장비가 같은 풀을 공유합니다.
+    """
+    if not isinstance(spec, dict):
+        raise IPAMError("network는 객체(JSON)여야 합니다.")
+    defaults = defaults or {}
+    if allocator is None:
+        allocator = SubnetAllocator(spec.get('pools') or DEFAULT_POOLS)
+
+    mgmt_vlan = _vlan_id(spec.get('mgmt_vlan', defaults.get('mgmt_vlan', 100)), 'mgmt_vlan')
+    mgmt_network = allocator.allocate(_subnet_prefix(
+        {'prefix': spec.get('mgmt_prefix'), 'hosts': spec.get('mgmt_hosts')}, DEFAULT_MGMT_PREFIX
+    ))
+    gateway, mgmt_ip = usable_hosts(mgmt_network, 2)
+
+    plan = {
+        'hostname': spec.get('hostname') or hostname or 'Device-01',
+        'mgmt_ip': str(mgmt_ip),
+        'mgmt_mask': str(mgmt_network.netmask),
+        'mgmt_vlan': mgmt_vlan,
+        'mgmt_interface': spec.get('mgmt_interface') or defaults.get('mgmt_interface', ''),
+        'gateway': str(gateway),
+        'additional_configs': [],
+    }
+    additional_configs = plan['additional_configs']
+    allocated = [mgmt_network]
+
+    vlans = spec.get('vlans') or []
+    if not isinstance(vlans, list):
+        raise IPAMError("vlans는 목록이어야 합니다.")
+    used_vlans = {mgmt_vlan}
+    for vlan in vlans:
+        if not isinstance(vlan, dict):
+            raise IPAMError(f"vlans 항목 형식이 올바르지 않습니다: {vlan}")
+        vlan_id = _vlan_id(vlan.get('vlan_id'), 'vlan_id')
+        if vlan_id in used_vlans:
+            raise IPAMError(f"VLAN {vlan_id}이 중복되었습니다.")
+        used_vlans.add(vlan_id)
+        network = allocator.allocate(_subnet_prefix(vlan, DEFAULT_VLAN_PREFIX))
+        allocated.append(network)
+        additional_configs.append({
+            'type': 'vlan',
+            'vlan_id': vlan_id,
+            'name': vlan.get('name') or f'VLAN{vlan_id}',
+            'ip': str(usable_hosts(network, 1)[0]),
+            'subnet': str(network.netmask),
+        })
+
+    interfaces = spec.get('interfaces') or []
+    if not isinstance(interfaces, list):
+        raise IPAMError("interfaces는 목록이어야 합니다.")
+    for interface in interfaces:
+        if not isinstance(interface, dict) or not interface.get('name'):
+            raise IPAMError(f"interfaces 항목에 name이 없습니다: {interface}")
+        network = allocator.allocate(_subnet_prefix(interface, DEFAULT_INTERFACE_PREFIX))
+        allocated.append(network)
+        additional_configs.append({
+            'type': 'interface',
+            'name': interface['name'],
+            'ip': str(usable_hosts(network, 1)[0]),
+            'subnet': str(network.netmask),
+            'description': interface.get('description', ''),
+        })
+
+    routing = spec.get('routing') or []
+    if isinstance(routing, dict):
+        routing = [routing]
+    if not isinstance(routing, list):
+        raise IPAMError("routing은 목록이어야 합니다.")
+    summary = [str(network) for network in ipaddress.collapse_addresses(allocated)]
+    for route in routing:
+        if not isinstance(route, dict) or not route.get('protocol'):
+            raise IPAMError(f"routing 항목에 protocol이 없습니다: {route}")
+        for network in [route['network']] if route.get('network') else summary:
+            additional_configs.append({
+                'type': 'routing',
+                'protocol': route['protocol'],
+                'network': network,
+                'area': str(route.get('area', '0')),
+            })
+
+    return plan
+
+
+def _entry_network(ip, mask):
+    """IP 주소와 서브넷 마스크로 (주소, 서브넷)을 반환합니다. 형식이 잘못되면 None."""
+    try:
+        interface = ipaddress.IPv4Interface(f"{ip}/{str(mask).lstrip('/')}")
+    except (ValueError, TypeError):
+        return None
+    return interface.ip, interface.network
+
+
+def _is_usable(ip, network):
+    return network.prefixlen >= 31 or ip not in (network.network_address, network.broadcast_address)
+
+
+def check_plan(ip_info, pools=DEFAULT_POOLS, allocator=None):
+    """
+    ChatGPT가 제안한 계획을 검증하고 문제가 있는 주소를 고칩니다.
+
+    관리 서브넷, VLAN/인터페이스 서브넷이 주소 풀 밖에 있거나 서로 겹치면 같은 크기의 서브넷을 새로 할당하고,
+    게이트웨이가 관리 서브넷 밖에 있으면 관리 서브넷의 첫 번째 주소로 바꿉니다.
+
+    반환값: (수정된 계획, 수정 내역 목록)
+    """
+    if allocator is None:
+        allocator = SubnetAllocator(pools)
+    plan = dict(ip_info)
+    corrections = []
+
+    def place(label, ip, mask, default_prefix):
+        """서브넷을 예약하고 (주소, 서브넷)을 반환합니다. 예약할 수 없으면 새로 할당합니다."""
+        parsed = _entry_network(ip, mask)
+        if parsed is not None:
+            address, network = parsed
+            try:
+                allocator.reserve(network)
+            except IPAMError as e:
+                reason = str(e)
+            else:
+                if _is_usable(address, network):
+                    return address, network
+                address = usable_hosts(network, 1)[0]
+                corrections.append(f"{label}: {ip}는 사용할 수 없는 주소라 {address}로 변경했습니다.")
+                return address, network
+            prefix = network.prefixlen
+        else:
+            reason = f"주소 형식이 올바르지 않습니다 ({ip}/{mask})"
+            prefix = default_prefix
+        network = allocator.allocate(prefix)
+        address = usable_hosts(network, 1)[0]
+        corrections.append(f"{label}: {reason} {network}를 새로 할당했습니다.")
+        return address, network
+
+    mgmt_ip, mgmt_network = place('관리 IP', plan.get('mgmt_ip'), plan.get('mgmt_mask', '255.255.255.0'),
+                                  DEFAULT_MGMT_PREFIX)
+    gateway = plan.get('gateway')
+    parsed = _entry_network(gateway, mgmt_network.prefixlen) if gateway else None
+    if parsed is None or parsed[1] != mgmt_network or parsed[0] == mgmt_ip or not _is_usable(*parsed):
+        first, second = usable_hosts(mgmt_network, 2)
+        new_gateway = str(second if first == mgmt_ip else first)
+        if gateway:
+            corrections.append(f"게이트웨이: {gateway}는 관리 서브넷({mgmt_network})에 맞지 않아 {new_gateway}로 변경했습니다.")
+        gateway = new_gateway
+    plan['mgmt_ip'] = str(mgmt_ip)
+    plan['mgmt_mask'] = str(mgmt_network.netmask)
+    plan['gateway'] = gateway
+
+    additional_configs = []
+    for config in plan.get('additional_configs') or []:
+        if not isinstance(config, dict) or config.get('type') not in ('vlan', 'interface') or not config.get('ip'):
+            additional_configs.append(config)
+            continue
+        config = dict(config)
+        if config['type'] == 'vlan':
+            label, default_prefix = f"VLAN {config.get('vlan_id')}", DEFAULT_VLAN_PREFIX
+        else:
+            label, default_prefix = f"인터페이스 {config.get('name')}", DEFAULT_INTERFACE_PREFIX
+        address, network = place(label, config['ip'], config.get('subnet', '255.255.255.0'), default_prefix)
+        config['ip'] = str(address)
+        config['subnet'] = str(network.netmask)
+        additional_configs.append(config)
+    if 'additional_configs' in plan:
+        plan['additional_configs'] = additional_configs
+
+    return plan, corrections
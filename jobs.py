@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 작업 큐
+오래 걸리는 설정 생성을 제한된 작업 스레드 풀에서 실행하고, 작업 ID로 상태와 결과를 조회합니다.
+
+- 대기 + 실행 중인 작업 수가 최대 큐 길이를 넘으면 새 작업을 거부합니다.
+- 같은 요청 키로 등록한 작업이 대기 중이거나 실행 중이면 새 작업을 만들지 않고 그 작업을 반환합니다.
+- 실행 시간이 제한 시간을 넘은 작업은 timeout 상태로 표시됩니다.
+- 완료된 작업의 결과는 일정 시간이 지나면 삭제됩니다.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+DEFAULT_MAX_QUEUE = int(os.environ.get('JOB_MAX_QUEUE', 100))
+DEFAULT_JOB_TIMEOUT = float(os.environ.get('JOB_TIMEOUT', 180))
+DEFAULT_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 600))
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, TIMEOUT)
+
+
+class QueueFullError(Exception):
+    """작업 큐가 가득 찼을 때 발생하는 예외"""
+
+
+class JobError(Exception):
+    """작업 함수가 사용자에게 보여줄 오류 메시지와 함께 실패를 알릴 때 사용하는 예외"""
+
+
+class Job:
+    """작업 상태 레코드"""
+
+    def __init__(self, key=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.progress = {}
+        self._lock = threading.Lock()
+
+    def update(self, **progress):
+        """실행 중인 작업의 진행 정보를 갱신합니다 (작업 함수에서 호출)."""
+        with self._lock:
+            self.progress.update(progress)
+
+    def _finish(self, status, result=None, error=None):
+        with self._lock:
+            # 이미 timeout 처리된 작업의 늦은 결과는 버림
+            if self.status in FINISHED_STATES:
+                return
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            data = {
+                'job_id': self.id,
+                'status': self.status,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+            if self.progress:
+                data['progress'] = dict(self.progress)
+            if self.status == SUCCEEDED:
+                data['result'] = self.result
+            if self.error:
+                data['error'] = self.error
+            return data
+
+
+class JobQueue:
+    """제한된 작업 스레드 풀 기반 작업 큐"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 job_timeout=DEFAULT_JOB_TIMEOUT, result_ttl=DEFAULT_RESULT_TTL):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._pending = {}  # 요청 키 -> 대기 또는 실행 중인 작업
+        self._active = 0  # 대기 + 실행 중인 작업 수
+        self._lock = threading.Lock()
+
+        self.coalesced = 0
+
+    def _run(self, job, func, args, kwargs):
+        with job._lock:
+            if job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = func(job, *args, **kwargs)
+            job._finish(SUCCEEDED, result=result)
+        except JobError as e:
+            job._finish(FAILED, error=str(e))
+        except Exception as e:
+            print(f"작업 실행 오류 ({job.id}): {e}")
+            import traceback
+            traceback.print_exc()
+            job._finish(FAILED, error=f'작업 실행 중 오류가 발생했습니다: {str(e)}')
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._forget(job)
+
+    def _forget(self, job):
+        """끝난 작업을 요청 키 목록에서 제거합니다 (잠금 상태에서 호출)."""
+        if job.key is not None and self._pending.get(job.key) is job:
+            del self._pending[job.key]
+
+    def _expire(self, now):
+        """제한 시간 초과 작업을 표시하고, 보관 기간이 지난 결과를 삭제합니다. (잠금 상태에서 호출)"""
+        expired = []
+        for job_id, job in self._jobs.items():
+            if job.status == RUNNING and now - job.started_at > self.job_timeout:
+                job._finish(TIMEOUT, error=f'작업 제한 시간({self.job_timeout:.0f}초)을 초과했습니다.')
+            elif job.status == QUEUED and now - job.created_at > self.job_timeout:
+                job._finish(TIMEOUT, error=f'작업이 대기 중 제한 시간({self.job_timeout:.0f}초)을 초과했습니다.')
+            if job.status in FINISHED_STATES:
+                self._forget(job)
+            if job.finished_at and now - job.finished_at > self.result_ttl:
+                expired.append(job_id)
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """
+        작업을 큐에 추가하고 Job을 반환합니다.
+
+        func는 첫 번째 인수로 Job을 받으며, 반환값이 작업 결과가 됩니다.
+        key(요청 키)가 같은 작업이 대기 중이거나 실행 중이면 그 작업을 반환합니다 (중복 클릭 등).
+        큐가 가득 차면 QueueFullError가 발생합니다.
+        """
+        job = Job(key)
+        with self._lock:
+            self._expire(time.time())
+            pending = self._pending.get(key) if key is not None else None
+            if pending is not None:
+                self.coalesced += 1
+                return pending
+            if self._active >= self.max_queue:
+                raise QueueFullError(f'작업 큐가 가득 찼습니다 (최대 {self.max_queue}개).')
+            self._active += 1
+            self._jobs[job.id] = job
+            if key is not None:
+                self._pending[key] = job
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def find_pending(self, key):
+        """요청 키가 같은 대기 또는 실행 중인 작업을 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            self._expire(time.time())
+            job = self._pending.get(key)
+            if job is not None:
+                self.coalesced += 1
+            return job
+
+    def get(self, job_id):
+        """작업을 조회합니다. 없거나 만료되었으면 None을 반환합니다."""
+        with self._lock:
+            self._expire(time.time())
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """큐 상태를 반환합니다."""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'coalesced': self.coalesced,
+                'jobs': counts,
+            }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChatGPT 생성 결과 캐시
+API 키 해시, 정규화된 프롬프트, 모델, temperature 등의 해시를 키로 사용하는 2단계 캐시입니다.
+
+- 1단계: 메모리 LRU 캐시 (프로세스 내)
+- 2단계: SQLite 디스크 캐시 (프로세스/재시작 간 공유)
+- TTL 및 최대 항목 수 기반 제거, 적중/실패 카운터 제공
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', os.path.join('.llm_cache', 'generations.sqlite3'))
+DEFAULT_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))  # 7일
+DEFAULT_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 10000))
+DEFAULT_MEMORY_SIZE = int(os.environ.get('LLM_CACHE_MEMORY_SIZE', 256))
+
+# 디스크 캐시 크기 검사 주기 (쓰기 횟수)
+EVICTION_INTERVAL = 100
+
+
+def _normalize_text(text):
+    """줄바꿈과 줄 끝 공백을 정규화합니다."""
+    if not isinstance(text, str):
+        return text
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip()
+
+
+def make_key(params, scope=None):
+    """
+    요청 파라미터(model, messages, temperature 등)로 캐시 키를 생성합니다.
+
+    scope(API 키 해시)를 지정하면 키에 포함되므로, 캐시된 결과는 같은 API 키의 요청에만 반환됩니다
+    (임의의 API 키로 다른 사용자가 비용을 들여 생성한 결과를 인증 없이 받지 못하도록 함).
+    """
+    normalized = dict(params)
+    if scope is not None:
+        normalized['_scope'] = scope
+    normalized['messages'] = [
+        {'role': message.get('role'), 'content': _normalize_text(message.get('content'))}
+        for message in params.get('messages', [])
+    ]
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """메모리 LRU + SQLite 2단계 생성 결과 캐시"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, memory_size=DEFAULT_MEMORY_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_size = memory_size
+
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connection(self):
+        """SQLite 연결을 지연 생성합니다. 디스크를 사용할 수 없으면 None을 반환합니다."""
+        if self._conn is None and self.path:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS generations ('
+                    ' key TEXT PRIMARY KEY,'
+                    ' value TEXT NOT NULL,'
+                    ' created_at REAL NOT NULL,'
+                    ' accessed_at REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_generations_accessed ON generations(accessed_at)')
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                print(f"LLM 캐시 디스크 초기화 실패 (메모리 캐시만 사용): {e}")
+                self.path = None
+        return self._conn
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """캐시된 값을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        'SELECT value, created_at FROM generations WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None:
+                        value, created_at = row
+                        if now - created_at <= self.ttl:
+                            conn.execute('UPDATE generations SET accessed_at = ? WHERE key = ?', (now, key))
+                            conn.commit()
+                            self._remember(key, value, created_at)
+                            self.disk_hits += 1
+                            return value
+                        conn.execute('DELETE FROM generations WHERE key = ?', (key,))
+                        conn.commit()
+                        self.evictions += 1
+                except sqlite3.Error as e:
+                    print(f"LLM 캐시 조회 오류: {e}")
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """값을 캐시에 저장합니다."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO generations (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, value, now, now)
+                )
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"LLM 캐시 저장 오류: {e}")
+
+    def _evict(self, conn, now):
+        """만료된 항목과 최대 개수를 초과한 오래된 항목을 제거합니다."""
+        cursor = conn.execute('DELETE FROM generations WHERE created_at < ?', (now - self.ttl,))
+        self.evictions += cursor.rowcount
+        count = conn.execute('SELECT COUNT(*) FROM generations').fetchone()[0]
+        if count > self.max_entries:
+            cursor = conn.execute(
+                'DELETE FROM generations WHERE key IN ('
+                ' SELECT key FROM generations ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+            self.evictions += cursor.rowcount
+
+    def clear(self):
+        """모든 캐시 항목을 삭제합니다."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute('DELETE FROM generations')
+                conn.commit()
+
+    def stats(self):
+        """적중/실패 카운터와 현재 크기를 반환합니다."""
+        with self._lock:
+            disk_entries = 0
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    disk_entries = conn.execute('SELECT COUNT(*) FROM generations').fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
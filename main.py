@@ -8,8 +8,13 @@ Python과 Jinja2를 사용하여 네트워크 장비 설정 스크립트를 자
 import argparse
 import os
 import sys
+import time
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import TemplateNotFound
+
+import history
+import port_layout
+import template_registry
 
 # Windows 콘솔 인코딩 설정
 if sys.platform == 'win32':
@@ -22,6 +27,23 @@ if sys.platform == 'win32':
         sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
+# 지원하는 장비 타입
+DEVICE_TYPES = ['cisco', 'arista', 'alcatel', 'hp', 'juniper', 'fortinet']
+
+# 관리 VLAN이 필요한 장비 타입
+VLAN_DEVICE_TYPES = ('cisco', 'arista', 'alcatel', 'hp', 'juniper')
+# 관리 인터페이스가 필요한 장비 타입 (Arista는 관리 VLAN 인터페이스만 사용)
+INTERFACE_DEVICE_TYPES = ('cisco', 'alcatel', 'hp', 'juniper')
+# 템플릿에서 기본 게이트웨이, CIDR 접두사 길이를 사용하는 장비 타입
+GATEWAY_DEVICE_TYPES = ('cisco', 'arista', 'alcatel', 'hp', 'juniper', 'fortinet')
+CIDR_DEVICE_TYPES = ('arista', 'alcatel', 'juniper')
+
+# 렌더링 방식(템플릿 변수 준비 등)이 바뀌면 올려서 증분 생성 시 모든 장비를 다시 렌더링하도록 합니다.
+GENERATOR_VERSION = '1'
+
+# 생성된 설정을 화면에 출력하는 최대 크기 (바이트, 더 크면 파일 경로만 출력)
+PREVIEW_LIMIT = 64 * 1024
+
 
 def parse_arguments():
     """명령줄 인수를 파싱합니다."""
@@ -33,13 +55,26 @@ def parse_arguments():
   python main.py cisco --hostname SW-HQ-01 --ip 192.168.10.254 --mask 255.255.255.0 --vlan 100 --interface Gi1/0/1
   python main.py juniper --hostname JNPR-01 --ip 192.168.10.1 --mask 255.255.255.0 --vlan 100 --interface ge-0/0/0 --gateway 192.168.10.254
   python main.py fortinet --hostname FGT-01 --ip 192.168.10.1 --mask 255.255.255.0 --port port1
+  python main.py arista --hostname ARI-01 --ip 192.168.10.2 --mask 255.255.255.0 --vlan 100 --gateway 192.168.10.254
+  python main.py cisco --hostname SW-STACK-01 --ip 10.0.0.2 --mask 255.255.255.0 --vlan 100 --interface Gi1/0/1 --layout stack.yaml
+
+여러 제조사로 동시에 생성 (같은 설계):
+  python main.py fanout --hostname SW-HQ-01 --ip 192.168.10.2 --mask 255.255.255.0 --vlan 100 --gateway 192.168.10.254
+
+대량 생성 (인벤토리 파일):
+  python main.py bulk --inventory devices.csv --workers 8
+  python main.py bulk --inventory devices.csv --incremental
+  python main.py preflight --inventory devices.csv --report errors.csv
+
+현재 설정과 비교 (변경 명령 생성):
+  python main.py diff --vendor cisco --generated output/SW-HQ-01_cisco_config.txt --running running.txt
         """
     )
     
     parser.add_argument(
         'device_type',
-        choices=['cisco', 'juniper', 'fortinet'],
-        help='장비 타입 (cisco, juniper, fortinet 중 선택)'
+        choices=DEVICE_TYPES,
+        help=f"장비 타입 ({', '.join(DEVICE_TYPES)} 중 선택)"
     )
     
     parser.add_argument(
@@ -64,27 +99,26 @@ def parse_arguments():
         help='서브넷 마스크 (예: 255.255.255.0 또는 CIDR 형식)'
     )
     
-    # Cisco 및 Juniper용 옵션
+    # Cisco, Arista, Alcatel-Lucent, HP, Juniper용 옵션
     parser.add_argument(
         '--vlan',
         '--mgmt-vlan',
         dest='mgmt_vlan',
         type=int,
-        help='관리 VLAN ID (Cisco, Juniper용)'
+        help='관리 VLAN ID (Fortinet 외 장비용)'
     )
     
     parser.add_argument(
         '--interface',
         '--mgmt-interface',
         dest='mgmt_interface',
-        help='관리 인터페이스 (Cisco, Juniper용, 예: Gi1/0/1, ge-0/0/0)'
+        help='관리 인터페이스 (Cisco, Alcatel-Lucent, HP, Juniper용, 예: Gi1/0/1, 1/1/1, 1, ge-0/0/0)'
     )
     
-    # Juniper용 추가 옵션
+    # 모든 장비 공통 옵션
     parser.add_argument(
         '--gateway',
-        default='192.168.10.254',
-        help='기본 게이트웨이 (Juniper용, 기본값: 192.168.10.254)'
+        help='기본 게이트웨이 (지정한 경우에만 기본 경로를 설정)'
     )
     
     # Fortinet용 옵션
@@ -95,23 +129,35 @@ def parse_arguments():
         help='관리 포트 이름 (Fortinet용, 예: port1)'
     )
     
+    # 포트 범위, VLAN 목록, 인터페이스 프로필
+    parser.add_argument(
+        '--layout',
+        help='포트 레이아웃 파일 (.json, .yaml) - 포트 범위, VLAN 목록, 인터페이스 프로필'
+    )
+    
     return parser.parse_args()
 
 
-def validate_arguments(args):
-    """입력 인수의 유효성을 검증합니다."""
+def collect_argument_errors(args):
+    """입력 인수를 검사하여 오류 메시지 목록을 반환합니다."""
     errors = []
     
-    if args.device_type in ['cisco', 'juniper']:
-        if not args.mgmt_vlan:
-            errors.append(f"{args.device_type} 장비는 --vlan 옵션이 필요합니다.")
-        if not args.mgmt_interface:
-            errors.append(f"{args.device_type} 장비는 --interface 옵션이 필요합니다.")
+    if args.device_type in VLAN_DEVICE_TYPES and not args.mgmt_vlan:
+        errors.append(f"{args.device_type} 장비는 --vlan 옵션이 필요합니다.")
+    if args.device_type in INTERFACE_DEVICE_TYPES and not args.mgmt_interface:
+        errors.append(f"{args.device_type} 장비는 --interface 옵션이 필요합니다.")
     
     if args.device_type == 'fortinet':
         if not args.mgmt_port:
             errors.append("Fortinet 장비는 --port 옵션이 필요합니다.")
     
+    return errors
+
+
+def validate_arguments(args):
+    """입력 인수의 유효성을 검증합니다."""
+    errors = collect_argument_errors(args)
+    
     if errors:
         print("오류:", file=sys.stderr)
         for error in errors:
@@ -146,12 +192,14 @@ def prepare_template_vars(args):
         'mgmt_mask': args.mgmt_mask,
     }
     
-    if args.device_type in ['cisco', 'juniper']:
+    if args.device_type in VLAN_DEVICE_TYPES:
         template_vars['mgmt_vlan'] = args.mgmt_vlan
         template_vars['mgmt_interface'] = args.mgmt_interface
     
-    if args.device_type == 'juniper':
+    if args.device_type in GATEWAY_DEVICE_TYPES:
         template_vars['gateway'] = args.gateway
+    
+    if args.device_type in CIDR_DEVICE_TYPES:
         cidr = convert_mask_to_cidr(args.mgmt_mask)
         if cidr:
             template_vars['mgmt_mask_cidr'] = cidr
@@ -162,21 +210,20 @@ def prepare_template_vars(args):
     if args.device_type == 'fortinet':
         template_vars['mgmt_port'] = args.mgmt_port
     
+    # 포트 레이아웃 (오류가 있으면 port_layout.LayoutError 발생)
+    layout = port_layout.resolve_layout(getattr(args, 'layout', None))
+    if layout is not None:
+        template_vars['layout'] = layout
+    
     return template_vars
 
 
 def load_template(device_type, template_dir='config_templates'):
-    """Jinja2 템플릿을 로드합니다."""
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-    
-    template_filename = f"{device_type}_base.j2"
+    """Jinja2 템플릿을 로드합니다 (공유 레지스트리에서 컴파일된 템플릿 재사용)."""
+    template_filename = template_registry.template_filename(device_type)
     
     try:
-        template = env.get_template(template_filename)
+        template = template_registry.get_template(device_type, template_dir)
         return template
     except TemplateNotFound:
         print(f"오류: 템플릿 파일 '{template_filename}'을 찾을 수 없습니다.", file=sys.stderr)
@@ -187,53 +234,114 @@ def load_template(device_type, template_dir='config_templates'):
         sys.exit(1)
 
 
+def output_filename(hostname, device_type):
+    """출력 파일명을 생성합니다: [hostname]_[device_type]_config.txt"""
+    return f"{hostname}_{device_type}_config.txt"
+
+
+def write_atomic(filepath, content):
+    """
+    임시 파일에 기록한 뒤 교체하여, 중단되더라도 반쯤 쓰인 파일이 남지 않도록 합니다.
+    
+    content는 문자열 또는 문자열 조각의 iterable(스트리밍 렌더링 결과)입니다.
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
 def save_output(config_content, hostname, device_type, output_dir='output'):
-    """생성된 설정 내용을 파일로 저장합니다."""
+    """생성된 설정 내용(문자열 또는 스트리밍 렌더링 조각)을 파일로 저장합니다."""
     # output 디렉토리 생성
     Path(output_dir).mkdir(exist_ok=True)
     
-    # 파일명 생성: [hostname]_[device_type]_config.txt
-    filename = f"{hostname}_{device_type}_config.txt"
-    filepath = Path(output_dir) / filename
+    filepath = Path(output_dir) / output_filename(hostname, device_type)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(config_content)
+        write_atomic(filepath, config_content)
         return filepath
     except Exception as e:
-        print(f"오류: 파일 저장 중 문제가 발생했습니다: {e}", file=sys.stderr)
+        print(f"오류: 템플릿 렌더링 또는 파일 저장 중 문제가 발생했습니다: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def record_history(args, output_path, elapsed, source='cli', store=None):
+    """생성한 설정 파일을 생성 이력 저장소에 기록합니다 (HISTORY=0이면 기록하지 않음)."""
+    store = store or history.HistoryStore()
+    if not store.enabled:
+        return None
+    return store.record(
+        args.hostname, args.device_type, Path(output_path).read_text(encoding='utf-8'), source,
+        history.input_hash(vars(args)), mode='template', elapsed=elapsed
+    )
+
+
 def main():
     """메인 함수"""
+    # 대량 생성 모드
+    if len(sys.argv) > 1 and sys.argv[1] == 'bulk':
+        from bulk import bulk_main
+        sys.exit(bulk_main(sys.argv[2:]))
+    
+    # 인벤토리 사전 점검
+    if len(sys.argv) > 1 and sys.argv[1] == 'preflight':
+        from preflight import preflight_main
+        sys.exit(preflight_main(sys.argv[2:]))
+    
+    # 여러 제조사로 동시에 생성
+    if len(sys.argv) > 1 and sys.argv[1] == 'fanout':
+        from fanout import fanout_main
+        sys.exit(fanout_main(sys.argv[2:]))
+    
+    # 현재 설정과 비교
+    if len(sys.argv) > 1 and sys.argv[1] == 'diff':
+        from config_diff import diff_main
+        sys.exit(diff_main(sys.argv[2:]))
+    
     # 명령줄 인수 파싱
     args = parse_arguments()
     
     # 인수 유효성 검증
     validate_arguments(args)
     
+    started = time.perf_counter()
+    
     # 템플릿 변수 준비
-    template_vars = prepare_template_vars(args)
+    try:
+        template_vars = prepare_template_vars(args)
+    except port_layout.LayoutError as e:
+        print(f"오류: 포트 레이아웃 - {e}", file=sys.stderr)
+        sys.exit(1)
     
     # 템플릿 로드
     template = load_template(args.device_type)
     
-    # 템플릿 렌더링
-    try:
-        config_content = template.render(**template_vars)
-    except Exception as e:
-        print(f"오류: 템플릿 렌더링 중 문제가 발생했습니다: {e}", file=sys.stderr)
-        sys.exit(1)
-    
-    # 결과 저장
-    output_path = save_output(config_content, args.hostname, args.device_type)
+    # 템플릿 렌더링 및 저장 (전체 문자열을 만들지 않고 파일에 바로 기록)
+    output_path = save_output(template_registry.iter_render(template, template_vars),
+                              args.hostname, args.device_type)
+    record_history(args, output_path, time.perf_counter() - started)
     
     # 성공 메시지 출력
     print(f"[SUCCESS] 설정 파일이 성공적으로 생성되었습니다: {output_path}")
+    size = output_path.stat().st_size
+    if size > PREVIEW_LIMIT:
+        print(f"\n생성된 설정이 커서 화면 출력을 생략합니다 ({size:,}바이트).")
+        return
     print(f"\n생성된 설정 내용:")
     print("-" * 60)
-    print(config_content)
+    print(output_path.read_text(encoding='utf-8'))
     print("-" * 60)
 
 
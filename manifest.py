@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+증분 생성 매니페스트
+출력 폴더에 장비별 입력 해시(인벤토리 행, 템플릿, 생성기 버전)와 출력 해시를 기록하여
+다음 실행에서 입력이 바뀐 장비만 다시 렌더링하고, 내용이 같은 파일은 다시 쓰지 않도록 합니다.
+
+매니페스트 형식 (output/.manifest.json):
+  {"format": 1, "generator": "<생성기 지문>",
+   "entries": {"<출력 파일명>": ["<행 해시>", "<템플릿 해시>", "<출력 해시>"], ...}}
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import jinja2
+
+import template_registry
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_FORMAT = 1
+
+# 해시 길이 (바이트). 충돌 확률이 무시할 만큼 작으면서 매니페스트 크기를 줄이도록 16바이트 사용
+DIGEST_SIZE = 16
+
+
+def content_hash(data):
+    """문자열 또는 바이트의 해시(16진수)를 반환합니다."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def new_hash():
+    """조각 단위로 갱신할 수 있는 해시 객체를 반환합니다 (UTF-8로 인코딩해 갱신하면 content_hash와 같은 값)."""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def file_hash(path, chunk_size=64 * 1024):
+    """텍스트 파일 내용의 해시를 반환합니다. 파일을 읽을 수 없으면 None을 반환합니다."""
+    digest = new_hash()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                digest.update(chunk.encode('utf-8'))
+    except (OSError, UnicodeDecodeError):
+        return None
+    return digest.hexdigest()
+
+
+def row_hash(args):
+    """
+    정규화된 인벤토리 행(argparse.Namespace)의 해시를 반환합니다.
+
+    컬럼 순서, 별칭, 앞뒤 공백처럼 렌더링 결과에 영향이 없는 차이는 해시에 반영되지 않습니다.
+    """
+    return content_hash(json.dumps(vars(args), sort_keys=True, ensure_ascii=False, default=str))
+
+
+def generator_fingerprint(version):
+    """생성기 버전과 Jinja2 버전을 묶은 지문을 반환합니다. 값이 바뀌면 모든 장비를 다시 렌더링합니다."""
+    return f"{version}/jinja2-{jinja2.__version__}"
+
+
+class FileHashes:
+    """파일 내용의 해시를 파일별로 한 번만 계산하여 보관합니다 (여러 장비가 참조하는 레이아웃 파일 등)."""
+
+    def __init__(self):
+        self._hashes = {}
+
+    def get(self, path):
+        """파일의 해시를 반환합니다. 파일을 읽을 수 없으면 None을 반환합니다."""
+        if path not in self._hashes:
+            try:
+                self._hashes[path] = content_hash(Path(path).read_bytes())
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+
+class TemplateHashes:
+    """제조사별 템플릿 파일 내용의 해시를 한 번만 계산하여 보관합니다."""
+
+    def __init__(self, template_dir=template_registry.TEMPLATE_DIR):
+        self.template_dir = Path(template_dir)
+        self._hashes = {}
+
+    def get(self, vendor):
+        """제조사 템플릿의 해시를 반환합니다. 템플릿 파일이 없으면 None을 반환합니다."""
+        if vendor not in self._hashes:
+            path = self.template_dir / template_registry.template_filename(vendor)
+            try:
+                self._hashes[vendor] = content_hash(path.read_bytes())
+            except OSError:
+                self._hashes[vendor] = None
+        return self._hashes[vendor]
+
+
+class Manifest:
+    """출력 폴더의 매니페스트 파일을 읽고 씁니다."""
+
+    def __init__(self, output_dir, generator):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.generator = generator
+        self.entries = {}
+        # 이전 실행과 생성기 지문이 같은지 여부 (다르면 입력 해시를 신뢰하지 않음)
+        self.compatible = False
+
+    def load(self):
+        """
+        매니페스트를 읽습니다. 파일이 없거나 손상된 경우 빈 매니페스트로 시작합니다.
+
+        반환값: 읽은 항목 수
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"매니페스트를 읽을 수 없어 전체를 다시 생성합니다: {e}")
+            return 0
+
+        if not isinstance(data, dict) or data.get('format') != MANIFEST_FORMAT:
+            return 0
+        entries = data.get('entries')
+        if isinstance(entries, dict):
+            self.entries = entries
+        self.compatible = data.get('generator') == self.generator
+        return len(self.entries)
+
+    def is_current(self, filename, row_digest, template_digest):
+        """이전 실행과 입력(행, 템플릿, 생성기)이 모두 같으면 True를 반환합니다."""
+        entry = self.entries.get(filename)
+        return (self.compatible and entry is not None
+                and entry[0] == row_digest and entry[1] == template_digest)
+
+    def output_hash(self, filename):
+        """이전 실행에서 기록한 출력 해시를 반환합니다."""
+        entry = self.entries.get(filename)
+        return entry[2] if entry else None
+
+    def save(self, entries):
+        """
+        새 항목으로 매니페스트를 원자적으로 저장합니다.
+
+        이전 내용과 같으면 쓰지 않고 False를 반환합니다.
+        """
+        if self.compatible and entries == self.entries:
+            return False
+        data = {'format': MANIFEST_FORMAT, 'generator': self.generator, 'entries': entries}
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        self.entries = entries
+        self.compatible = True
+        return True
+
+
+def existing_outputs(output_dir):
+    """출력 폴더에 있는 파일 이름 집합을 반환합니다 (숨김 파일 제외)."""
+    try:
+        with os.scandir(output_dir) as it:
+            return {entry.name for entry in it if not entry.name.startswith('.') and entry.is_file()}
+    except FileNotFoundError:
+        return set()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus 형식 지표 수집
+외부 라이브러리 없이 카운터, 게이지, 히스토그램을 기록하고 Prometheus 텍스트 형식(0.0.4)으로 출력합니다.
+
+사용 예:
+  STAGE_SECONDS = metrics.histogram('stage_duration_seconds', '단계별 소요 시간', ('stage',))
+  with STAGE_SECONDS.time(stage='render'):
+      ...
+  print(metrics.render())
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 기본 히스토그램 구간 (초) - 템플릿 렌더링(ms)부터 ChatGPT 호출(수십 초)까지
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def classify_error(error):
+    """
+    예외를 지표용 오류 분류로 변환합니다.
+
+    auth(401/403), rate_limit(429), timeout, connection, circuit_open(회로 차단기로 호출 생략),
+    parse(JSON/값 오류), api(기타 HTTP 오류), other
+    """
+    if type(error).__name__ == 'CircuitOpenError':
+        return 'circuit_open'
+    status = getattr(error, 'status_code', None)
+    if status in (401, 403):
+        return 'auth'
+    if status == 429:
+        return 'rate_limit'
+    name = type(error).__name__
+    if name == 'APITimeoutError' or isinstance(error, TimeoutError):
+        return 'timeout'
+    if name == 'APIConnectionError' or isinstance(error, ConnectionError):
+        return 'connection'
+    if isinstance(error, (json.JSONDecodeError, ValueError)):
+        return 'parse'
+    if status is not None:
+        return 'api'
+    return 'other'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    """레이블별 값을 보관하는 지표의 공통 부분"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} 지표의 레이블이 올바르지 않습니다: {sorted(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """(이름 접미사, 레이블 값, 추가 레이블, 값) 목록을 반환합니다."""
+        with self._lock:
+            return [('', key, None, value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {_escape(self.documentation)}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        for suffix, key, extra, value in self._samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """증가만 하는 카운터"""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """현재 값을 나타내는 게이지"""
+
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """구간별 누적 횟수와 합계를 기록하는 히스토그램"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['counts'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 소요 시간(초)을 기록합니다. 예외가 발생해도 기록됩니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, entry in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry['counts']):
+                    cumulative += count
+                    samples.append(('_bucket', key, ('le', _format_value(bound)), cumulative))
+                samples.append(('_sum', key, None, entry['sum']))
+                samples.append(('_count', key, None, entry['count']))
+        return samples
+
+
+class Registry:
+    """지표 목록과 출력 직전에 값을 갱신하는 수집 함수 목록"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # 모듈 재로딩 등으로 같은 지표를 다시 등록하면 기존 지표를 사용
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, func):
+        """render() 직전에 호출되어 게이지 등을 갱신하는 함수를 등록합니다."""
+        with self._lock:
+            self._collectors.append(func)
+
+    def render(self):
+        """모든 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for func in collectors:
+            try:
+                func()
+            except Exception as e:
+                print(f"지표 수집 오류: {e}")
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+add_collector = REGISTRY.add_collector
+render = REGISTRY.render
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenAI 클라이언트 풀
+API 키별 OpenAI 클라이언트를 재사용하고, 모든 클라이언트가 하나의 HTTP 연결 풀(keep-alive)을 공유합니다.
+
+- 풀은 API 키의 SHA-256 해시로 색인되며, 키 원문은 딕셔너리 키나 로그에 남지 않습니다.
+- 일정 시간 사용되지 않은 클라이언트는 제거되어 키 원문도 메모리에서 해제됩니다.
+- 최대 클라이언트 수를 넘으면 가장 오래 사용되지 않은 클라이언트부터 제거합니다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_MAX_CLIENTS = int(os.environ.get('OPENAI_POOL_MAX_CLIENTS', 32))
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get('OPENAI_POOL_IDLE_TIMEOUT', 300))
+DEFAULT_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', 60))
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 10))
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS', 100))
+DEFAULT_MAX_KEEPALIVE = int(os.environ.get('OPENAI_MAX_KEEPALIVE', 20))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.environ.get('OPENAI_KEEPALIVE_EXPIRY', 60))
+DEFAULT_CLIENT_MAX_RETRIES = 2  # openai 라이브러리 기본값
+DEFAULT_ASYNC_MAX_CONNECTIONS = int(os.environ.get('OPENAI_ASYNC_MAX_CONNECTIONS', 500))
+DEFAULT_ASYNC_MAX_KEEPALIVE = int(os.environ.get('OPENAI_ASYNC_MAX_KEEPALIVE', 100))
+
+
+def hash_api_key(api_key):
+    """API 키의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+class OpenAIClientPool:
+    """API 키 해시별 OpenAI 클라이언트 풀"""
+
+    def __init__(self, max_clients=DEFAULT_MAX_CLIENTS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 timeout=DEFAULT_TIMEOUT, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, max_keepalive=DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY, max_retries=DEFAULT_CLIENT_MAX_RETRIES):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.max_retries = max_retries
+
+        self._clients = OrderedDict()  # key_hash -> (client, last_used)
+        self._lock = threading.Lock()
+        self._root_client = None
+        self._last_sweep = time.monotonic()
+
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    # 생성할 클라이언트와 HTTP 클라이언트 클래스 (openai 모듈 속성 이름)
+    client_class = 'OpenAI'
+    http_client_class = 'DefaultHttpxClient'
+
+    def _root(self):
+        """
+        모든 클라이언트가 공유하는 기본 클라이언트를 생성합니다.
+
+        API 키별 클라이언트는 copy()로 만들어지므로 같은 HTTP 연결 풀(keep-alive)을 사용합니다.
+        """
+        if self._root_client is None:
+            # openai는 무거운 모듈이므로 실제로 클라이언트가 필요할 때 import
+            import openai
+
+            options = {
+                'timeout': openai.Timeout(self.timeout, connect=self.connect_timeout),
+                'max_retries': self.max_retries,
+            }
+            try:
+                import httpx
+                options['http_client'] = getattr(openai, self.http_client_class)(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    timeout=options['timeout']
+                )
+            except (ImportError, AttributeError, TypeError):
+                # httpx를 직접 사용할 수 없으면 openai 기본 연결 풀 설정 사용
+                pass
+
+            # 기본 클라이언트는 요청에 직접 사용하지 않으므로 키 자리에 임의 값을 넣음
+            self._root_client = getattr(openai, self.client_class)(api_key='unused', **options)
+        return self._root_client
+
+    def _create_client(self, api_key):
+        return self._root().copy(api_key=api_key)
+
+    def _evict_idle(self, now):
+        """유휴 시간이 지난 클라이언트를 제거합니다. (잠금 상태에서 호출)"""
+        expired = [key_hash for key_hash, (_, last_used) in self._clients.items()
+                   if now - last_used > self.idle_timeout]
+        for key_hash in expired:
+            # 공유 HTTP 연결 풀을 닫지 않도록 client.close()는 호출하지 않음
+            del self._clients[key_hash]
+        self.evicted += len(expired)
+        self._last_sweep = now
+
+    def get(self, api_key):
+        """API 키에 해당하는 클라이언트를 반환합니다 (없으면 생성)."""
+        key_hash = hash_api_key(api_key)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > min(self.idle_timeout, 60):
+                self._evict_idle(now)
+
+            entry = self._clients.get(key_hash)
+            if entry is not None:
+                client = entry[0]
+                self._clients[key_hash] = (client, now)
+                self._clients.move_to_end(key_hash)
+                self.reused += 1
+                return client
+
+            client = self._create_client(api_key)
+            self._clients[key_hash] = (client, now)
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evicted += 1
+            return client
+
+    def evict_idle(self):
+        """유휴 클라이언트를 즉시 제거합니다."""
+        with self._lock:
+            self._evict_idle(time.monotonic())
+
+    def close(self):
+        """모든 클라이언트와 공유 HTTP 연결 풀을 닫습니다."""
+        with self._lock:
+            self._clients.clear()
+            if self._root_client is not None:
+                self._root_client.close()
+                self._root_client = None
+
+    def stats(self):
+        """풀 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'created': self.created,
+                'reused': self.reused,
+                'evicted': self.evicted,
+            }
+
+
+class AsyncOpenAIClientPool(OpenAIClientPool):
+    """
+    API 키 해시별 AsyncOpenAI 클라이언트 풀 (비동기 서버용)
+
+    이벤트 루프 하나에서 수백 건의 요청이 동시에 대기할 수 있으므로 기본 연결 수 한도가 더 큽니다.
+    """
+
+    client_class = 'AsyncOpenAI'
+    http_client_class = 'DefaultAsyncHttpxClient'
+
+    def __init__(self, max_connections=DEFAULT_ASYNC_MAX_CONNECTIONS,
+                 max_keepalive=DEFAULT_ASYNC_MAX_KEEPALIVE, **kwargs):
+        super().__init__(max_connections=max_connections, max_keepalive=max_keepalive, **kwargs)
+
+    def close(self):
+        raise RuntimeError('AsyncOpenAIClientPool은 aclose()로 닫아야 합니다.')
+
+    async def aclose(self):
+        """모든 클라이언트와 공유 HTTP 연결 풀을 닫습니다."""
+        with self._lock:
+            self._clients.clear()
+            root, self._root_client = self._root_client, None
+        if root is not None:
+            await root.close()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+포트 레이아웃
+포트 범위, VLAN 목록, 인터페이스 프로필로 구성된 구조화 입력을 템플릿 변수로 펼칩니다.
+스택 스위치나 대형 섀시처럼 인터페이스가 수천 개인 장비도 ChatGPT 없이 템플릿으로 생성할 수 있습니다.
+
+레이아웃 형식 (JSON/YAML 파일, 또는 요청 JSON의 "layout" 객체):
+  {
+    "profiles": {
+      "users":  {"mode": "access", "vlan": 10, "description": "USER-PORT"},
+      "uplink": {"mode": "trunk", "vlans": "10-20,100", "native_vlan": 1}
+    },
+    "vlans": ["10-20", {"id": 100, "name": "SERVERS"}],
+    "interfaces": [
+      {"ports": "Gi1-8/0/1-48", "profile": "users"},
+      {"ports": "Te1/1/1-4", "profile": "uplink", "description": "CORE"},
+      {"ports": "Gi1/0/48", "mode": "access", "vlan": 20, "shutdown": true}
+    ]
+  }
+
+- 포트 범위: 숫자 구간마다 a-b 범위를 쓸 수 있습니다 (Gi1-8/0/1-48 = 스택 8대 x 48포트).
+  여러 범위는 쉼표로 나열하거나 목록으로 지정합니다.
+- 인터페이스는 템플릿이 순회할 때 하나씩 펼쳐지므로 포트 수와 관계없이 메모리 사용량이 일정합니다.
+"""
+
+import functools
+import json
+import os
+import re
+from collections import namedtuple
+from itertools import product
+from pathlib import Path
+
+# 레이아웃 하나에 허용하는 최대 인터페이스 수 (환경 변수로 변경 가능)
+MAX_INTERFACES = int(os.environ.get('LAYOUT_MAX_INTERFACES', 100000))
+
+MODES = ('access', 'trunk')
+
+# 프로필과 인터페이스 항목에 사용할 수 있는 설정 키
+SETTING_KEYS = ('mode', 'vlan', 'vlans', 'native_vlan', 'description', 'shutdown')
+
+# 이름 접두어(Gi, ge-, port 등) + 슬래시로 구분된 숫자 구간 (각 구간은 a 또는 a-b)
+_PORT_PATTERN = re.compile(r'^(.*?)(\d+(?:-\d+)?(?:/\d+(?:-\d+)?)*)$')
+_VLAN_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,32}$')
+_DESCRIPTION_PATTERN = re.compile(r'^[^"\x00-\x1f\x7f]{1,240}$')
+
+
+class LayoutError(ValueError):
+    """레이아웃을 해석할 수 없을 때 발생하는 예외"""
+
+
+Vlan = namedtuple('Vlan', 'id name')
+VlanMembers = namedtuple('VlanMembers', 'id name untagged tagged')
+Interface = namedtuple('Interface', 'name mode vlan allowed_vlans native_vlan description shutdown')
+PortSettings = namedtuple('PortSettings', 'mode vlan allowed_vlans native_vlan description shutdown')
+
+
+class PortBlock(namedtuple('PortBlock', 'prefix first last')):
+    """마지막 숫자만 연속으로 증가하는 포트 묶음 (예: Gi3/0/1-48)"""
+
+    __slots__ = ()
+
+    def ports(self):
+        """묶음의 포트 이름을 차례로 생성합니다."""
+        prefix = self.prefix
+        for number in range(self.first, self.last + 1):
+            yield f"{prefix}{number}"
+
+    def __len__(self):
+        return self.last - self.first + 1
+
+    @property
+    def compact(self):
+        """범위 표기: 1/1/1-48 (Alcatel-Lucent 등)"""
+        if self.first == self.last:
+            return f"{self.prefix}{self.first}"
+        return f"{self.prefix}{self.first}-{self.last}"
+
+    @property
+    def full(self):
+        """범위 표기: 1/1-1/48 (HP 등)"""
+        if self.first == self.last:
+            return f"{self.prefix}{self.first}"
+        return f"{self.prefix}{self.first}-{self.prefix}{self.last}"
+
+
+def _number_range(text, expression):
+    first, _, last = text.partition('-')
+    first = int(first)
+    last = int(last) if last else first
+    if last < first:
+        raise LayoutError(f"포트 범위의 끝이 시작보다 작습니다: {expression}")
+    return range(first, last + 1)
+
+
+def parse_ports(expression):
+    """
+    포트 범위 표현식을 PortBlock 목록으로 변환합니다.
+
+    예: 'Gi1-2/0/1-48' -> [PortBlock('Gi1/0/', 1, 48), PortBlock('Gi2/0/', 1, 48)]
+    """
+    if isinstance(expression, (list, tuple)):
+        parts = [str(part) for part in expression]
+    else:
+        parts = str(expression).split(',')
+
+    blocks = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        match = _PORT_PATTERN.match(part)
+        if not match:
+            raise LayoutError(f"포트 범위 형식이 올바르지 않습니다: {part}")
+        name_prefix, numbers = match.groups()
+        if any(char.isspace() or char in '",' for char in name_prefix):
+            raise LayoutError(f"포트 이름 형식이 올바르지 않습니다: {part}")
+        segments = numbers.split('/')
+        outer = [_number_range(segment, part) for segment in segments[:-1]]
+        last = _number_range(segments[-1], part)
+        for values in product(*outer):
+            prefix = name_prefix + ''.join(f"{value}/" for value in values)
+            blocks.append(PortBlock(prefix, last.start, last.stop - 1))
+    if not blocks:
+        raise LayoutError(f"포트 범위가 비어 있습니다: {expression}")
+    return blocks
+
+
+def _vlan_id(value, field='VLAN'):
+    try:
+        vlan_id = int(value)
+    except (TypeError, ValueError):
+        raise LayoutError(f"{field} ID가 숫자가 아닙니다: {value}")
+    if not 1 <= vlan_id <= 4094:
+        raise LayoutError(f"{field} ID는 1-4094 범위여야 합니다: {vlan_id}")
+    return vlan_id
+
+
+def parse_vlan_ranges(value):
+    """
+    VLAN 범위('10-20,100' 또는 [10, '20-30'])를 (시작, 끝) 구간 목록으로 변환합니다.
+
+    겹치거나 이어지는 구간은 하나로 합칩니다.
+    """
+    items = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    ranges = []
+    for item in items:
+        text = str(item).strip()
+        if not text:
+            continue
+        first, _, last = text.partition('-')
+        first = _vlan_id(first)
+        last = _vlan_id(last) if last else first
+        if last < first:
+            raise LayoutError(f"VLAN 범위의 끝이 시작보다 작습니다: {text}")
+        ranges.append((first, last))
+
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def format_vlan_ranges(ranges):
+    """(시작, 끝) 구간 목록을 '10-20,100' 형식으로 변환합니다."""
+    return ','.join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def _parse_vlans(value):
+    """vlans 항목을 {VLAN ID: 이름 또는 None} 딕셔너리로 변환합니다."""
+    vlans = {}
+    if value is None:
+        return vlans
+    items = value if isinstance(value, list) else [value]
+    for item in items:
+        if isinstance(item, dict):
+            vlan_id = _vlan_id(item.get('id'))
+            name = item.get('name')
+            if name is not None:
+                name = str(name)
+                if not _VLAN_NAME_PATTERN.match(name):
+                    raise LayoutError(f"VLAN 이름은 영문, 숫자, _.- 32자 이내여야 합니다: {name}")
+            vlans[vlan_id] = name
+        else:
+            for first, last in parse_vlan_ranges(item):
+                for vlan_id in range(first, last + 1):
+                    vlans.setdefault(vlan_id, None)
+    return vlans
+
+
+def _check_keys(entry, allowed, label):
+    if not isinstance(entry, dict):
+        raise LayoutError(f"{label} 항목은 키-값 객체여야 합니다.")
+    unknown = set(entry) - set(allowed)
+    if unknown:
+        raise LayoutError(f"{label}에 알 수 없는 키가 있습니다: {', '.join(sorted(map(str, unknown)))}")
+
+
+def _settings(values, label):
+    """프로필과 인터페이스 항목을 합친 설정 값을 검증하여 PortSettings로 변환합니다."""
+    mode = values.get('mode')
+    if mode is not None and mode not in MODES:
+        raise LayoutError(f"{label}: mode는 access 또는 trunk여야 합니다: {mode}")
+
+    vlan = values.get('vlan')
+    if mode == 'access':
+        if vlan is None:
+            raise LayoutError(f"{label}: access 포트에는 vlan이 필요합니다.")
+        vlan = _vlan_id(vlan)
+    elif vlan is not None:
+        raise LayoutError(f"{label}: vlan은 access 포트에만 지정할 수 있습니다 (trunk는 vlans, native_vlan).")
+
+    allowed_vlans = None
+    native_vlan = None
+    if mode == 'trunk':
+        if values.get('vlans') is not None:
+            allowed_vlans = format_vlan_ranges(parse_vlan_ranges(values['vlans'])) or None
+        if values.get('native_vlan') is not None:
+            native_vlan = _vlan_id(values['native_vlan'], 'native VLAN')
+    elif values.get('vlans') is not None or values.get('native_vlan') is not None:
+        raise LayoutError(f"{label}: vlans, native_vlan은 trunk 포트에만 지정할 수 있습니다.")
+
+    description = values.get('description')
+    if description is not None:
+        description = str(description)
+        if not _DESCRIPTION_PATTERN.match(description):
+            raise LayoutError(f"{label}: description은 따옴표와 제어 문자를 제외한 240자 이내여야 합니다.")
+
+    shutdown = values.get('shutdown', False)
+    if not isinstance(shutdown, bool):
+        raise LayoutError(f"{label}: shutdown은 true 또는 false여야 합니다.")
+
+    return PortSettings(mode, vlan, allowed_vlans, native_vlan, description, shutdown)
+
+
+class _Interfaces:
+    """템플릿이 순회할 때마다 인터페이스를 하나씩 펼치는 뷰 (목록을 만들지 않음)"""
+
+    def __init__(self, entries, count):
+        self._entries = entries
+        self._count = count
+
+    def __iter__(self):
+        for blocks, settings in self._entries:
+            for block in blocks:
+                for name in block.ports():
+                    yield Interface(name, *settings)
+
+    def __len__(self):
+        return self._count
+
+
+class PortLayout:
+    """해석된 포트 레이아웃 (템플릿 변수 layout)"""
+
+    def __init__(self, vlans, entries, count):
+        # [Vlan, ...] (ID 순)
+        self.vlans = vlans
+        # [([PortBlock, ...], PortSettings), ...] (입력 순서)
+        self.entries = entries
+        self.interfaces = _Interfaces(entries, count)
+
+    @functools.cached_property
+    def vlan_members(self):
+        """
+        VLAN별 포트 묶음 목록 (HP, Alcatel-Lucent처럼 VLAN에 포트를 할당하는 제조사용)
+
+        access 포트와 trunk의 native VLAN은 untagged, trunk 허용 VLAN은 tagged로 할당합니다.
+        trunk 허용 VLAN은 parse_layout에서 vlans에 자동으로 추가되므로 모든 제조사에서 같은 VLAN이 허용됩니다
+        (vlans를 지정하지 않은 trunk는 선언된 모든 VLAN).
+        """
+        untagged = {vlan.id: [] for vlan in self.vlans}
+        tagged = {vlan.id: [] for vlan in self.vlans}
+        for blocks, settings in self.entries:
+            if settings.mode == 'access':
+                untagged[settings.vlan].extend(blocks)
+            elif settings.mode == 'trunk':
+                if settings.native_vlan is not None:
+                    untagged[settings.native_vlan].extend(blocks)
+                ranges = (parse_vlan_ranges(settings.allowed_vlans) if settings.allowed_vlans
+                          else [(1, 4094)])
+                for vlan_id in tagged:
+                    if vlan_id != settings.native_vlan and any(first <= vlan_id <= last for first, last in ranges):
+                        tagged[vlan_id].extend(blocks)
+        return [VlanMembers(vlan.id, vlan.name, untagged[vlan.id], tagged[vlan.id]) for vlan in self.vlans]
+
+
+def _check_overlaps(entries):
+    """같은 포트가 여러 항목에 지정되었는지 검사합니다 (포트 묶음 단위로 비교)."""
+    by_prefix = {}
+    for blocks, _ in entries:
+        for block in blocks:
+            by_prefix.setdefault(block.prefix, []).append(block)
+    for blocks in by_prefix.values():
+        blocks.sort()
+        covered = -1  # 포트 번호는 0부터 시작할 수 있음 (ge-0/0/0)
+        for block in blocks:
+            if block.first <= covered:
+                raise LayoutError(f"포트가 여러 항목에 중복 지정되었습니다: {block.prefix}{block.first}")
+            covered = block.last
+
+
+def parse_layout(data):
+    """레이아웃 딕셔너리를 검증하여 PortLayout으로 변환합니다. 오류가 있으면 LayoutError가 발생합니다."""
+    _check_keys(data, ('profiles', 'vlans', 'interfaces'), '레이아웃')
+
+    profiles = data.get('profiles') or {}
+    if not isinstance(profiles, dict):
+        raise LayoutError("profiles는 이름-설정 객체여야 합니다.")
+    for name, profile in profiles.items():
+        _check_keys(profile, SETTING_KEYS, f"프로필 '{name}'")
+
+    vlans = _parse_vlans(data.get('vlans'))
+
+    interfaces = data.get('interfaces') or []
+    if not isinstance(interfaces, list):
+        raise LayoutError("interfaces는 목록이어야 합니다.")
+
+    entries = []
+    count = 0
+    for index, entry in enumerate(interfaces, start=1):
+        label = f"interfaces {index}번째 항목"
+        _check_keys(entry, ('ports', 'profile') + SETTING_KEYS, label)
+        if not entry.get('ports'):
+            raise LayoutError(f"{label}: ports가 필요합니다.")
+        values = {}
+        if entry.get('profile') is not None:
+            if entry['profile'] not in profiles:
+                raise LayoutError(f"{label}: 정의되지 않은 프로필입니다: {entry['profile']}")
+            values.update(profiles[entry['profile']])
+        values.update((key, value) for key, value in entry.items() if key in SETTING_KEYS)
+        settings = _settings(values, label)
+
+        blocks = parse_ports(entry['ports'])
+        count += sum(len(block) for block in blocks)
+        if count > MAX_INTERFACES:
+            raise LayoutError(f"인터페이스가 너무 많습니다 (최대 {MAX_INTERFACES}개).")
+        entries.append((blocks, settings))
+
+        # access/native VLAN과 trunk 허용 VLAN이 vlans에 없으면 추가 (VLAN을 먼저 만들어야 포트에 할당 가능)
+        for vlan_id in (settings.vlan, settings.native_vlan):
+            if vlan_id is not None:
+                vlans.setdefault(vlan_id, None)
+        if settings.allowed_vlans:
+            for first, last in parse_vlan_ranges(settings.allowed_vlans):
+                for vlan_id in range(first, last + 1):
+                    vlans.setdefault(vlan_id, None)
+
+    _check_overlaps(entries)
+    return PortLayout([Vlan(vlan_id, vlans[vlan_id]) for vlan_id in sorted(vlans)], entries, count)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_layout_file(path, mtime_ns, size):
+    suffix = Path(path).suffix.lower()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if suffix in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError:
+                    raise LayoutError("YAML 레이아웃을 읽으려면 PyYAML이 필요합니다: pip install pyyaml")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise LayoutError(f"레이아웃 파일을 읽을 수 없습니다: {path} ({e})")
+    return parse_layout(data or {})
+
+
+def load_layout(path):
+    """
+    레이아웃 파일(.json, .yaml/.yml)을 읽어 PortLayout을 반환합니다.
+
+    같은 파일을 참조하는 장비가 많으므로 파일 수정 시각이 같으면 해석 결과를 재사용합니다.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise LayoutError(f"레이아웃 파일을 읽을 수 없습니다: {path} ({e})")
+    return _load_layout_file(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def resolve_layout(value):
+    """레이아웃 값(파일 경로 또는 딕셔너리)을 PortLayout으로 변환합니다. 값이 없으면 None을 반환합니다."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, dict):
+        return parse_layout(value)
+    return load_layout(str(value))
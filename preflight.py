@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+인벤토리 사전 점검 (preflight)
+대량 배포 전에 인벤토리 전체를 읽어 장비 간 충돌까지 포함한 주소 설정 오류를 행 단위로 보고합니다.
+
+점검 항목:
+- 관리 IP, 서브넷 마스크, 게이트웨이 형식 및 연속되지 않은 마스크
+- 관리 IP가 네트워크/브로드캐스트 주소인 경우
+- 게이트웨이가 관리 서브넷 밖에 있거나 관리 IP와 같은 경우
+- VLAN ID 범위 (1-4094)
+- 중복된 관리 IP, 중복된 호스트명 (대소문자 구분 없음)
+- 서로 겹치는 서로 다른 서브넷 (예: 10.0.0.0/16과 10.0.1.0/24)
+
+주소는 uint32 배열로 적재하며, numpy가 설치되어 있으면 배열 전체를 벡터 연산으로 점검합니다.
+numpy가 없으면 같은 점검을 순수 Python으로 수행합니다 (느림).
+
+사용법:
+  python main.py preflight --inventory devices.csv [--report errors.csv]
+"""
+
+import argparse
+import csv
+import socket
+import sys
+import time
+from array import array
+
+from inventory import FIELD_ALIASES, InventoryError, iter_inventory
+from main import DEVICE_TYPES, INTERFACE_DEVICE_TYPES, VLAN_DEVICE_TYPES
+
+# numpy는 import 비용이 크므로 (웹 요청의 단건 점검에는 필요 없음) 대량 점검 시점에 로드
+np = None
+
+# 행 상태 비트
+IP_OK = 1
+MASK_OK = 2
+GATEWAY_PRESENT = 4
+GATEWAY_OK = 8
+VLAN_PRESENT = 16
+
+FULL_MASK = 0xFFFFFFFF
+
+
+def parse_ipv4(text):
+    """점 표기 IPv4 주소를 정수로 변환합니다. 형식이 잘못되면 None을 반환합니다."""
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, text), 'big')
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def parse_mask(text):
+    """서브넷 마스크(255.255.255.0, /24, 24)를 정수로 변환합니다. 연속 여부는 검사하지 않습니다."""
+    text = str(text).strip()
+    if text.startswith('/') or text.isdigit():
+        try:
+            prefix = int(text.lstrip('/'))
+        except ValueError:
+            return None
+        if not 0 <= prefix <= 32:
+            return None
+        return (FULL_MASK << (32 - prefix)) & FULL_MASK
+    return parse_ipv4(text)
+
+
+def format_ipv4(value):
+    return socket.inet_ntoa(int(value).to_bytes(4, 'big'))
+
+
+def format_network(network, mask):
+    prefix = bin(int(mask)).count('1')
+    return f"{format_ipv4(network)}/{prefix}"
+
+
+class InventoryColumns:
+    """인벤토리를 열 단위 배열로 보관합니다 (주소는 uint32)."""
+
+    def __init__(self):
+        self.line_nos = array('L')
+        self.hostnames = []
+        self.ip = array('I')
+        self.mask = array('I')
+        self.gateway = array('I')
+        self.vlan = array('l')
+        self.flags = array('B')
+
+    def __len__(self):
+        return len(self.flags)
+
+    def append(self, line_no, hostname, ip, mask, gateway, vlan, flags):
+        self.line_nos.append(line_no)
+        self.hostnames.append(hostname)
+        self.ip.append(ip)
+        self.mask.append(mask)
+        self.gateway.append(gateway)
+        self.vlan.append(vlan)
+        self.flags.append(flags)
+
+
+def _normalize_row(row, aliases):
+    """인벤토리 행의 컬럼명을 main.py 인수 이름으로 바꿉니다 (컬럼명 변환 결과는 캐시)."""
+    values = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        field = aliases.get(key)
+        if field is None:
+            field = aliases[key] = FIELD_ALIASES.get(str(key).strip().lower(), '')
+        if not field or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        values[field] = value
+    return values
+
+
+def _parse_addresses(values, fail):
+    """행의 주소 필드를 읽어 (IP, 마스크, 게이트웨이, VLAN, 상태 비트)를 반환합니다."""
+    flags = 0
+    ip = parse_ipv4(str(values['mgmt_ip'])) if 'mgmt_ip' in values else None
+    if ip is not None:
+        flags |= IP_OK
+    elif 'mgmt_ip' in values:
+        fail(f"관리 IP 형식이 올바르지 않습니다: {values['mgmt_ip']}")
+
+    mask = parse_mask(values['mgmt_mask']) if 'mgmt_mask' in values else None
+    if mask is not None:
+        flags |= MASK_OK
+    elif 'mgmt_mask' in values:
+        fail(f"서브넷 마스크 형식이 올바르지 않습니다: {values['mgmt_mask']}")
+
+    gateway = None
+    if 'gateway' in values:
+        flags |= GATEWAY_PRESENT
+        gateway = parse_ipv4(str(values['gateway']))
+        if gateway is not None:
+            flags |= GATEWAY_OK
+        else:
+            fail(f"게이트웨이 형식이 올바르지 않습니다: {values['gateway']}")
+
+    vlan = 0
+    if 'mgmt_vlan' in values:
+        try:
+            vlan = int(values['mgmt_vlan'])
+            flags |= VLAN_PRESENT
+        except (TypeError, ValueError):
+            fail(f"VLAN ID가 숫자가 아닙니다: {values['mgmt_vlan']}")
+
+    return ip or 0, mask or 0, gateway or 0, vlan, flags
+
+
+def load_columns(rows, errors):
+    """
+    (행 번호, 행) 목록을 열 배열로 적재합니다.
+
+    형식 오류(필수 필드 누락, 주소 형식 등)는 errors에 (행 번호, 호스트명, 메시지)로 추가되며,
+    주소를 읽을 수 없는 행도 나머지 점검을 위해 적재됩니다.
+    """
+    columns = InventoryColumns()
+    aliases = {}
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            errors.append((line_no, '', str(row)))
+            continue
+        if not isinstance(row, dict):
+            errors.append((line_no, '', "행 형식이 올바르지 않습니다 (키-값 객체가 필요합니다)."))
+            continue
+
+        values = _normalize_row(row, aliases)
+        hostname = str(values.get('hostname', ''))
+        device_type = str(values.get('device_type', '')).lower()
+
+        def fail(message):
+            errors.append((line_no, hostname, message))
+
+        for field in ('device_type', 'hostname', 'mgmt_ip', 'mgmt_mask'):
+            if field not in values:
+                fail(f"필수 필드가 누락되었습니다: {field}")
+        if device_type and device_type not in DEVICE_TYPES:
+            fail(f"지원하지 않는 장비 타입입니다: {device_type}")
+        if device_type in VLAN_DEVICE_TYPES and 'mgmt_vlan' not in values:
+            fail(f"{device_type} 장비는 관리 VLAN이 필요합니다.")
+        if device_type in INTERFACE_DEVICE_TYPES and 'mgmt_interface' not in values:
+            fail(f"{device_type} 장비는 관리 인터페이스가 필요합니다.")
+        if device_type == 'fortinet' and 'mgmt_port' not in values:
+            fail("Fortinet 장비는 관리 포트가 필요합니다.")
+
+        columns.append(line_no, hostname, *_parse_addresses(values, fail))
+    return columns
+
+
+def _check_numpy(columns):
+    """열 배열 전체를 numpy 벡터 연산으로 점검하고 (행 인덱스, 메시지) 목록을 반환합니다."""
+    flags = np.frombuffer(columns.flags, dtype=np.uint8)
+    ip = np.frombuffer(columns.ip, dtype=np.uint32)
+    mask = np.frombuffer(columns.mask, dtype=np.uint32)
+    gateway = np.frombuffer(columns.gateway, dtype=np.uint32)
+    vlan = np.frombuffer(columns.vlan, dtype=np.dtype(f'i{columns.vlan.itemsize}'))
+    findings = []
+
+    def report(selected, message):
+        for index in np.flatnonzero(selected):
+            findings.append((int(index), message(index) if callable(message) else message))
+
+    # 연속되지 않은 마스크: 호스트 비트(~mask)가 2^k - 1 형태여야 함
+    inverse = ~mask
+    contiguous = (inverse & (inverse + np.uint32(1))) == 0
+    mask_ok = (flags & MASK_OK) != 0
+    report(mask_ok & ~contiguous,
+           lambda i: f"연속되지 않은 서브넷 마스크입니다: {format_ipv4(mask[i])}")
+
+    valid = ((flags & IP_OK) != 0) & mask_ok & contiguous
+    network = ip & mask
+    broadcast = network | inverse
+
+    report(valid & (inverse >= 3) & ((ip == network) | (ip == broadcast)),
+           lambda i: f"관리 IP {format_ipv4(ip[i])}는 {format_network(network[i], mask[i])}의 "
+                     f"네트워크/브로드캐스트 주소입니다.")
+
+    gateway_ok = valid & ((flags & GATEWAY_OK) != 0)
+    report(gateway_ok & ((gateway & mask) != network),
+           lambda i: f"게이트웨이 {format_ipv4(gateway[i])}가 관리 서브넷 "
+                     f"{format_network(network[i], mask[i])} 밖에 있습니다.")
+    report(gateway_ok & (gateway == ip), "게이트웨이와 관리 IP가 같습니다.")
+
+    report(((flags & VLAN_PRESENT) != 0) & ((vlan < 1) | (vlan > 4094)),
+           lambda i: f"VLAN ID가 범위(1-4094)를 벗어났습니다: {vlan[i]}")
+
+    def duplicates(rows, keys):
+        """keys가 같은 행 중 첫 행이 아닌 행과, 그 그룹의 첫 행 인덱스를 반환합니다."""
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        positions = np.arange(len(order))
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first = np.maximum.accumulate(np.where(starts, positions, 0))
+        duplicated = ~starts
+        return rows[order][duplicated], rows[order][first][duplicated]
+
+    line_nos = columns.line_nos
+    rows = np.flatnonzero((flags & IP_OK) != 0)
+    for row, first in zip(*duplicates(rows, ip[rows])):
+        findings.append((int(row), f"관리 IP {format_ipv4(ip[row])}가 {line_nos[first]}행과 중복됩니다."))
+
+    codes = {}
+    hostname_keys = np.fromiter(
+        (codes.setdefault(hostname.lower(), len(codes)) for hostname in columns.hostnames),
+        dtype=np.int64, count=len(columns)
+    )
+    rows = np.flatnonzero(np.array([bool(hostname) for hostname in columns.hostnames], dtype=bool))
+    for row, first in zip(*duplicates(rows, hostname_keys[rows])):
+        findings.append((int(row), f"호스트명 {columns.hostnames[row]}이(가) {line_nos[first]}행과 중복됩니다."))
+
+    # 서로 다른 서브넷끼리의 겹침: 시작 주소 오름차순, 끝 주소 내림차순으로 정렬한 뒤
+    # 앞선 서브넷들의 최대 끝 주소보다 시작 주소가 작거나 같으면 겹침
+    rows = np.flatnonzero(valid)
+    if len(rows):
+        prefix = 32 - np.log2(inverse[rows].astype(np.uint64) + 1).astype(np.uint64)
+        keys = (network[rows].astype(np.uint64) << np.uint64(6)) | prefix
+        unique_keys, inverse_index = np.unique(keys, return_inverse=True)
+        starts = (unique_keys >> np.uint64(6)).astype(np.int64)
+        sizes = np.left_shift(np.int64(1), (32 - (unique_keys & np.uint64(63))).astype(np.int64))
+        ends = starts + sizes - 1
+        order = np.lexsort((-ends, starts))
+        sorted_starts, sorted_ends = starts[order], ends[order]
+        running_max = np.maximum.accumulate(sorted_ends)
+        positions = np.arange(len(order))
+        holder = np.maximum.accumulate(np.where(sorted_ends == running_max, positions, 0))
+        overlapping = np.zeros(len(order), dtype=bool)
+        overlapping[1:] = sorted_starts[1:] <= running_max[:-1]
+        partner = np.zeros(len(order), dtype=np.int64)
+        partner[1:] = holder[:-1]
+
+        subnet_overlaps = np.zeros(len(unique_keys), dtype=bool)
+        subnet_partner = np.zeros(len(unique_keys), dtype=np.int64)
+        subnet_overlaps[order] = overlapping
+        subnet_partner[order] = order[partner]
+
+        def describe(key):
+            return format_network(int(key) >> 6, (FULL_MASK << (32 - (int(key) & 63))) & FULL_MASK)
+
+        for row, subnet in zip(rows[subnet_overlaps[inverse_index]], inverse_index[subnet_overlaps[inverse_index]]):
+            findings.append((int(row), f"서브넷 {describe(unique_keys[subnet])}이(가) 다른 서브넷 "
+                                       f"{describe(unique_keys[subnet_partner[subnet]])}와 겹칩니다."))
+
+    return findings
+
+
+def _check_python(columns):
+    """_check_numpy와 같은 점검을 순수 Python으로 수행합니다."""
+    findings = []
+    first_ip = {}
+    first_hostname = {}
+    subnets = {}
+    line_nos = columns.line_nos
+
+    for index in range(len(columns)):
+        flags = columns.flags[index]
+        ip, mask, gateway = columns.ip[index], columns.mask[index], columns.gateway[index]
+        inverse = ~mask & FULL_MASK
+        contiguous = (inverse & (inverse + 1)) == 0
+        if flags & MASK_OK and not contiguous:
+            findings.append((index, f"연속되지 않은 서브넷 마스크입니다: {format_ipv4(mask)}"))
+
+        valid = flags & IP_OK and flags & MASK_OK and contiguous
+        network = ip & mask
+        if valid:
+            if inverse >= 3 and ip in (network, network | inverse):
+                findings.append((index, f"관리 IP {format_ipv4(ip)}는 {format_network(network, mask)}의 "
+                                        f"네트워크/브로드캐스트 주소입니다."))
+            if flags & GATEWAY_OK:
+                if gateway & mask != network:
+                    findings.append((index, f"게이트웨이 {format_ipv4(gateway)}가 관리 서브넷 "
+                                            f"{format_network(network, mask)} 밖에 있습니다."))
+                if gateway == ip:
+                    findings.append((index, "게이트웨이와 관리 IP가 같습니다."))
+            subnets.setdefault((network, mask), []).append(index)
+
+        vlan = columns.vlan[index]
+        if flags & VLAN_PRESENT and not 1 <= vlan <= 4094:
+            findings.append((index, f"VLAN ID가 범위(1-4094)를 벗어났습니다: {vlan}"))
+
+        if flags & IP_OK:
+            first = first_ip.setdefault(ip, index)
+            if first != index:
+                findings.append((index, f"관리 IP {format_ipv4(ip)}가 {line_nos[first]}행과 중복됩니다."))
+
+        hostname = columns.hostnames[index]
+        if hostname:
+            first = first_hostname.setdefault(hostname.lower(), index)
+            if first != index:
+                findings.append((index, f"호스트명 {hostname}이(가) {line_nos[first]}행과 중복됩니다."))
+
+    ranges = sorted(
+        ((network, network | (~mask & FULL_MASK), mask) for network, mask in subnets),
+        key=lambda item: (item[0], -item[1])
+    )
+    holder = None
+    for start, end, mask in ranges:
+        if holder is not None and start <= holder[1]:
+            for index in subnets[(start, mask)]:
+                findings.append((index, f"서브넷 {format_network(start, mask)}이(가) 다른 서브넷 "
+                                        f"{format_network(holder[0], holder[2])}와 겹칩니다."))
+        if holder is None or end > holder[1]:
+            holder = (start, end, mask)
+
+    return findings
+
+
+def _load_numpy():
+    """numpy를 처음 필요할 때 import합니다. 설치되어 있지 않으면 None을 반환합니다 (순수 Python으로 점검)."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+def check_columns(columns, engine='auto'):
+    """열 배열을 점검하고 (행 인덱스, 메시지) 목록과 사용한 엔진 이름을 반환합니다."""
+    numpy_available = engine != 'python' and _load_numpy() is not None
+    if engine == 'numpy' and not numpy_available:
+        raise InventoryError("numpy 엔진을 사용하려면 numpy가 필요합니다: pip install numpy")
+    if numpy_available:
+        return _check_numpy(columns), 'numpy'
+    return _check_python(columns), 'python'
+
+
+def preflight(rows, engine='auto'):
+    """
+    인벤토리 행 목록을 점검합니다.
+
+    반환값: (점검한 행 수, (행 번호, 호스트명, 메시지) 목록(행 번호순), 사용한 엔진)
+    """
+    errors = []
+    columns = load_columns(rows, errors)
+    findings, used_engine = check_columns(columns, engine)
+    for index, message in findings:
+        errors.append((columns.line_nos[index], columns.hostnames[index], message))
+    errors.sort(key=lambda error: error[0])
+    return len(columns), errors, used_engine
+
+
+def check_device(fields):
+    """장비 1대의 주소 설정을 점검하고 오류 메시지 목록을 반환합니다 (웹 요청 검증용)."""
+    # 템플릿 렌더링과 같이 공백을 제거한 값을 점검 (빈 게이트웨이는 기본 경로를 만들지 않으므로 점검하지 않음)
+    values = _normalize_row({key: fields.get(key) for key in ('mgmt_ip', 'mgmt_mask', 'gateway', 'mgmt_vlan')}, {})
+    errors = []
+    columns = InventoryColumns()
+    columns.append(0, '', *_parse_addresses(values, errors.append))
+    errors.extend(message for _, message in _check_python(columns))
+    return errors
+
+
+def write_report(path, errors):
+    """오류 목록을 CSV(행, 호스트명, 오류)로 저장합니다."""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'hostname', 'error'])
+        writer.writerows(errors)
+
+
+def parse_preflight_arguments(argv):
+    """preflight 명령의 인수를 파싱합니다."""
+    parser = argparse.ArgumentParser(
+        prog='main.py preflight',
+        description='인벤토리 파일 전체의 주소 설정 오류와 장비 간 충돌을 배포 전에 점검합니다.'
+    )
+    parser.add_argument(
+        '--inventory',
+        required=True,
+        help='인벤토리 파일 경로 (.csv, .yaml/.yml, .jsonl)'
+    )
+    parser.add_argument(
+        '--format',
+        dest='fmt',
+        choices=['csv', 'yaml', 'jsonl'],
+        help='인벤토리 형식 (기본값: 확장자로 판별)'
+    )
+    parser.add_argument(
+        '--report',
+        help='행별 오류 목록을 저장할 CSV 파일 경로'
+    )
+    parser.add_argument(
+        '--max-print',
+        type=int,
+        default=50,
+        help='화면에 출력할 최대 오류 수 (기본값: 50)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['auto', 'numpy', 'python'],
+        default='auto',
+        help='점검 엔진 (기본값: numpy가 있으면 numpy)'
+    )
+    return parser.parse_args(argv)
+
+
+def preflight_main(argv):
+    """preflight 명령 진입점. 종료 코드를 반환합니다."""
+    args = parse_preflight_arguments(argv)
+
+    start = time.perf_counter()
+    try:
+        total, errors, engine = preflight(iter_inventory(args.inventory, args.fmt), args.engine)
+    except (InventoryError, OSError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if args.report:
+        write_report(args.report, errors)
+
+    if not errors:
+        print(f"[SUCCESS] {total}개 행 점검 완료: 오류 없음 ({elapsed:.2f}초, {engine})")
+        return 0
+
+    for line_no, hostname, message in errors[:args.max_print]:
+        label = f" ({hostname})" if hostname else ''
+        print(f"  - {line_no}행{label}: {message}", file=sys.stderr)
+    if len(errors) > args.max_print:
+        print(f"  ... 외 {len(errors) - args.max_print}건", file=sys.stderr)
+
+    error_rows = len({line_no for line_no, _, _ in errors})
+    print(f"[WARNING] {total}개 행 중 {error_rows}개 행에서 {len(errors)}개 오류 발견 "
+          f"({elapsed:.2f}초, {engine})" + (f", 보고서: {args.report}" if args.report else ''),
+          file=sys.stderr)
+    return 1
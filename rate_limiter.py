@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenAI 사용량 제한(Rate Limit) 스케줄러
+API 키 해시별로 분당 요청 수(RPM)와 분당 토큰 수(TPM) 예산을 추적하여 호출 속도를 조절합니다.
+
+- 호출 전에 예상 토큰 수만큼 예산을 확보하고, 부족하면 채워질 때까지 기다립니다.
+- 응답의 x-ratelimit-* 헤더로 남은 예산과 초기화 시각을 보정합니다.
+- 429 및 일시적인 서버 오류는 지터(jitter)가 적용된 지수 백오프로 재시도합니다.
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_RPM = int(os.environ.get('OPENAI_RPM_LIMIT', 500))
+DEFAULT_TPM = int(os.environ.get('OPENAI_TPM_LIMIT', 200000))
+DEFAULT_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 4))
+DEFAULT_BASE_DELAY = float(os.environ.get('OPENAI_RETRY_BASE_DELAY', 1.0))
+DEFAULT_MAX_DELAY = float(os.environ.get('OPENAI_RETRY_MAX_DELAY', 30.0))
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+_DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(value):
+    """'1s', '6m0s', '20ms' 형식의 초기화 시간을 초 단위로 변환합니다."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    matches = _DURATION_PATTERN.findall(value)
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def estimate_tokens(messages, max_tokens):
+    """요청이 사용할 토큰 수를 추정합니다 (OpenAI는 max_tokens도 TPM 한도에 포함)."""
+    chars = sum(len(message.get('content') or '') for message in messages)
+    return chars // 3 + (max_tokens or 0)
+
+
+def is_retryable(error):
+    """재시도할 수 있는 오류인지 확인합니다."""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # 연결 오류, 타임아웃 (openai.APIConnectionError, APITimeoutError)
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+
+class _Budget:
+    """하나의 API 키에 대한 요청/토큰 예산 (토큰 버킷)"""
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now):
+        elapsed = now - self.updated
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+        self.updated = now
+
+    def wait_time(self, tokens, now):
+        """예산 확보까지 기다려야 하는 시간(초)을 반환합니다. 0이면 즉시 사용 가능."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        tokens = min(tokens, self.tpm)
+        waits = [0.0]
+        if self.requests < 1:
+            waits.append((1 - self.requests) * 60 / self.rpm)
+        if self.tokens < tokens:
+            waits.append((tokens - self.tokens) * 60 / self.tpm)
+        return max(waits)
+
+
+class RateLimitScheduler:
+    """API 키 해시별 RPM/TPM 예산 스케줄러"""
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+        self.throttled_seconds = 0.0
+        self.retries = 0
+
+    def _budget(self, key_hash):
+        budget = self._budgets.get(key_hash)
+        if budget is None:
+            budget = self._budgets[key_hash] = _Budget(self.rpm, self.tpm)
+        return budget
+
+    def _reserve(self, key_hash, tokens):
+        """예산을 확보하고 0을 반환합니다. 부족하면 기다려야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            budget = self._budget(key_hash)
+            now = time.monotonic()
+            budget.refill(now)
+            wait = budget.wait_time(tokens, now)
+            if wait <= 0:
+                budget.requests -= 1
+                budget.tokens -= tokens
+                return 0
+            self.throttled_seconds += wait
+            return wait
+
+    def try_acquire(self, key_hash, tokens):
+        """
+        예산이 바로 있으면 확보하고 True를 반환합니다. 부족하면 기다리지 않고 False를 반환합니다.
+
+        헤지 요청처럼 예산이 남을 때만 보내는 추가 호출에 사용합니다.
+        """
+        with self._lock:
+            budget = self._budget(key_hash)
+            now = time.monotonic()
+            budget.refill(now)
+            if budget.wait_time(tokens, now) > 0:
+                return False
+            budget.requests -= 1
+            budget.tokens -= tokens
+            return True
+
+    def acquire(self, key_hash, tokens):
+        """요청 1건과 예상 토큰 수만큼의 예산을 확보할 때까지 기다립니다."""
+        while True:
+            wait = self._reserve(key_hash, tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, key_hash, tokens):
+        """acquire()의 비동기 버전. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        while True:
+            wait = self._reserve(key_hash, tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def settle(self, key_hash, estimated, actual):
+        """실제 사용 토큰 수로 예산을 보정합니다."""
+        if actual is None:
+            return
+        with self._lock:
+            budget = self._budget(key_hash)
+            budget.tokens = min(budget.tpm, budget.tokens + estimated - actual)
+
+    def update_from_headers(self, key_hash, headers):
+        """응답의 x-ratelimit-* 헤더로 남은 예산을 보정합니다."""
+        if not headers:
+            return
+        with self._lock:
+            budget = self._budget(key_hash)
+            now = time.monotonic()
+            budget.refill(now)
+
+            limit_requests = headers.get('x-ratelimit-limit-requests')
+            limit_tokens = headers.get('x-ratelimit-limit-tokens')
+            if limit_requests and limit_requests.isdigit():
+                budget.rpm = int(limit_requests)
+            if limit_tokens and limit_tokens.isdigit():
+                budget.tpm = int(limit_tokens)
+
+            for kind, attr in (('requests', 'requests'), ('tokens', 'tokens')):
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                if remaining is None or not remaining.isdigit():
+                    continue
+                remaining = int(remaining)
+                setattr(budget, attr, min(getattr(budget, attr), remaining))
+                if remaining == 0:
+                    reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                    if reset:
+                        budget.blocked_until = max(budget.blocked_until, now + reset)
+
+    def backoff_delay(self, attempt, headers=None):
+        """재시도 대기 시간을 계산합니다 (Retry-After 우선, 없으면 지터 적용 지수 백오프)."""
+        if headers:
+            retry_after_ms = headers.get('retry-after-ms')
+            retry_after = headers.get('retry-after')
+            try:
+                if retry_after_ms is not None:
+                    return min(float(retry_after_ms) / 1000, self.max_delay)
+                if retry_after is not None:
+                    return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _retry_delay(self, key_hash, error, attempt):
+        """
+        실패한 호출의 재시도 대기 시간(초)을 반환합니다.
+
+        재시도할 수 없거나 재시도 횟수를 다 쓴 경우 None을 반환합니다.
+        """
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        self.update_from_headers(key_hash, headers)
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        delay = self.backoff_delay(attempt, headers)
+        with self._lock:
+            self.retries += 1
+            self.throttled_seconds += delay
+        return delay
+
+    def call(self, key_hash, func, estimated_tokens):
+        """
+        예산을 확보한 뒤 func를 호출하고, 재시도 가능한 오류는 백오프 후 다시 시도합니다.
+
+        func는 (결과, 응답 헤더, 실제 사용 토큰 수 또는 None)을 반환해야 합니다.
+        """
+        attempt = 0
+        while True:
+            self.acquire(key_hash, estimated_tokens)
+            try:
+                result, headers, used_tokens = func()
+            except Exception as e:
+                delay = self._retry_delay(key_hash, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.update_from_headers(key_hash, headers)
+            self.settle(key_hash, estimated_tokens, used_tokens)
+            return result
+
+    async def call_async(self, key_hash, func, estimated_tokens):
+        """call()의 비동기 버전. func는 (결과, 응답 헤더, 실제 사용 토큰 수)를 반환하는 코루틴 함수입니다."""
+        attempt = 0
+        while True:
+            await self.acquire_async(key_hash, estimated_tokens)
+            try:
+                result, headers, used_tokens = await func()
+            except Exception as e:
+                delay = self._retry_delay(key_hash, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.update_from_headers(key_hash, headers)
+            self.settle(key_hash, estimated_tokens, used_tokens)
+            return result
+
+    def stats(self):
+        """스케줄러 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'keys': len(self._budgets),
+                'retries': self.retries,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+            }
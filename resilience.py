@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChatGPT 호출 지연/장애 대응 (헤지 요청, 회로 차단기)
+
+- 헤지(hedged) 요청: 호출이 최근 응답 시간의 p95(설정 가능)보다 오래 걸리면 같은 요청을 한 번 더 보내고
+  먼저 도착한 응답을 사용합니다. 중복 호출은 전체 호출 수의 일정 비율(기본 10%)로 제한합니다.
+- 회로 차단기(circuit breaker): 타임아웃, 연결 오류, 5xx 오류가 연속으로 발생하면 일정 시간 동안
+  호출을 보내지 않고 즉시 실패합니다. 대기 시간이 지나면 호출 1건으로 복구 여부를 확인합니다.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_HEDGE_ENABLED = os.environ.get('OPENAI_HEDGE', '1').lower() not in ('0', 'false', 'no')
+DEFAULT_HEDGE_PERCENTILE = float(os.environ.get('OPENAI_HEDGE_PERCENTILE', 95))
+# 고정 헤지 지연 시간 (초). 지정하면 백분위수 대신 사용합니다.
+DEFAULT_HEDGE_DELAY = os.environ.get('OPENAI_HEDGE_DELAY')
+DEFAULT_HEDGE_MIN_DELAY = float(os.environ.get('OPENAI_HEDGE_MIN_DELAY', 0.2))
+DEFAULT_HEDGE_MAX_RATIO = float(os.environ.get('OPENAI_HEDGE_MAX_RATIO', 0.1))
+DEFAULT_BREAKER_FAILURES = int(os.environ.get('OPENAI_BREAKER_FAILURES', 5))
+DEFAULT_BREAKER_COOLDOWN = float(os.environ.get('OPENAI_BREAKER_COOLDOWN', 30))
+
+# 백분위수를 계산하는 최근 응답 시간 표본 수 (호출 종류별)
+LATENCY_WINDOW = 200
+# 백분위수를 신뢰하기 위한 최소 표본 수 (그 전에는 고정 지연이 없으면 헤지하지 않음)
+LATENCY_MIN_SAMPLES = 20
+
+# 회로 차단기 상태
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 호출을 보내지 않았을 때 발생하는 예외"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'ChatGPT 서비스 장애로 호출을 일시 중단했습니다. {retry_after:.0f}초 후 다시 시도합니다.')
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(error):
+    """
+    회로 차단기가 장애로 집계하는 오류인지 확인합니다 (타임아웃, 연결 오류, 5xx).
+
+    인증 오류나 사용량 제한(429)처럼 API 키에 따른 오류는 서비스 장애로 보지 않습니다.
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+
+class LatencyWindow:
+    """최근 응답 시간 표본 (백분위수 계산용)"""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent, min_samples=LATENCY_MIN_SAMPLES):
+        """백분위수(초)를 반환합니다. 표본이 부족하면 None을 반환합니다."""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+
+class Hedger:
+    """호출 종류별 응답 시간을 기록하고, 느린 호출에 중복 요청을 보내는 헤지 실행기"""
+
+    def __init__(self, enabled=DEFAULT_HEDGE_ENABLED, percentile=DEFAULT_HEDGE_PERCENTILE,
+                 fixed_delay=DEFAULT_HEDGE_DELAY, min_delay=DEFAULT_HEDGE_MIN_DELAY,
+                 max_ratio=DEFAULT_HEDGE_MAX_RATIO):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.fixed_delay = float(fixed_delay) if fixed_delay not in (None, '') else None
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+
+        self._windows = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.hedged = 0
+        self.hedges_won = 0
+        self.skipped = 0
+
+    def _window(self, kind):
+        with self._lock:
+            window = self._windows.get(kind)
+            if window is None:
+                window = self._windows[kind] = LatencyWindow()
+            return window
+
+    def delay(self, kind):
+        """헤지 요청을 보내기까지 기다릴 시간(초)을 반환합니다. 헤지하지 않으면 None을 반환합니다."""
+        if not self.enabled:
+            return None
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        delay = self._window(kind).percentile(self.percentile)
+        if delay is None:
+            return None
+        return max(delay, self.min_delay)
+
+    def _start_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def _reserve_hedge(self, can_hedge=None):
+        """
+        중복 호출 비율 한도 안에서 헤지 요청 1건을 허용합니다.
+
+        can_hedge()가 주어지면 그 결과가 참일 때만 허용합니다 (사용량 제한 예산이 남아 있는 경우 등).
+        """
+        with self._lock:
+            if self.hedged >= self.calls * self.max_ratio + 1:
+                return False
+            if can_hedge is not None and not can_hedge():
+                self.skipped += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def _won(self):
+        with self._lock:
+            self.hedges_won += 1
+
+    def _timed(self, kind, func):
+        started = time.perf_counter()
+        result = func()
+        self._window(kind).add(time.perf_counter() - started)
+        return result
+
+    async def _timed_async(self, kind, func):
+        started = time.perf_counter()
+        result = await func()
+        self._window(kind).add(time.perf_counter() - started)
+        return result
+
+    def call(self, kind, func, can_hedge=None):
+        """
+        func()를 호출하고, 헤지 지연 시간 안에 끝나지 않으면 같은 호출을 한 번 더 보냅니다.
+
+        func는 대기(사용량 제한, 재시도 백오프)가 없는 HTTP 호출 하나여야 합니다. 응답 시간 표본과
+        헤지 기준이 대기 시간으로 늘어나지 않도록, 스케줄러는 이 호출 바깥에 둡니다.
+        can_hedge()가 거짓이면 헤지 요청을 보내지 않습니다 (예산이 없을 때 중복 호출로 더 쓰지 않도록).
+        먼저 성공한 결과를 반환하며, 두 호출이 모두 실패하면 마지막 오류를 다시 발생시킵니다.
+        늦게 끝난 호출의 결과는 버려집니다 (응답 시간 표본으로만 사용).
+        """
+        self._start_call()
+        delay = self.delay(kind)
+        if delay is None:
+            return self._timed(kind, func)
+
+        results = queue.Queue()
+
+        def run(hedge):
+            try:
+                results.put((hedge, True, self._timed(kind, func)))
+            except BaseException as e:
+                results.put((hedge, False, e))
+
+        def start(hedge):
+            threading.Thread(target=run, args=(hedge,), name='hedge' if hedge else 'hedge-primary',
+                             daemon=True).start()
+
+        start(False)
+        pending = 1
+        try:
+            outcome = results.get(timeout=delay)
+        except queue.Empty:
+            outcome = None
+            if self._reserve_hedge(can_hedge):
+                start(True)
+                pending += 1
+
+        while True:
+            if outcome is None:
+                outcome = results.get()
+            hedge, ok, value = outcome
+            outcome = None
+            pending -= 1
+            if ok:
+                if hedge:
+                    self._won()
+                return value
+            if not pending:
+                raise value
+
+    async def call_async(self, kind, func, can_hedge=None):
+        """call()의 비동기 버전. func는 코루틴 함수이며, 먼저 성공하면 남은 호출은 취소합니다."""
+        self._start_call()
+        delay = self.delay(kind)
+        if delay is None:
+            return await self._timed_async(kind, func)
+
+        primary = asyncio.ensure_future(self._timed_async(kind, func))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and self._reserve_hedge(can_hedge):
+                pending.add(asyncio.ensure_future(self._timed_async(kind, func)))
+
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                error = None
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._won()
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        """헤지 실행기 상태를 반환합니다."""
+        with self._lock:
+            kinds = list(self._windows.items())
+            stats = {
+                'enabled': self.enabled,
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedges_won': self.hedges_won,
+                'skipped': self.skipped,
+            }
+        stats['delays'] = {}
+        for kind, _ in kinds:
+            delay = self.delay(kind)
+            if delay is not None:
+                stats['delays'][kind] = round(delay, 3)
+        return stats
+
+
+class CircuitBreaker:
+    """연속된 서비스 장애를 감지하여 호출을 일시 중단하는 회로 차단기"""
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_FAILURES, cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        """회로가 열려 있으면 다시 시도할 수 있을 때까지 남은 시간(초)을 반환합니다."""
+        with self._lock:
+            return self._retry_after(time.monotonic())
+
+    def _retry_after(self, now):
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - now)
+
+    def is_open(self):
+        """호출을 보내지 않고 바로 대체 경로를 사용해야 하는지 확인합니다 (상태를 바꾸지 않음)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                return self.probing
+            return self._retry_after(time.monotonic()) > 0
+
+    def before_call(self):
+        """
+        호출 전에 확인합니다. 회로가 열려 있으면 CircuitOpenError를 발생시킵니다.
+
+        대기 시간이 지난 뒤 첫 호출은 복구 확인용으로 허용하고(half-open), 그 결과가 나올 때까지
+        다른 호출은 계속 차단합니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self._retry_after(now)
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(remaining)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.cooldown)
+                self.probing = True
+
+    def record_success(self):
+        """호출 성공(또는 서비스 장애가 아닌 오류)을 기록합니다."""
+        with self._lock:
+            self.failures = 0
+            self.probing = False
+            self.state = CLOSED
+
+    def release(self):
+        """
+        결과를 판단할 수 없이 끝난 호출을 정리합니다 (클라이언트가 스트림을 중단한 경우 등).
+
+        복구 확인 중인 호출이었다면 다음 호출이 다시 복구를 확인합니다.
+        """
+        with self._lock:
+            self.probing = False
+
+    def record_failure(self):
+        """서비스 장애를 기록합니다. 연속 장애가 한도에 이르거나 복구 확인이 실패하면 회로를 엽니다."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def record_error(self, error):
+        """호출 오류를 분류하여 기록합니다."""
+        if isinstance(error, CircuitOpenError):
+            return
+        if is_upstream_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def stats(self):
+        """회로 차단기 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_after': round(self._retry_after(time.monotonic()), 1),
+            }
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+운영 서버 실행기
+마스터 프로세스가 웹 앱, 제조사 템플릿, 기본 설정값을 미리 로드·컴파일한 뒤 워커 프로세스 1개를 fork하여 감시합니다.
+워커가 비정상 종료되면 마스터가 이미 로드된 상태에서 다시 fork하므로, 템플릿 컴파일과 모듈 import 없이 바로 재시작됩니다.
+
+- 비동기 작업 큐(/api/jobs), 사용량 제한(RPM/TPM) 예산, API 키별 요청 허용량은 프로세스 메모리에 있으므로
+  워커 프로세스는 1개입니다. 동시 요청은 워커의 스레드(또는 비동기 서버 async_app)가 처리합니다.
+- 무거운 모듈(openai 등)은 기본적으로 첫 ChatGPT 호출 시점에 import됩니다.
+  --preload openai 로 마스터에서 미리 import하면 워커 재시작 후 첫 호출이 빨라집니다.
+- 시작 후 콜드 스타트 시간과 프로세스별 메모리(RSS, PSS)를 출력합니다.
+- fork를 지원하지 않는 환경(Windows)에서는 단일 프로세스로 실행합니다.
+
+사용법:
+  python serve.py --port 5000
+  python serve.py --preload openai
+  python serve.py --check        # 측정 결과만 출력하고 종료
+"""
+
+import argparse
+import gc
+import importlib
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+
+# 측정 기준 시각 (인터프리터 시작 직후)
+START_TIME = time.perf_counter()
+
+# 기본 설정값 (환경 변수로 변경 가능)
+DEFAULT_HOST = os.environ.get('SERVE_HOST', '0.0.0.0')
+DEFAULT_PORT = int(os.environ.get('SERVE_PORT', 5000))
+DEFAULT_BACKLOG = int(os.environ.get('SERVE_BACKLOG', 1024))
+# 워커 준비 대기 시간 (초)
+READY_TIMEOUT = 30
+# 워커가 이 시간 안에 다시 종료되면 재시작을 잠시 늦춤 (초)
+RESPAWN_BACKOFF = 1.0
+
+# --preload 로 미리 import할 수 있는 모듈
+PRELOAD_MODULES = {
+    'openai': ('openai',),
+    'numpy': ('numpy',),
+}
+
+
+def parse_serve_arguments(argv=None):
+    """명령줄 인수 파싱"""
+    parser = argparse.ArgumentParser(
+        description='웹 서버를 마스터가 감시하는 워커 프로세스로 실행합니다.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+사용 예시:
+  python serve.py
+  python serve.py --preload openai
+  python serve.py --check
+        """
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'바인드 주소 (기본값: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'포트 (기본값: {DEFAULT_PORT})')
+    parser.add_argument('--preload', action='append', default=[], choices=sorted(PRELOAD_MODULES),
+                        help='fork 전에 미리 import할 무거운 모듈 (여러 번 지정 가능)')
+    parser.add_argument('--check', action='store_true',
+                        help='워커를 시작해 콜드 스타트와 메모리를 측정한 뒤 종료')
+    return parser.parse_args(argv)
+
+
+def preload(modules):
+    """
+    웹 앱과 템플릿을 로드·컴파일합니다 (fork 전 마스터에서 1회).
+
+    반환값: (web_app, 단계별 소요 시간 목록 [(단계, 초), ...])
+    """
+    timings = []
+
+    started = time.perf_counter()
+    import app as web_app
+    timings.append(('app 로드', time.perf_counter() - started))
+
+    started = time.perf_counter()
+    import template_registry
+    vendors = template_registry.warm()
+    # 웹 UI 템플릿과 기본 설정값 응답도 미리 준비
+    web_app.app.jinja_env.get_template('index.html')
+    with web_app.app.app_context():
+        web_app.app.json.dumps(web_app.DEFAULT_CONFIGS)
+    timings.append((f'템플릿 {len(vendors)}개 컴파일', time.perf_counter() - started))
+
+    for name in modules:
+        started = time.perf_counter()
+        for module in PRELOAD_MODULES[name]:
+            importlib.import_module(module)
+        timings.append((f'{name} import', time.perf_counter() - started))
+
+    # 이후 생성되는 객체만 GC 대상으로 삼아 워커의 GC가 공유 페이지를 건드리지 않도록 함
+    gc.collect()
+    gc.freeze()
+    return web_app, timings
+
+
+def create_listener(host, port, backlog=DEFAULT_BACKLOG):
+    """워커가 사용할 리스닝 소켓을 생성합니다 (워커를 다시 시작해도 같은 소켓을 사용)."""
+    sock = socket.create_server((host, port), backlog=backlog, reuse_port=False)
+    sock.set_inheritable(True)
+    return sock
+
+
+def memory_usage(pid):
+    """
+    프로세스 메모리 사용량(바이트)을 반환합니다 (Linux /proc 기준).
+
+    반환값: {'rss', 'pss', 'shared', 'private'} (값을 읽을 수 없으면 빈 딕셔너리)
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    key = fields[name]
+                    usage[key] = usage.get(key, 0) + int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+    return usage
+
+
+def format_mb(value):
+    """바이트를 MB 문자열로 변환합니다."""
+    return f"{value / (1024 * 1024):.1f}MB" if value is not None else '-'
+
+
+def print_report(timings, ready_at, worker_pid):
+    """콜드 스타트 시간과 프로세스별 메모리 사용량을 출력합니다."""
+    stages = ', '.join(f"{name} {seconds:.2f}초" for name, seconds in timings)
+    print(f"콜드 스타트: {ready_at:.2f}초 ({stages})")
+
+    rows = [('마스터', os.getpid())] + ([('워커', worker_pid)] if worker_pid else [])
+    print(f"{'PID':>7} {'RSS':>9} {'PSS':>9} {'Shared':>9} {'Private':>9}")
+    for label, pid in rows:
+        usage = memory_usage(pid)
+        print(f"{pid:>7} {format_mb(usage.get('rss')):>9} {format_mb(usage.get('pss')):>9} "
+              f"{format_mb(usage.get('shared')):>9} {format_mb(usage.get('private')):>9}  {label}")
+    sys.stdout.flush()
+
+
+def run_worker(web_app, listener, ready_fd):
+    """
+    워커 프로세스: 리스닝 소켓에서 요청을 처리합니다 (반환하지 않음).
+
+    ready_fd가 주어지면 요청을 받을 준비가 된 시점에 1바이트를 써서 마스터에 알립니다.
+    """
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # fork 직후에는 난수 상태가 마스터(이전 워커)와 같으므로 재시도 지연(jitter)이 반복되지 않도록 다시 초기화
+    random.seed()
+
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, web_app.app, threaded=True, fd=listener.fileno())
+    if ready_fd is not None:
+        os.write(ready_fd, b'.')
+        os.close(ready_fd)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class Master:
+    """워커를 fork하고 감시하는 마스터 프로세스"""
+
+    def __init__(self, web_app, listener):
+        self.web_app = web_app
+        self.listener = listener
+        self.pid = None
+        self.started_at = 0.0
+        self.stopping = False
+
+    def spawn(self, ready_fd=None):
+        """워커를 fork합니다."""
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.web_app, self.listener, ready_fd)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 0
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.pid = pid
+        self.started_at = time.monotonic()
+
+    def start(self):
+        """워커를 시작하고 준비될 때까지 기다립니다. 준비되면 True를 반환합니다."""
+        read_fd, write_fd = os.pipe()
+        self.spawn(write_fd)
+        os.close(write_fd)
+
+        try:
+            # 워커가 준비 전에 종료되면 빈 값을 읽음
+            ready = select.select([read_fd], [], [], READY_TIMEOUT)[0] and os.read(read_fd, 1)
+        finally:
+            os.close(read_fd)
+        return bool(ready)
+
+    def stop(self, signum=None, frame=None):
+        """워커를 종료합니다."""
+        self.stopping = True
+        if self.pid is not None:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def supervise(self):
+        """워커 종료를 감시하고, 비정상 종료된 워커를 다시 시작합니다."""
+        while self.pid is not None:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if pid != self.pid:
+                continue
+            self.pid = None
+            if self.stopping:
+                continue
+
+            print(f"워커 (PID {pid})가 종료되었습니다 (상태 {os.waitstatus_to_exitcode(status)}). 다시 시작합니다.")
+            if time.monotonic() - self.started_at < RESPAWN_BACKOFF:
+                time.sleep(RESPAWN_BACKOFF)
+            if not self.stopping:
+                self.spawn()
+
+
+def serve_single(web_app, args):
+    """fork를 지원하지 않는 환경에서 단일 프로세스로 실행합니다."""
+    print("이 플랫폼은 fork를 지원하지 않으므로 단일 프로세스(멀티 스레드)로 실행합니다.")
+    if args.check:
+        return 0
+    web_app.app.run(host=args.host, port=args.port, debug=False, threaded=True)
+    return 0
+
+
+def main(argv=None):
+    """실행기 진입점"""
+    args = parse_serve_arguments(argv)
+
+    try:
+        web_app, timings = preload(args.preload)
+    except Exception as e:
+        print(f"웹 앱을 로드할 수 없습니다: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    if not hasattr(os, 'fork'):
+        return serve_single(web_app, args)
+
+    try:
+        listener = create_listener(args.host, args.port)
+    except OSError as e:
+        print(f"{args.host}:{args.port} 에 바인드할 수 없습니다: {e}")
+        return 1
+
+    master = Master(web_app, listener)
+    signal.signal(signal.SIGTERM, master.stop)
+    signal.signal(signal.SIGINT, master.stop)
+
+    started = time.perf_counter()
+    ready = master.start()
+    timings.append(('워커 시작', time.perf_counter() - started))
+    ready_at = time.perf_counter() - START_TIME
+
+    host, port = listener.getsockname()[:2]
+    if ready:
+        print(f"http://{host}:{port} 에서 요청을 받습니다.")
+    print_report(timings, ready_at, master.pid)
+
+    if not ready:
+        print("워커가 준비되지 않아 종료합니다.")
+        master.stop()
+    elif args.check:
+        master.stop()
+    master.supervise()
+    listener.close()
+    return 0 if ready else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,38 +1,32 @@
-// 제조사별 기본 설정값
+// 제조사별 기본 설정값 (서버의 /api/vendor-config 값으로 갱신됨)
 const vendorDefaults = {
     cisco: {
         mgmt_vlan: 100,
         mgmt_interface: 'Gi1/0/1',
-        gateway: '192.168.10.254',
         interfaceHelp: '예: Gi1/0/1, Fa0/1'
     },
     arista: {
         mgmt_vlan: 100,
         mgmt_interface: 'Management1',
-        gateway: '192.168.10.254',
         interfaceHelp: '예: Management1, Ethernet1'
     },
     alcatel: {
         mgmt_vlan: 100,
         mgmt_interface: '1/1/1',
-        gateway: '192.168.10.254',
         interfaceHelp: '예: 1/1/1, 1/2/1'
     },
     hp: {
         mgmt_vlan: 100,
         mgmt_interface: '1',
-        gateway: '192.168.10.254',
         interfaceHelp: '예: 1, 2, A1'
     },
     juniper: {
         mgmt_vlan: 100,
         mgmt_interface: 'ge-0/0/0',
-        gateway: '192.168.10.254',
         interfaceHelp: '예: ge-0/0/0, xe-0/0/0'
     },
     fortinet: {
-        mgmt_port: 'port1',
-        gateway: '192.168.10.254'
+        mgmt_port: 'port1'
     }
 };
 
@@ -82,8 +76,58 @@ function loadApiKey() {
     return localStorage.getItem('openai_api_key') || '';
 }
 
+// 제조사 기본값 캐시 (서버 기본값을 브라우저에 보관하고 ETag로 재검증)
+const VENDOR_DEFAULTS_CACHE_KEY = 'vendor_defaults';
+
+function applyVendorConfigs(configs) {
+    // 서버 기본값으로 덮어쓰되 화면 전용 값(interfaceHelp)은 유지
+    Object.keys(configs || {}).forEach(function(vendor) {
+        vendorDefaults[vendor] = Object.assign({}, vendorDefaults[vendor], configs[vendor]);
+    });
+}
+
+async function loadVendorDefaults() {
+    let cached = null;
+    try {
+        cached = JSON.parse(localStorage.getItem(VENDOR_DEFAULTS_CACHE_KEY) || 'null');
+    } catch (e) {
+        cached = null;
+    }
+    if (cached && cached.configs) {
+        applyVendorConfigs(cached.configs);
+    }
+    
+    try {
+        const headers = {};
+        if (cached && cached.etag) {
+            headers['If-None-Match'] = cached.etag;
+        }
+        const response = await fetch('/api/vendor-config', { headers: headers });
+        if (response.status === 304) {
+            return;  // 저장된 기본값이 최신
+        }
+        if (!response.ok) {
+            return;
+        }
+        const data = await response.json();
+        if (data.success && data.configs) {
+            applyVendorConfigs(data.configs);
+            localStorage.setItem(VENDOR_DEFAULTS_CACHE_KEY, JSON.stringify({
+                etag: response.headers.get('ETag'),
+                configs: data.configs
+            }));
+        }
+    } catch (error) {
+        // 서버 기본값을 받지 못하면 내장/저장된 기본값 사용
+        console.warn('제조사 기본값을 불러오지 못했습니다:', error);
+    }
+}
+
 // 페이지 로드 시 초기화
 window.addEventListener('DOMContentLoaded', function() {
+    // 제조사 기본값 불러오기 (페이지당 한 번, 제조사 변경 시에는 요청하지 않음)
+    loadVendorDefaults();
+    
     // 저장된 API 키 불러오기
     const savedApiKey = loadApiKey();
     if (savedApiKey) {
@@ -246,7 +290,7 @@ vendorSelect.addEventListener('change', function() {
     mgmtVlanInput.value = '';
     mgmtInterfaceInput.value = '';
     mgmtPortInput.value = '';
-    gatewayInput.value = '192.168.10.254';
+    gatewayInput.value = '';
     
     if (!vendor) return;
     
@@ -258,7 +302,7 @@ vendorSelect.addEventListener('change', function() {
         portFields.style.display = 'flex';
         gatewayFields.style.display = 'flex';
         mgmtPortInput.value = defaults.mgmt_port || 'port1';
-        gatewayInput.value = defaults.gateway || '192.168.10.254';
+        gatewayInput.value = defaults.gateway || '';
     } else {
         // 다른 제조사인 경우
         vlanFields.style.display = 'flex';
@@ -267,7 +311,7 @@ vendorSelect.addEventListener('change', function() {
         
         mgmtVlanInput.value = defaults.mgmt_vlan || 100;
         mgmtInterfaceInput.value = defaults.mgmt_interface || '';
-        gatewayInput.value = defaults.gateway || '192.168.10.254';
+        gatewayInput.value = defaults.gateway || '';
         
         if (defaults.interfaceHelp) {
             interfaceHelp.textContent = defaults.interfaceHelp;
@@ -375,6 +419,18 @@ window.generateConfig = async function(e) {
     
     console.log('전송할 데이터:', { ...formData, api_key: '***' }); // API 키는 숨김
     
+    // 빠른 생성 모드 (요구사항이 있는 경우에만 적용)
+    const singleCallEl = document.getElementById('singleCall');
+    if (requirements && singleCallEl && singleCallEl.checked) {
+        formData.mode = 'single_call';
+    }
+    
+    // 템플릿 우선 생성 모드 (기본 설정은 템플릿, 추가 설정만 ChatGPT)
+    const hybridModeEl = document.getElementById('hybridMode');
+    if (hybridModeEl && hybridModeEl.checked) {
+        formData.mode = 'hybrid';
+    }
+    
     // 요구사항이 없는 경우에만 IP 정보 포함
     if (!requirements) {
         formData.mgmt_ip = mgmtIpInputEl ? mgmtIpInputEl.value.trim() : '';
@@ -403,25 +459,22 @@ window.generateConfig = async function(e) {
     } else {
         formData.mgmt_vlan = mgmtVlanInputEl ? (mgmtVlanInputEl.value || 100) : 100;
         formData.mgmt_interface = mgmtInterfaceInputEl ? mgmtInterfaceInputEl.value.trim() : '';
-        formData.gateway = gatewayInputEl ? (gatewayInputEl.value.trim() || '192.168.10.254') : '192.168.10.254';
+    }
+    // 기본 게이트웨이 (모든 제조사 공통, 비워 두면 기본 경로를 설정하지 않음)
+    if (gatewayInputEl && gatewayInputEl.value.trim()) {
+        formData.gateway = gatewayInputEl.value.trim();
     }
     
     try {
-        // 타임아웃 설정 (60초)
-        const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), 60000);
-        
-        const response = await fetch('/api/generate', {
+        // 생성 작업 등록 (작업 ID를 즉시 반환)
+        const response = await fetch('/api/jobs', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify(formData),
-            signal: controller.signal
+            body: JSON.stringify(formData)
         });
         
-        clearTimeout(timeoutId);
-        
         // 응답 상태 확인
         if (!response.ok) {
             let errorMessage = `서버 오류 (${response.status})`;
@@ -434,37 +487,45 @@ window.generateConfig = async function(e) {
             throw new Error(errorMessage);
         }
         
-        // JSON 파싱
-        let data;
-        try {
-            data = await response.json();
-        } catch (e) {
-            throw new Error('서버 응답을 파싱할 수 없습니다: ' + e.message);
+        const job = await response.json();
+        if (!job.success) {
+            throw new Error(job.error || '작업 등록에 실패했습니다.');
         }
         
-        if (data.success) {
-            currentConfig = data.config;
-            currentHostname = data.hostname;
-            currentVendor = formData.vendor;
+        const configOutputEl = document.getElementById('configOutput');
+        let shownText = '';
+        
+        // 작업이 끝날 때까지 상태 조회 (생성 중인 내용은 바로 표시)
+        const result = await pollJob(job.job_id, function(progress) {
+            if (!progress.partial || progress.partial === shownText) return;
             
-            // 결과 표시
-            const configOutputEl = document.getElementById('configOutput');
-            if (configOutputEl) {
-                configOutputEl.textContent = data.config;
+            // 첫 번째 줄이 도착하면 바로 결과 영역 표시
+            if (!shownText) {
+                if (loadingEl) loadingEl.style.display = 'none';
+                if (resultAreaEl) resultAreaEl.style.display = 'block';
             }
-            if (resultAreaEl) {
-                resultAreaEl.style.display = 'block';
-                // 스크롤 이동
-                resultAreaEl.scrollIntoView({ behavior: 'smooth' });
+            shownText = progress.partial;
+            if (configOutputEl) {
+                configOutputEl.textContent = shownText;
             }
-        } else {
-            showError(data.error || '설정 생성 중 오류가 발생했습니다.');
+        });
+        
+        currentConfig = result.config;
+        currentHostname = result.hostname;
+        currentVendor = formData.vendor;
+        
+        // 최종 설정으로 교체
+        if (configOutputEl) {
+            configOutputEl.textContent = result.config;
+        }
+        if (resultAreaEl) {
+            resultAreaEl.style.display = 'block';
+            // 스크롤 이동
+            resultAreaEl.scrollIntoView({ behavior: 'smooth' });
         }
     } catch (error) {
         console.error('전체 오류:', error);
-        if (error.name === 'AbortError') {
-            showError('요청 시간이 초과되었습니다. (60초) ChatGPT API 응답이 지연되고 있습니다. 다시 시도해주세요.');
-        } else if (error.message) {
+        if (error.message) {
             showError('오류 발생: ' + error.message);
         } else {
             showError('알 수 없는 오류가 발생했습니다. 브라우저 콘솔을 확인해주세요.');
@@ -483,6 +544,46 @@ window.generateConfig = async function(e) {
     }
 }; // window.generateConfig 함수 끝
 
+// 생성 작업 상태를 주기적으로 조회하여 완료되면 결과를 반환합니다
+async function pollJob(jobId, onProgress) {
+    const pollInterval = 700;
+    const maxNetworkErrors = 5;
+    let networkErrors = 0;
+    
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+        
+        let data;
+        try {
+            const response = await fetch(`/api/jobs/${encodeURIComponent(jobId)}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.error || `서버 오류 (${response.status})`);
+            }
+            networkErrors = 0;
+        } catch (e) {
+            // 일시적인 네트워크 오류는 몇 차례 재시도
+            if (e instanceof TypeError && ++networkErrors < maxNetworkErrors) {
+                continue;
+            }
+            throw e;
+        }
+        
+        if (data.progress && onProgress) {
+            onProgress(data.progress);
+        }
+        
+        if (data.status === 'succeeded') {
+            return data.result;
+        }
+        if (data.status === 'failed' || data.status === 'timeout') {
+            throw new Error(data.error || '설정 생성 중 오류가 발생했습니다.');
+        }
+    }
+}
+
 // 복사 버튼
 copyBtn.addEventListener('click', function() {
     if (!currentConfig) return;
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+템플릿 레지스트리
+프로세스 전역에서 하나의 Jinja2 Environment를 공유하여 컴파일된 템플릿을 재사용합니다.
+
+- 템플릿 디렉토리별로 Environment를 한 번만 생성합니다.
+- 컴파일된 바이트코드를 디스크에 저장하여 새 프로세스도 파싱 과정을 건너뜁니다.
+- 템플릿 파일의 수정 시각(mtime)이 바뀐 경우에만 다시 로드합니다.
+"""
+
+import os
+import threading
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+# 기본 템플릿 폴더
+TEMPLATE_DIR = 'config_templates'
+
+# 컴파일된 바이트코드 저장 폴더 (템플릿 폴더와 같은 위치에 생성)
+BYTECODE_CACHE_DIRNAME = '.template_cache'
+
+# 스트리밍 렌더링 시 한 번에 내보낼 조각 크기 (문자 수)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# config_templates/ 에 있는 제조사별 기본 템플릿
+VENDORS = ('cisco', 'arista', 'alcatel', 'hp', 'juniper', 'fortinet')
+
+_environments = {}
+_lock = threading.Lock()
+
+
+def template_filename(vendor):
+    """제조사에 해당하는 템플릿 파일명을 반환합니다."""
+    return f"{vendor}_base.j2"
+
+
+def _create_bytecode_cache(template_dir):
+    """바이트코드 캐시를 생성합니다. 폴더를 만들 수 없으면 None을 반환합니다."""
+    cache_dir = Path(template_dir).parent / BYTECODE_CACHE_DIRNAME
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # 읽기 전용 파일시스템 등에서는 메모리 캐시만 사용
+        return None
+    return FileSystemBytecodeCache(str(cache_dir))
+
+
+def _create_environment(template_dir):
+    """공유 Environment를 생성합니다."""
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=_create_bytecode_cache(template_dir),
+        # auto_reload: get_template 호출 시 파일 mtime을 비교하여 변경된 경우에만 재컴파일
+        auto_reload=True,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+
+
+def get_environment(template_dir=TEMPLATE_DIR):
+    """템플릿 디렉토리에 대한 공유 Environment를 반환합니다."""
+    key = os.path.abspath(template_dir)
+    env = _environments.get(key)
+    if env is None:
+        with _lock:
+            env = _environments.get(key)
+            if env is None:
+                env = _create_environment(key)
+                _environments[key] = env
+    return env
+
+
+def get_template(vendor, template_dir=TEMPLATE_DIR):
+    """
+    컴파일된 제조사 템플릿을 반환합니다.
+
+    템플릿 파일이 없으면 jinja2.TemplateNotFound 예외가 발생합니다.
+    """
+    return get_environment(template_dir).get_template(template_filename(vendor))
+
+
+def iter_render(template, template_vars, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    템플릿을 전체 문자열로 만들지 않고 generate()로 렌더링하여 chunk_size 안팎의 조각으로 내보냅니다.
+
+    인터페이스가 수천 개인 설정도 파일이나 HTTP 응답에 바로 쓰므로 메모리 사용량이 일정합니다.
+    """
+    buffer = []
+    size = 0
+    for piece in template.generate(**template_vars):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def warm(template_dir=TEMPLATE_DIR, vendors=VENDORS):
+    """
+    모든 제조사 템플릿을 미리 컴파일하여 캐시에 올립니다.
+
+    존재하지 않는 템플릿은 건너뛰고, 로드된 제조사 목록을 반환합니다.
+    """
+    env = get_environment(template_dir)
+    loaded = []
+    for vendor in vendors:
+        name = template_filename(vendor)
+        if not os.path.exists(os.path.join(os.path.abspath(template_dir), name)):
+            continue
+        env.get_template(name)
+        loaded.append(vendor)
+    return loaded
+
+
+def clear():
+    """모든 공유 Environment와 메모리 캐시를 초기화합니다 (디스크 바이트코드는 유지)."""
+    with _lock:
+        _environments.clear()
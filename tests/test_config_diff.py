@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""생성 설정과 현재 설정 비교 테스트"""
+
+import pytest
+
+import config_diff
+
+
+def commands(vendor, generated, running, partial=False):
+    return config_diff.diff_configs(vendor, generated, running, partial=partial)['commands']
+
+
+def test_unsupported_vendor():
+    with pytest.raises(config_diff.ConfigDiffError):
+        config_diff.diff_configs('unknown', '', '')
+
+
+def test_identical_configs_have_no_commands():
+    config = "hostname SW-01\n!\ninterface Vlan100\n ip address 10.0.0.2 255.255.255.0\n!\n"
+    assert commands('cisco', config, config) == []
+
+
+# cisco
+
+def test_cisco_add():
+    running = "hostname SW-01\n!\n"
+    generated = "hostname SW-01\n!\nvlan 10\n name USERS\n!\n"
+    assert commands('cisco', generated, running) == ['vlan 10', ' name USERS']
+
+
+def test_cisco_remove_nested_line():
+    generated = "interface Gi1/0/5\n switchport mode access\n!\n"
+    running = "interface Gi1/0/5\n switchport mode access\n spanning-tree portfast\n!\n"
+    assert commands('cisco', generated, running) == ['interface Gi1/0/5', ' no spanning-tree portfast']
+
+
+def test_cisco_replace_single_value():
+    generated = "hostname SW-NEW\n!\ninterface Vlan100\n ip address 10.0.0.2 255.255.255.0\n!\n"
+    running = "hostname SW-OLD\n!\ninterface Vlan100\n ip address 10.0.0.9 255.255.255.0\n!\n"
+    assert commands('cisco', generated, running) == [
+        'hostname SW-NEW', '!', 'interface Vlan100', ' ip address 10.0.0.2 255.255.255.0',
+    ]
+
+
+def test_cisco_physical_interface_defaulted():
+    generated = "hostname SW-01\n!\n"
+    running = ("hostname SW-01\n!\ninterface Gi1/0/5\n description old\n!\n"
+               "interface Vlan20\n ip address 10.0.20.1 255.255.255.0\n!\n"
+               "interface Gi1/0/1.100\n encapsulation dot1Q 100\n!\n")
+    assert commands('cisco', generated, running) == [
+        'default interface Gi1/0/5', 'no interface Vlan20', 'no interface Gi1/0/1.100',
+    ]
+
+
+def test_cisco_shutdown_toggle():
+    generated = "interface Gi1/0/5\n no shutdown\n!\n"
+    running = "interface Gi1/0/5\n shutdown\n!\n"
+    assert commands('cisco', generated, running) == ['interface Gi1/0/5', ' no shutdown']
+
+
+# arista
+
+def test_arista_add_and_replace():
+    generated = "interface Ethernet1\n   description uplink\n   switchport mode trunk\n!\n"
+    running = "interface Ethernet1\n   description old\n!\n"
+    assert commands('arista', generated, running) == [
+        'interface Ethernet1', '   description uplink', '   switchport mode trunk',
+    ]
+
+
+def test_arista_physical_interface_defaulted():
+    generated = "hostname ARI-01\n!\n"
+    running = "hostname ARI-01\n!\ninterface Ethernet5\n   description old\n!\ninterface Loopback0\n!\n"
+    assert commands('arista', generated, running) == ['default interface Ethernet5', 'no interface Loopback0']
+
+
+# hp
+
+def test_hp_add_remove_replace():
+    generated = 'hostname "HP-NEW"\nvlan 100\n   name "MGMT"\n   exit\n'
+    running = 'hostname "HP-OLD"\nvlan 100\n   name "OLD"\n   untagged 5\n   exit\n'
+    assert commands('hp', generated, running) == [
+        'hostname "HP-NEW"', '!', 'vlan 100', '   no untagged 5', '   name "MGMT"', 'exit',
+    ]
+
+
+# juniper
+
+def test_juniper_add_remove_replace():
+    generated = "set system host-name JNPR-NEW\nset vlans USERS vlan-id 10\n"
+    running = "set system host-name JNPR-OLD\nset vlans OLD vlan-id 20\n"
+    assert commands('juniper', generated, running) == [
+        'delete vlans OLD vlan-id 20', 'set system host-name JNPR-NEW', 'set vlans USERS vlan-id 10',
+    ]
+
+
+# alcatel
+
+def test_alcatel_add_and_remove():
+    generated = 'configure system name "SW"\nconfigure vlan 10 name "USERS"\n'
+    running = 'configure system name "SW"\nconfigure vlan 20 name "OLD"\n'
+    assert commands('alcatel', generated, running) == [
+        'configure no vlan 20 name "OLD"', 'configure vlan 10 name "USERS"',
+    ]
+
+
+def test_alcatel_replace_single_value():
+    generated = ('configure system name "SW-NEW"\n'
+                 'configure vlan 100 name "NEW"\n'
+                 'configure vlan 100 port 1/1/1 tagged\n'
+                 'configure port 1/1/2 description "new desc"\n'
+                 'configure router interface "to core" ip address 10.0.0.1/30\n')
+    running = ('configure system name "SW-OLD"\n'
+               'configure vlan 100 name "OLD"\n'
+               'configure vlan 100 port 1/1/1 untagged\n'
+               'configure port 1/1/2 description "old desc"\n'
+               'configure router interface "to core" ip address 10.0.0.5/30\n')
+    assert commands('alcatel', generated, running) == generated.splitlines()
+
+
+# fortinet
+
+def test_fortinet_add_remove_replace():
+    generated = ('config system interface\n    edit "port1"\n        set ip 10.0.0.1 255.255.255.0\n'
+                 '        set allowaccess ping https\n    next\nend\n')
+    running = ('config system interface\n    edit "port1"\n        set ip 10.0.0.9 255.255.255.0\n'
+               '        set description "old"\n    next\n    edit "port9"\n        set status down\n    next\nend\n')
+    assert commands('fortinet', generated, running) == [
+        'config system interface',
+        '    delete "port9"',
+        '    edit "port1"',
+        '        unset description',
+        '        set ip 10.0.0.1 255.255.255.0',
+        '        set allowaccess ping https',
+        '    next',
+        'end',
+    ]
+
+
+def test_partial_keeps_missing_top_level_items():
+    generated = "vlan 10\n name USERS\n!\n"
+    running = "hostname SW-01\n!\ninterface Gi1/0/5\n description old\n!\n"
+    assert commands('cisco', generated, running, partial=True) == ['vlan 10', ' name USERS']
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""IPAM 서브넷 할당과 계획 검증 테스트"""
+
+import ipaddress
+import random
+
+import pytest
+
+import ipam
+
+POOL = '10.20.0.0/16'
+POOL_SIZE = 2 ** 16
+
+
+def assert_disjoint(networks):
+    ordered = sorted(networks, key=lambda network: int(network.network_address))
+    for previous, current in zip(ordered, ordered[1:]):
+        assert int(previous.broadcast_address) < int(current.network_address), (previous, current)
+
+
+def test_many_allocations_do_not_overlap():
+    allocator = ipam.SubnetAllocator([POOL])
+    rng = random.Random(13)
+    networks = [allocator.allocate(rng.choice((24, 26, 28, 30))) for _ in range(500)]
+
+    assert_disjoint(networks)
+    pool = ipaddress.IPv4Network(POOL)
+    assert all(network.subnet_of(pool) for network in networks)
+    assert allocator.allocated() == sorted(networks, key=lambda network: int(network.network_address))
+    assert allocator.free_addresses() + sum(network.num_addresses for network in networks) == POOL_SIZE
+
+
+def test_allocate_lowest_address_first():
+    allocator = ipam.SubnetAllocator([POOL])
+    assert str(allocator.allocate(30)) == '10.20.0.0/30'
+    assert str(allocator.allocate(24)) == '10.20.1.0/24'
+    assert str(allocator.allocate(30)) == '10.20.0.4/30'
+
+
+def test_pool_exhausted():
+    allocator = ipam.SubnetAllocator(['192.168.0.0/29'])
+    allocator.allocate(30)
+    allocator.allocate(30)
+    with pytest.raises(ipam.IPAMError):
+        allocator.allocate(30)
+
+
+def test_reserve_conflicts():
+    allocator = ipam.SubnetAllocator([POOL])
+    allocator.reserve('10.20.1.0/24')
+
+    for network in ('10.20.1.128/25', '10.20.1.0/24', '10.20.0.0/16'):
+        with pytest.raises(ipam.IPAMError):
+            allocator.reserve(network)
+    with pytest.raises(ipam.IPAMError):
+        allocator.reserve('172.16.0.0/24')
+
+    # 할당은 예약된 서브넷을 건너뜀
+    networks = [allocator.allocate(24) for _ in range(3)]
+    assert [str(network) for network in networks] == ['10.20.0.0/24', '10.20.2.0/24', '10.20.3.0/24']
+
+
+def test_release_merges_back_to_full_pool():
+    allocator = ipam.SubnetAllocator([POOL])
+    rng = random.Random(7)
+    networks = [allocator.allocate(rng.choice((24, 27, 30))) for _ in range(300)]
+    networks.append(allocator.reserve('10.20.200.0/22'))
+
+    rng.shuffle(networks)
+    for network in networks:
+        allocator.release(network)
+
+    assert allocator.allocated() == []
+    assert allocator.free_addresses() == POOL_SIZE
+    # 빈 블록이 모두 합쳐져 풀 전체를 다시 할당할 수 있음
+    assert str(allocator.allocate(16)) == POOL
+
+
+def test_release_unallocated_subnet():
+    allocator = ipam.SubnetAllocator([POOL])
+    network = allocator.allocate(24)
+    with pytest.raises(ipam.IPAMError):
+        allocator.release('10.20.1.0/24')
+    allocator.release(network)
+    with pytest.raises(ipam.IPAMError):
+        allocator.release(network)
+
+
+def test_plan_network_shared_allocator():
+    allocator = ipam.SubnetAllocator([POOL])
+    spec = {'vlans': [{'vlan_id': 10, 'hosts': 100}], 'interfaces': [{'name': 'Gi1/0/48'}]}
+    plans = [ipam.plan_network(spec, hostname=f'SW-{index}', allocator=allocator) for index in range(2)]
+
+    networks = []
+    for plan in plans:
+        networks.append(ipaddress.IPv4Interface(f"{plan['mgmt_ip']}/{plan['mgmt_mask']}").network)
+        for config in plan['additional_configs']:
+            networks.append(ipaddress.IPv4Interface(f"{config['ip']}/{config['subnet']}").network)
+    assert len(networks) == 6
+    assert_disjoint(networks)
+
+
+def test_check_plan_keeps_valid_plan():
+    plan = {
+        'mgmt_ip': '10.20.0.2', 'mgmt_mask': '255.255.255.0', 'gateway': '10.20.0.1',
+        'additional_configs': [{'type': 'vlan', 'vlan_id': 10, 'ip': '10.20.1.1', 'subnet': '255.255.255.0'}],
+    }
+    checked, corrections = ipam.check_plan(plan, pools=[POOL])
+    assert corrections == []
+    assert checked == plan
+
+
+def test_check_plan_corrections():
+    plan = {
+        'mgmt_ip': '10.20.0.0', 'mgmt_mask': '255.255.255.0', 'gateway': '10.99.0.1',
+        'additional_configs': [
+            {'type': 'vlan', 'vlan_id': 10, 'ip': '10.20.0.50', 'subnet': '255.255.255.0'},
+            {'type': 'interface', 'name': 'Gi1/0/48', 'ip': '8.8.8.1', 'subnet': '255.255.255.252'},
+            {'type': 'routing', 'protocol': 'OSPF', 'network': '10.20.0.0/16'},
+        ],
+    }
+    checked, corrections = ipam.check_plan(plan, pools=[POOL])
+
+    # 네트워크 주소는 첫 번째 호스트로, 게이트웨이는 관리 서브넷 안으로 변경
+    assert checked['mgmt_ip'] == '10.20.0.1'
+    assert checked['gateway'] == '10.20.0.2'
+    vlan, interface, routing = checked['additional_configs']
+    # 관리 서브넷과 겹치는 VLAN, 풀 밖의 인터페이스는 같은 크기로 새로 할당
+    assert (vlan['ip'], vlan['subnet']) == ('10.20.1.1', '255.255.255.0')
+    assert (interface['ip'], interface['subnet']) == ('10.20.2.1', '255.255.255.252')
+    assert routing == plan['additional_configs'][2]
+    assert len(corrections) == 4
+
+    networks = [ipaddress.IPv4Interface(f"{checked['mgmt_ip']}/{checked['mgmt_mask']}").network]
+    networks += [ipaddress.IPv4Interface(f"{entry['ip']}/{entry['subnet']}").network for entry in (vlan, interface)]
+    assert_disjoint(networks)
+    # 원래 계획은 바뀌지 않음
+    assert plan['mgmt_ip'] == '10.20.0.0'
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""포트 레이아웃 해석 테스트"""
+
+import pytest
+
+import port_layout
+
+
+def test_zero_based_port_range():
+    layout = port_layout.parse_layout({
+        'interfaces': [
+            {'ports': 'ge-0/0/0-47', 'mode': 'access', 'vlan': 10},
+            {'ports': 'xe-0/1/0', 'mode': 'trunk', 'vlans': '10'},
+        ]
+    })
+    names = [interface.name for interface in layout.interfaces]
+    assert names[0] == 'ge-0/0/0'
+    assert names[-1] == 'xe-0/1/0'
+    assert len(names) == 49
+
+
+def test_duplicate_zero_port_rejected():
+    with pytest.raises(port_layout.LayoutError):
+        port_layout.parse_layout({
+            'interfaces': [
+                {'ports': 'ge-0/0/0-3', 'mode': 'access', 'vlan': 10},
+                {'ports': 'ge-0/0/0', 'mode': 'access', 'vlan': 20},
+            ]
+        })
+
+
+def test_trunk_allowed_vlans_declared():
+    layout = port_layout.parse_layout({
+        'vlans': ['10-12'],
+        'interfaces': [
+            {'ports': 'Te1/1/1', 'mode': 'trunk', 'vlans': '10-20', 'native_vlan': 1},
+        ]
+    })
+    assert [vlan.id for vlan in layout.vlans] == [1] + list(range(10, 21))
+    tagged = {members.id for members in layout.vlan_members if members.tagged}
+    assert tagged == set(range(10, 21))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스트리밍 ZIP 생성
+전체 압축 파일을 메모리에 만들지 않고, 파일 하나를 압축할 때마다 만들어진 바이트를 바로 내보냅니다.
+
+zipfile은 탐색(seek)할 수 없는 출력에 쓸 때 각 파일 뒤에 데이터 서술자(data descriptor)를 기록하므로
+HTTP 응답처럼 앞으로만 쓰는 스트림에도 올바른 ZIP 파일을 만들 수 있습니다.
+"""
+
+import re
+import time
+import zipfile
+
+_UNSAFE_CHARS = re.compile(r'[^\w.\-]+')
+
+
+def safe_filename(name, default='device'):
+    """경로 구분자 등 파일 이름에 쓸 수 없는 문자를 '_'로 바꿉니다."""
+    name = _UNSAFE_CHARS.sub('_', str(name or '')).strip('._')
+    return name or default
+
+
+class _ChunkWriter:
+    """zipfile이 쓰는 바이트를 모아 두었다가 꺼내 가는 탐색 불가능한 출력 객체"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """지금까지 쓰인 바이트를 꺼내고 버퍼를 비웁니다."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    (파일 이름, 내용) 목록으로 ZIP 파일을 만들며 바이트 조각을 차례로 반환합니다.
+
+    entries는 제너레이터여도 되며, 메모리에는 한 번에 파일 하나 분량만 유지됩니다.
+    """
+    writer = _ChunkWriter()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(writer, mode='w', compression=compression) as archive:
+        for name, content in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = compression
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            archive.writestr(info, content)
+            data = writer.drain()
+            if data:
+                yield data
+    # 중앙 디렉터리 (ZipFile을 닫을 때 기록됨)
+    data = writer.drain()
+    if data:
+        yield data